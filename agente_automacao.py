@@ -0,0 +1,166 @@
+"""
+AGENTE DE AUTOMAÇÃO - Processo que roda em cada máquina com vClient
+Registra-se no despachante (automation_api.py), pede tarefas, lê o lote
+em streaming, executa processar_clientes/processar_automoveis nesta
+máquina e devolve o resultado de cada registro. Um heartbeat em paralelo
+mantém o arrendamento da tarefa; se o despachante avisar que a tarefa não
+é mais deste agente, o processamento para no próximo registro. Se a
+resposta de um progresso pedir para ceder a vez (ver escalonamento.py), a
+tarefa volta para a fila e o agente pede a próxima.
+
+Uso:
+    DESPACHANTE_URL=http://servidor:8000 AGENTE_ID=maquina-02 python agente_automacao.py
+"""
+import os
+import socket
+import threading
+import traceback
+
+import requests
+
+import rastro
+from automacao_carros_corrigida_testes import processar_automoveis
+from automacao_clientes_corrigida_testes import processar_clientes
+from automacao_completa import processar_completo
+from frota import ArrendamentoPerdido, TarefaCedida, INTERVALO_HEARTBEAT
+from leitura_stream import iterar_registros
+
+
+PROCESSADORES = {
+    "clientes": processar_clientes,
+    "carros": processar_automoveis,
+    "completo": processar_completo,
+}
+
+# Espera entre pedidos quando a fila está vazia
+INTERVALO_FILA_VAZIA = 2
+
+
+class AgenteRemoto:
+    """
+    Agente que fala com o despachante pela API
+
+    Args:
+        url: Endereço da API do despachante
+        agente_id: Nome único desta máquina
+        tipos: Tipos de tarefa que esta máquina aceita
+        driver: Driver de entrada (padrão: PyAutoGUI)
+    """
+
+    def __init__(self, url, agente_id, tipos=None, driver=None):
+        self.url = url.rstrip('/')
+        self.agente_id = agente_id
+        self.tipos = list(tipos or PROCESSADORES)
+        self.driver = driver
+        self.intervalo_heartbeat = INTERVALO_HEARTBEAT
+        self.http = requests.Session()
+        self._parar = threading.Event()
+
+    def _post(self, caminho, **json):
+        resposta = self.http.post(f"{self.url}{caminho}", json=json, timeout=30)
+        if resposta.status_code == 409:
+            raise ArrendamentoPerdido(resposta.json().get("erro"))
+        if resposta.status_code == 404:
+            return resposta.json()
+        resposta.raise_for_status()
+        return resposta.json()
+
+    def registrar(self):
+        resposta = self._post("/api/agentes", agente_id=self.agente_id, tipos=self.tipos)
+        self.intervalo_heartbeat = resposta.get("intervalo_heartbeat", self.intervalo_heartbeat)
+        print(f"🤖 Agente {self.agente_id} registrado em {self.url}")
+
+    def rodar(self):
+        """Loop principal: pede tarefa, executa, repete"""
+        self.registrar()
+        while not self._parar.is_set():
+            try:
+                resposta = self._post(f"/api/agentes/{self.agente_id}/solicitar")
+            except requests.RequestException as e:
+                print(f"⚠️  Despachante indisponível: {e}")
+                self._parar.wait(INTERVALO_FILA_VAZIA)
+                continue
+            if resposta.get("erro"):
+                # Despachante reiniciou e esqueceu o agente
+                self.registrar()
+                continue
+            tarefa = resposta.get("tarefa")
+            if tarefa is None:
+                self._parar.wait(INTERVALO_FILA_VAZIA)
+                continue
+            self.executar(tarefa)
+
+    def parar(self):
+        self._parar.set()
+        try:
+            self.http.delete(f"{self.url}/api/agentes/{self.agente_id}", timeout=10)
+        except requests.RequestException:
+            pass
+
+    def _heartbeats(self, tarefa_id, terminou, perdida):
+        while not terminou.wait(self.intervalo_heartbeat):
+            try:
+                if self._post(f"/api/agentes/{self.agente_id}/heartbeat",
+                              tarefa_id=tarefa_id).get("cancelar"):
+                    perdida.set()
+            except requests.RequestException as e:
+                print(f"⚠️  Heartbeat falhou: {e}")
+
+    def executar(self, tarefa):
+        tarefa_id = tarefa["tarefa_id"]
+        base = f"/api/agentes/{self.agente_id}/tarefas/{tarefa_id}"
+        print(f"📥 Tarefa {tarefa_id} ({tarefa['tipo']}) a partir do registro {tarefa['inicio']}")
+
+        terminou, perdida = threading.Event(), threading.Event()
+        threading.Thread(target=self._heartbeats, args=(tarefa_id, terminou, perdida),
+                         daemon=True).start()
+
+        def ao_progresso(indice, resultado):
+            if perdida.is_set():
+                raise ArrendamentoPerdido(f"Tarefa {tarefa_id} não é mais deste agente")
+            resposta = self._post(f"{base}/progresso", indice=indice, **resultado)
+            if resposta.get("ceder"):
+                raise TarefaCedida(f"Tarefa {tarefa_id} cedeu a vez no registro {indice}")
+
+        try:
+            # Lote em streaming: os registros chegam conforme são lidos
+            with self.http.get(f"{self.url}{tarefa['lote']}", stream=True, timeout=60) as lote:
+                if lote.status_code == 409:
+                    raise ArrendamentoPerdido(lote.json().get("erro"))
+                lote.raise_for_status()
+                lote.raw.decode_content = True
+                with rastro.contexto(tarefa=tarefa_id, agente=self.agente_id):
+                    PROCESSADORES[tarefa["tipo"]](
+                        dados_json=iterar_registros(lote.raw), driver=self.driver,
+                        inicio=tarefa["inicio"], ao_progresso=ao_progresso)
+            self._post(f"{base}/concluir", status="concluido")
+        except ArrendamentoPerdido as e:
+            print(f"⚠️  {e}: abandonando a tarefa")
+        except TarefaCedida as e:
+            print(f"⏸️  {e}")
+            try:
+                self._post(f"{base}/ceder")
+            except (requests.RequestException, ArrendamentoPerdido):
+                pass
+        except Exception as e:
+            traceback.print_exc()
+            try:
+                self._post(f"{base}/concluir", status="erro", erro=str(e))
+            except (requests.RequestException, ArrendamentoPerdido):
+                pass
+        finally:
+            terminou.set()
+
+
+if __name__ == "__main__":
+    url = os.environ.get("DESPACHANTE_URL", "http://localhost:8000")
+    agente_id = os.environ.get("AGENTE_ID", socket.gethostname())
+    tipos = [t for t in os.environ.get("AGENTE_TIPOS", "").split(",") if t] or None
+
+    agente = AgenteRemoto(url, agente_id, tipos)
+    try:
+        agente.rodar()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Agente interrompido pelo usuário (Ctrl+C)")
+    finally:
+        agente.parar()
@@ -0,0 +1,121 @@
+"""
+ANALISAR RASTRO - Resumo de um ou mais arquivos logs/rastro_*.jsonl
+- tempo por campo do formulário (textos e teclas de dropdown)
+- tempo por espera (telas de prontidão, conferências de campo e esperas fixas por seção)
+- registros mais lentos
+- quanto do tempo foi sleep (pausas e esperas) e quanto foi digitação
+
+Uso:
+    python analisar_rastro.py logs/rastro_20250101_093000_1234.jsonl [--top 10]
+"""
+import json
+import sys
+from collections import defaultdict
+
+
+def ler_rastro(caminhos):
+    """Eventos dos arquivos, na ordem; linhas corrompidas são ignoradas"""
+    for caminho in caminhos:
+        with open(caminho, encoding='utf-8') as arquivo:
+            for linha in arquivo:
+                try:
+                    yield json.loads(linha)
+                except json.JSONDecodeError:
+                    continue
+
+
+def _somar(tabela, chave, segundos):
+    item = tabela[chave]
+    item["vezes"] += 1
+    item["total"] += segundos
+    item["maximo"] = max(item["maximo"], segundos)
+
+
+def _novo():
+    return {"vezes": 0, "total": 0.0, "maximo": 0.0}
+
+
+def analisar(eventos):
+    """
+    Agrega os eventos do rastro
+
+    Returns:
+        {"campos", "esperas", "registros", "sleep", "entrada", "eventos"}
+    """
+    campos = defaultdict(_novo)
+    esperas = defaultdict(_novo)
+    registros = defaultdict(float)
+    sleep = {"pausa": 0.0, "espera": 0.0, "prontidao": 0.0}
+    entrada = 0.0
+    total = 0
+
+    for evento in eventos:
+        duracao = evento.get("duracao")
+        if duracao is None:
+            continue  # marcas (dropdown) não têm duração própria
+        total += 1
+        pausa = evento.get("pausa") or 0.0
+        tipo = evento["evento"]
+
+        if tipo in ("tecla", "texto"):
+            entrada += duracao - pausa
+            sleep["pausa"] += pausa
+            if evento.get("campo"):
+                _somar(campos, evento["campo"], duracao)
+        elif tipo == "espera":
+            sleep["espera"] += duracao
+            _somar(esperas, f"espera fixa ({evento.get('secao') or 'sem seção'})", duracao)
+        elif tipo == "aguardar":
+            sleep["prontidao"] += duracao
+            _somar(esperas, f"tela {evento.get('tela')}", duracao)
+        elif tipo == "conferir":
+            # Conferência de campo (conferir_campo): espera pela sonda, não entrada
+            sleep["prontidao"] += duracao
+            _somar(esperas, f"conferência {evento.get('campo')}", duracao)
+
+        if evento.get("registro") is not None:
+            registros[(evento.get("tarefa"), evento["registro"])] += duracao
+
+    return {"campos": dict(campos), "esperas": dict(esperas), "registros": dict(registros),
+            "sleep": sleep, "entrada": entrada, "eventos": total}
+
+
+def _tabela(titulo, linhas):
+    print(f"\n{titulo}")
+    print(f"   {'':<34}{'vezes':>7}{'total (s)':>12}{'média (s)':>12}{'máx (s)':>10}")
+    for nome, item in sorted(linhas.items(), key=lambda x: -x[1]["total"]):
+        media = item["total"] / item["vezes"]
+        print(f"   {nome:<34}{item['vezes']:>7}{item['total']:>12.2f}{media:>12.3f}{item['maximo']:>10.2f}")
+
+
+def imprimir_analise(analise, top=10):
+    print(f"📊 {analise['eventos']} evento(s) no rastro")
+    _tabela("⌨️  Tempo por campo:", analise["campos"])
+    _tabela("⏳ Tempo por espera:", analise["esperas"])
+
+    print(f"\n🐢 {top} registro(s) mais lento(s):")
+    lentos = sorted(analise["registros"].items(), key=lambda x: -x[1])[:top]
+    for (tarefa, registro), segundos in lentos:
+        origem = f"tarefa {tarefa}, " if tarefa else ""
+        print(f"   {origem}registro {registro}: {segundos:.2f}s")
+
+    sleep = sum(analise["sleep"].values())
+    total = sleep + analise["entrada"]
+    if total:
+        print(f"\n💤 Sleep: {sleep:.2f}s ({sleep / total:.0%}) "
+              f"= pausas {analise['sleep']['pausa']:.2f}s + esperas fixas "
+              f"{analise['sleep']['espera']:.2f}s + prontidão {analise['sleep']['prontidao']:.2f}s")
+        print(f"⌨️  Digitação: {analise['entrada']:.2f}s ({analise['entrada'] / total:.0%})")
+
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    top = 10
+    if "--top" in argumentos:
+        i = argumentos.index("--top")
+        top = int(argumentos[i + 1])
+        del argumentos[i:i + 2]
+    if not argumentos:
+        print(__doc__)
+        sys.exit(1)
+    imprimir_analise(analisar(ler_rastro(argumentos)), top=top)
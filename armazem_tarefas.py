@@ -0,0 +1,208 @@
+"""
+ARMAZÉM DE TAREFAS - Estado em memória das tarefas da API, com índices
+- por status e por data de criação (listas ordenadas): contagem por status
+  em O(1) e páginas com cursor sem copiar nem ordenar tudo
+- retenção: tarefas finalizadas (concluido/erro) saem da memória depois de
+  `retencao` segundos ou quando passam de `maximo_finalizadas`; com
+  `arquivo`, cada uma é antes acrescentada nele em JSONL
+
+A fila durável (fila_tarefas.py) continua com todas as tarefas: o status de
+uma tarefa que saiu daqui ainda é consultado por lá.
+"""
+import base64
+import bisect
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+
+STATUS_FINALIZADOS = ("concluido", "erro")
+
+# Padrões da retenção (sobrescritos por TAREFAS_RETENCAO_HORAS e TAREFAS_MAXIMO_FINALIZADAS)
+RETENCAO_PADRAO = 24 * 3600
+MAXIMO_FINALIZADAS = 10000
+
+LIMITE_PAGINA = 50
+LIMITE_PAGINA_MAXIMO = 500
+
+
+def _codificar_cursor(chave):
+    return base64.urlsafe_b64encode(json.dumps(chave).encode()).decode().rstrip('=')
+
+
+def _decodificar_cursor(cursor):
+    try:
+        preenchido = cursor + '=' * (-len(cursor) % 4)
+        criado_em, tarefa_id = json.loads(base64.urlsafe_b64decode(preenchido))
+        return (str(criado_em), str(tarefa_id))
+    except (ValueError, TypeError):
+        raise ValueError(f"cursor inválido: {cursor!r}")
+
+
+class ArmazemTarefas:
+    """
+    Tarefas por tarefa_id com índices por status e por criação
+
+    Args:
+        retencao: Segundos que uma tarefa finalizada fica em memória
+        maximo_finalizadas: Máximo de tarefas finalizadas em memória
+        arquivo: JSONL onde as tarefas removidas são arquivadas (None = só descarta)
+    """
+
+    def __init__(self, retencao=RETENCAO_PADRAO, maximo_finalizadas=MAXIMO_FINALIZADAS,
+                 arquivo=None):
+        self.retencao = retencao
+        self.maximo_finalizadas = maximo_finalizadas
+        self.arquivo = arquivo
+        self._tarefas = {}
+        self._por_criacao = []    # [(criado_em, tarefa_id)] em ordem
+        self._por_status = {}     # status -> [(criado_em, tarefa_id)] em ordem
+        self._finalizadas = OrderedDict()  # tarefa_id -> instante da finalização
+        self._lock = threading.RLock()
+
+    # ============================================
+    # ÍNDICES
+    # ============================================
+
+    @staticmethod
+    def _chave(tarefa):
+        return (tarefa["criado_em"], tarefa["tarefa_id"])
+
+    @staticmethod
+    def _remover_da_lista(lista, chave):
+        i = bisect.bisect_left(lista, chave)
+        if i < len(lista) and lista[i] == chave:
+            del lista[i]
+
+    def _indexar(self, tarefa):
+        chave = self._chave(tarefa)
+        bisect.insort(self._por_criacao, chave)
+        bisect.insort(self._por_status.setdefault(tarefa["status"], []), chave)
+        if tarefa["status"] in STATUS_FINALIZADOS:
+            self._finalizadas[tarefa["tarefa_id"]] = time.time()
+
+    def _desindexar(self, tarefa):
+        chave = self._chave(tarefa)
+        self._remover_da_lista(self._por_criacao, chave)
+        self._remover_da_lista(self._por_status.get(tarefa["status"], []), chave)
+        self._finalizadas.pop(tarefa["tarefa_id"], None)
+
+    # ============================================
+    # TAREFAS
+    # ============================================
+
+    def criar(self, tarefa):
+        """Guarda (ou substitui) uma tarefa; precisa de tarefa_id, status e criado_em"""
+        with self._lock:
+            anterior = self._tarefas.pop(tarefa["tarefa_id"], None)
+            if anterior is not None:
+                self._desindexar(anterior)
+            self._tarefas[tarefa["tarefa_id"]] = tarefa
+            self._indexar(tarefa)
+            self.limpar()
+        return tarefa
+
+    def __contains__(self, tarefa_id):
+        return tarefa_id in self._tarefas
+
+    def __len__(self):
+        return len(self._tarefas)
+
+    def obter(self, tarefa_id):
+        """Cópia da tarefa (None se não está em memória)"""
+        with self._lock:
+            tarefa = self._tarefas.get(tarefa_id)
+            return dict(tarefa) if tarefa is not None else None
+
+    def atualizar(self, tarefa_id, **campos):
+        """
+        Altera campos da tarefa (um campo com None é removido) e reindexa se o status mudou
+
+        Returns:
+            False se a tarefa não está em memória
+        """
+        with self._lock:
+            tarefa = self._tarefas.get(tarefa_id)
+            if tarefa is None:
+                return False
+            mudou_status = "status" in campos and campos["status"] != tarefa["status"]
+            if mudou_status:
+                self._desindexar(tarefa)
+            for campo, valor in campos.items():
+                if valor is None:
+                    tarefa.pop(campo, None)
+                else:
+                    tarefa[campo] = valor
+            tarefa["atualizado_em"] = datetime.now().isoformat()
+            if mudou_status:
+                self._indexar(tarefa)
+                self.limpar()
+        return True
+
+    def remover(self, tarefa_id):
+        with self._lock:
+            tarefa = self._tarefas.pop(tarefa_id, None)
+            if tarefa is not None:
+                self._desindexar(tarefa)
+        return tarefa
+
+    # ============================================
+    # CONSULTAS
+    # ============================================
+
+    def contar(self, status=None):
+        """Total de tarefas (de um status) em O(1)"""
+        if status is None:
+            return len(self._tarefas)
+        return len(self._por_status.get(status, ()))
+
+    def pagina(self, status=None, limite=LIMITE_PAGINA, cursor=None):
+        """
+        Tarefas mais recentes primeiro, a partir do cursor
+
+        Args:
+            status: Filtra por status (usa o índice do status)
+            limite: Tamanho da página (até LIMITE_PAGINA_MAXIMO)
+            cursor: `proximo_cursor` da página anterior
+
+        Returns:
+            (lista de tarefas, proximo_cursor ou None)
+        """
+        limite = max(1, min(limite, LIMITE_PAGINA_MAXIMO))
+        with self._lock:
+            indice = self._por_criacao if status is None else self._por_status.get(status, [])
+            fim = len(indice) if cursor is None else bisect.bisect_left(
+                indice, _decodificar_cursor(cursor))
+            inicio = max(0, fim - limite)
+            chaves = indice[inicio:fim][::-1]
+            tarefas = [dict(self._tarefas[tarefa_id]) for _, tarefa_id in chaves]
+        proximo = _codificar_cursor(chaves[-1]) if chaves and inicio > 0 else None
+        return tarefas, proximo
+
+    # ============================================
+    # RETENÇÃO
+    # ============================================
+
+    def limpar(self, agora=None):
+        """Remove (e arquiva) as finalizadas vencidas ou além do máximo; retorna quantas"""
+        agora = agora if agora is not None else time.time()
+        removidas = []
+        with self._lock:
+            while self._finalizadas:
+                tarefa_id, finalizada_em = next(iter(self._finalizadas.items()))
+                if (agora - finalizada_em < self.retencao
+                        and len(self._finalizadas) <= self.maximo_finalizadas):
+                    break
+                removidas.append(self.remover(tarefa_id))
+        if removidas and self.arquivo:
+            self._arquivar(removidas)
+        return len(removidas)
+
+    def _arquivar(self, tarefas):
+        os.makedirs(os.path.dirname(self.arquivo) or '.', exist_ok=True)
+        with open(self.arquivo, 'a', encoding='utf-8') as f:
+            for tarefa in tarefas:
+                f.write(json.dumps(tarefa, ensure_ascii=False, default=str) + '\n')
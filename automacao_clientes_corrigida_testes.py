@@ -2,70 +2,217 @@
 AUTOMAÇÃO DE CADASTRO DE CLIENTES - Versão Corrigida
 Processa clientes do arquivo clientes.json
 """
-import pyautogui
-import time
-import json
+import os
+from functools import partial
 
-# Configurações de segurança
-pyautogui.FAILSAFE = True
-pyautogui.PAUSE = 0.8
+import prontidao
+from dropdowns import selecionar
+from leitura_stream import iterar_registros
+from idempotencia import Deduplicador, obter_indice
+from lote import imprimir_verificacao, processar_lote, verificar_lote
+from driver_entrada import obter_driver
+from plano_acoes import (
+    PAUSA_AUTOCOMPLETAR, PAUSA_TELA, aguardar_pronto, conferir_campo, marca, tecla, texto,
+    texto_seguro, valor_preenchido,
+)
+from sessao_velneo import obter_sessao
+from validacao import validar_registro
 
-def safe_write(value, interval=0.1):
+
+def safe_write(value, interval=0.1, driver=None):
     """
     Escrever valor no PyAutoGUI apenas se não for None ou 'none'
     """
-    if value and str(value).lower() != 'none' and str(value).strip() != '':
-        pyautogui.write(str(value), interval=interval)
+    if valor_preenchido(value):
+        (driver or obter_driver()).write(str(value), interval=interval)
         return True
     return False
 
-def processar_clientes(dados_json=None, arquivo_json=None):
+
+def _corredor():
+    """Preencher valor de corredor (a principio harcoded para Paulo)"""
+    return [
+        tecla('tab'),
+        # Com sonda configurada (data/prontidao.json), só digita se o foco chegou no corredor
+        conferir_campo('campo_corredor'),
+        texto('P', pausa=PAUSA_AUTOCOMPLETAR, campo='corredor'),
+        tecla('enter'),
+    ]
+
+
+def compilar_cliente(cliente, indice=None):
+    """
+    Compila um cliente (datos_cliente) no plano de ações do formulário
+
+    Args:
+        cliente: Dicionário datos_cliente
+        indice: Índice do registro no lote (vai na marca de início)
+    """
+    acoes = [marca('registro', indice=indice), marca('secao', nome='cliente')]
+
+    # ============================================
+    # PREENCHER NÚMERO DO CLIENTE
+    # ============================================
+    # Clientes vindos de uma póliza não têm número: o campo fica em branco
+    acoes.append(texto_seguro(cliente.get('numero_cliente'), campo='numero_cliente'))
+
+    assegurado = cliente.get('assegurado', '')
+    if assegurado:
+        acoes += [tecla('tab', 7), texto_seguro(assegurado, campo='assegurado')]
+
+    # Preencher valor de tipo
+    acoes.append(tecla('tab'))
+    tipo = cliente.get('tipo', 'N/A')
+    selecionar(acoes, 'tipo_cliente', tipo, "Tipo")
+    if tipo == "Empresa":
+        acoes += _corredor()
+        acoes += _corredor()
+        acoes += [
+            tecla('tab', 2),
+            texto(cliente.get('rut'), intervalo=0.1, campo='rut'),
+            tecla('tab'),
+            texto(cliente.get('razao_social'), intervalo=0.1, campo='razao_social'),
+            tecla('tab'),
+        ]
+        if cliente.get('categoria'):
+            acoes += [tecla('tab'),
+                      texto(cliente.get('categoria'), intervalo=0.1, campo='categoria')]
+
+    elif tipo == "Particular" or tipo == "Otro":
+        acoes += _corredor()
+        acoes += [
+            tecla('tab', 2),
+            # Preecher valor de Documento
+            texto(cliente.get('documento'), intervalo=0.1, campo='documento'),
+            tecla('tab'),
+            texto(cliente.get('categoria'), intervalo=0.1, campo='categoria'),
+        ]
+
+    elif tipo == "Particular/Empresa":
+        acoes += _corredor()
+        acoes += [
+            tecla('tab', 2),
+            texto(cliente.get('rut'), intervalo=0.1, campo='rut'),
+            tecla('tab'),
+            texto(cliente.get('razao_social'), intervalo=0.1, campo='razao_social'),
+            tecla('tab'),
+            texto(cliente.get('documento'), intervalo=0.1, campo='documento'),
+            tecla('tab'),
+            texto(cliente.get('categoria'), intervalo=0.1, campo='categoria'),
+        ]
+
+    elif tipo == "Edificio":
+        acoes += _corredor()
+        acoes += [
+            tecla('tab', 2),
+            texto(cliente.get('padron'), intervalo=0.1, campo='padron'),
+            tecla('tab'),
+            texto(cliente.get('categoria'), intervalo=0.1, campo='categoria'),
+        ]
+
+    elif tipo == "Prospecto" or tipo == "Copropiedad":
+        acoes += _corredor()
+        acoes += [
+            tecla('tab', 2),
+            texto(cliente.get('categoria'), intervalo=0.1, campo='categoria'),
+        ]
+
+    acoes += [
+        # Preencher valor de telefono
+        tecla('tab'),
+        texto_seguro(cliente.get('telefono'), campo='telefono'),
+        # Preencher valor de celular
+        tecla('tab'),
+        texto_seguro(cliente.get('celular'), campo='celular'),
+        # Preencher valor de Fecha Nascimiento
+        tecla('tab'),
+        texto_seguro(cliente.get('fecha_nacimiento'), campo='fecha_nacimiento'),
+        # Preencher valor de Domicilio
+        tecla('tab', 3),
+        texto_seguro(cliente.get('domicilio'), campo='domicilio'),
+        # Preencher valor de Departamento
+        tecla('tab'),
+        texto_seguro(cliente.get('Departamento'), campo='departamento'),
+        # Preencher valor de Localidad
+        tecla('tab'),
+        texto_seguro(cliente.get('Localidad'), campo='localidad'),
+        # Preencher Codigo Postal
+        tecla('tab'),
+        texto_seguro(cliente.get('codigo_postal'), campo='codigo_postal'),
+        # Preencher valor de Dir. Cobro
+        tecla('tab'),
+        texto_seguro(cliente.get('dir_cobro'), campo='dir_cobro'),
+        # Preencher valor de Departamento (cobro)
+        tecla('tab'),
+        texto_seguro(cliente.get('Departamento'), campo='departamento'),
+        # Preencher valor de Localidad (cobro)
+        tecla('tab'),
+        texto_seguro(cliente.get('Localidad'), campo='localidad'),
+        # Preencher Codigo Postal (cobro)
+        tecla('tab'),
+        texto_seguro(cliente.get('codigo_postal'), campo='codigo_postal'),
+    ]
+
+    # Preencher Email e Observações conforme tipo
+    if tipo in ("Particular", "Edificio", "Otro", "Prospecto", "Copropiedad"):
+        tabs_email = 2
+    else:
+        tabs_email = 3
+    acoes += [
+        tecla('tab', tabs_email),
+        texto_seguro(cliente.get('email'), campo='email'),
+        tecla('tab', 7),
+        texto_seguro(cliente.get('Observaciones'), campo='observaciones'),
+    ]
+
+    # ============================================
+    # GUARDAR CLIENTE
+    # ============================================
+    acoes += [
+        tecla('tab', 8),
+        tecla('enter', pausa=PAUSA_TELA),
+        tecla('enter'),
+        aguardar_pronto('cliente_guardado', 2.5),
+    ]
+    return acoes
+
+
+def extrair_clientes(dados):
+    """datos_cliente de cada item do lote (clientes_json[0]['output']['datos_cliente'])"""
+    return (
+        item['output']['datos_cliente'] for item in dados
+        if 'output' in item and 'datos_cliente' in item['output']
+    )
+
+
+def processar_clientes(dados_json=None, arquivo_json=None, driver=None, sessao=None,
+                       inicio=1, ao_progresso=None, idempotencia=None):
     """
     Processa cadastro de clientes a partir do JSON
-    
+
     Args:
         dados_json: Lista de dados já carregados (para uso via API)
         arquivo_json: Nome do arquivo JSON para ler (para uso standalone)
+        driver: Driver de entrada (padrão: PyAutoGUI; DriverGravacao para dry-run)
+        sessao: SessaoVelneo a reaproveitar (padrão: sessão compartilhada do driver)
+        inicio: Índice (a partir de 1) do primeiro registro a processar (retomada)
+        ao_progresso: Chamada após cada registro com (indice, resultado)
+        idempotencia: IndiceIdempotencia (padrão: índice compartilhado do driver)
+
+    Returns:
+        Dicionário com total, processados (ok), pulados (antes de `inicio`),
+        rejeitados (na validação) e duplicados (já enviados antes)
+
+    Raises:
+        Exception: o JSON não pôde ser carregado (a tarefa termina em erro)
     """
+    sessao = sessao or obter_sessao(driver)
+    deduplicar = Deduplicador(idempotencia or obter_indice(sessao.driver), 'clientes')
 
-    print("🔵 Abrindo Aplicacao de Seguros (Velneo vClient)...")
-    pyautogui.press('win')
-    time.sleep(0.5)
-    pyautogui.write('velneo vClient', interval=0.1)
-    time.sleep(0.5)
-    pyautogui.press('enter')
-    
-    print("⏳ Aguardando janela de conexão carregar...")
-    time.sleep(3)
-    
-    # Navegar para senha (2 TABs)
-    pyautogui.press('tab')
-    pyautogui.press('tab')
-    
-    print("🔐 Preenchendo campo Senha...")
-    pyautogui.write('1234', interval=0.05)
-    
-    print("🔵 Conectando...")
-    pyautogui.press('enter')
-    
-    time.sleep(0.5)
-    
-    print("🔵 Selecionando Portal...")
-    pyautogui.press('enter')
-    time.sleep(2.5)
-    
-    # Fechar notificação
-    pyautogui.press('enter')
-    pyautogui.press('enter')
-    time.sleep(1)
-    
-    
-    
-    
     print("\n" + "="*60)
     print("🎯 AUTOMAÇÃO: Cadastro de Clientes")
     print("="*60 + "\n")
-    
+
     # ============================================
     # CARREGAR JSON
     # ============================================
@@ -74,247 +221,75 @@ def processar_clientes(dados_json=None, arquivo_json=None):
         if dados_json is not None:
             print("📡 Usando dados recebidos via API")
             dados = dados_json
+            # Lista já em memória pode ser percorrida duas vezes; stream não
+            abrir = (lambda: dados_json) if isinstance(dados_json, list) else None
         else:
-            # Senão, ler de arquivo (modo standalone)
+            # Senão, ler de arquivo em streaming (modo standalone)
             arquivo = arquivo_json or 'clientes_exemplo_multiplos.json'
             print(f"📁 Lendo arquivo: {arquivo}")
-            with open(arquivo, 'r', encoding='utf-8') as f:
-                dados = json.load(f)
-        
-        # Ajustar para nova estrutura: clientes_json[0]['output']['datos_cliente']
-        clientes_ativos = []
-
-
-        for item in dados:
-            if 'output' in item and 'datos_cliente' in item['output']:
-                clientes_ativos.append(item['output']['datos_cliente'])
-        
-        print(f"✅ JSON carregado: {len(clientes_ativos)} cliente(s)\n")
-        
+            if not os.path.isfile(arquivo):
+                raise FileNotFoundError(arquivo)
+            abrir = lambda: iterar_registros(arquivo)
+            dados = abrir()
+
+        # Extrair dados de cada registro (um por vez, sem montar a lista inteira)
+        clientes_ativos = extrair_clientes(dados)
+        total = len(dados) if hasattr(dados, '__len__') else '?'
+
+        print(f"✅ JSON aberto: {total} cliente(s)\n")
+
     except Exception as e:
         print(f"❌ Erro ao carregar JSON: {e}")
-        return
-    
-    # ============================================  
-    # LOGIN (assumindo que já está logado)
+        raise
+
     # ============================================
-    print("⏳ Aguarde 3 segundos para posicionar na janela...\n")
-    time.sleep(3)
-    # Navegar com TAB até o local desejado  
-    pyautogui.press('enter')
-    time.sleep(5)
-    pyautogui.press('tab')
-    pyautogui.press('tab')
-    pyautogui.press('tab')
-    pyautogui.press('tab')
-    print(f"   ✅ Botão encontrado - clicando...")
-    pyautogui.press('enter')
+    # VALIDAR LOTE E DUPLICADOS (antes de gastar tempo de GUI)
+    # ============================================
+    # Lotes em stream são verificados registro a registro dentro do loop
+    if abrir is not None:
+        relatorio = verificar_lote('clientes', extrair_clientes(abrir()), deduplicar)
+        imprimir_verificacao(relatorio)
+        if relatorio['a_processar'] == 0:
+            print("⚠️  Nenhum registro novo e válido: nada a processar\n")
+            return {"total": relatorio['total'], "processados": 0, "pulados": 0,
+                    "rejeitados": len(relatorio['rejeitados']),
+                    "duplicados": len(relatorio['duplicados'])}
+
+    # ============================================
+    # LOGIN E NAVEGAÇÃO (reaproveita a sessão se já estiver aberta)
+    # ============================================
+    sessao.abrir_tela('clientes')
     # ============================================
     # PROCESSAR CADA CLIENTE
     # ============================================
-    for i, cliente in enumerate(clientes_ativos, 1):
-
-        
-        
+    def cabecalho(i, cliente):
         print(f"\n{'='*60}")
-        print(f"[{i}/{len(clientes_ativos)}] 👤 {cliente.get('assegurado', 'N/A')}")
+        print(f"[{i}/{total}] 👤 {cliente.get('assegurado', 'N/A')}")
         print(f"{'='*60}\n")
-        
-        # ============================================
-        # PREENCHER NÚMERO DO CLIENTE
-        # ============================================
         print("   📝 Número do cliente: ", cliente.get('numero_cliente'))
-        numero = cliente.get('numero_cliente', 'N/A')
-        safe_write(str(numero))
-        
-        assegurado = cliente.get('assegurado', '')
-        if assegurado:
-            for _ in range(7):
-                pyautogui.press('tab')
-            print(f"   📝 Assegurado: {assegurado}")
-            safe_write(assegurado)
-
-        # Preencher valor de tipo
-        pyautogui.press('tab') 
-        tipo = cliente.get('tipo', 'N/A')  # Exemplo de valor, substituir pelo valor do JSON
-        if tipo == "Empresa":
-                pyautogui.press('down')
-                # Preencher valor de corredor
-                pyautogui.press('tab')
-                # A principio harcoded para Paulo 
-                pyautogui.write('P')
-                pyautogui.press('enter')
-
-                # Preencher valor de corredor
-                pyautogui.press('tab')
-                # A principio harcoded para Paulo 
-                pyautogui.write('P')
-                pyautogui.press('enter')
-                for _ in range(2):
-                    pyautogui.press('tab')
-                
-                if cliente.get('rut'):
-                    pyautogui.write(cliente.get('rut'), interval=0.1)
-                pyautogui.press('tab')
-                if cliente.get('razao_social'):
-                    pyautogui.write(cliente.get('razao_social'), interval=0.1)
-                pyautogui.press('tab')
-                if cliente.get('categoria'):
-                        pyautogui.press('tab')
-                        pyautogui.write(cliente.get('categoria'), interval=0.1)
-
-        elif tipo == "Particular" or tipo == "Otro":
-            
-                for _ in range(2):
-                    pyautogui.press('down')
-            # Preencher valor de corredor
-                pyautogui.press('tab')
-                # A principio harcoded para Paulo 
-                pyautogui.write('P')
-                pyautogui.press('enter')
-                for _ in range(2):
-                    pyautogui.press('tab')
-            
-                # Preecher valor de Documento
-                if cliente.get('documento'):
-                    pyautogui.write(cliente.get('documento'), interval=0.1)
-                pyautogui.press('tab')
-                if cliente.get('categoria'):
-                        pyautogui.write(cliente.get('categoria'), interval=0.1)
-
-        elif tipo == "Particular/Empresa":
-                for _ in range(3):
-                    pyautogui.press('down')
-            # Preencher valor de corredor
-                pyautogui.press('tab')
-                # A principio harcoded para Paulo 
-                pyautogui.write('P')
-                pyautogui.press('enter')
-                for _ in range(2):
-                    pyautogui.press('tab')
-                if cliente.get('rut'):
-                    pyautogui.write(cliente.get('rut'), interval=0.1)
-                pyautogui.press('tab')
-                if cliente.get('razao_social'):
-                    pyautogui.write(cliente.get('razao_social'), interval=0.1)
-                pyautogui.press('tab')
-                if cliente.get('documento'):
-                      pyautogui.write(cliente.get('documento'), interval=0.1)
-                pyautogui.press('tab')
-                if cliente.get('categoria'):
-                        pyautogui.write(cliente.get('categoria'), interval=0.1)
-        elif tipo == "Edificio":
-                for _ in range(4):
-                    pyautogui.press('down')
-            # Preencher valor de corredor
-                pyautogui.press('tab')
-                # A principio harcoded para Paulo 
-                pyautogui.write('P')
-                pyautogui.press('enter')
-                pyautogui.press('tab') * 2
-                if cliente.get('padron'):
-                    pyautogui.write(cliente.get('padron'), interval=0.1)
-                pyautogui.press('tab')
-                if cliente.get('categoria'):
-                        pyautogui.write(cliente.get('categoria'), interval=0.1)
-        elif tipo == "Prospecto" or tipo == "Copropiedad":
-                pyautogui.press('down') * 5
-            # Preencher valor de corredor
-                pyautogui.press('tab')
-                # A principio harcoded para Paulo 
-                pyautogui.write('P')
-                pyautogui.press('enter')
-                pyautogui.press('tab') * 2
-                if cliente.get('categoria'):
-                        pyautogui.write(cliente.get('categoria'), interval=0.1)
-     
 
-        # Preencher valor de telefono
-        pyautogui.press('tab')
-        safe_write(cliente.get('telefono'), interval=0.1)
-
-        # Preencher valor de celular
-        pyautogui.press('tab')
-        safe_write(cliente.get('celular'), interval=0.1)
+    if inicio > 1:
+        print(f"⏩ Retomando a partir do registro {inicio}")
+    resumo = processar_lote(sessao, clientes_ativos, compilar_cliente, cabecalho,
+                            inicio=inicio, ao_progresso=ao_progresso,
+                            validar=partial(validar_registro, 'clientes'),
+                            deduplicar=deduplicar, tipo='clientes')
 
-        # Preencher valor de Fecha Nascimiento
-        pyautogui.press('tab')
-        safe_write(cliente.get('fecha_nacimiento'), interval=0.1)
-
-        # Preencher valor de Domicilio
-        for _ in range(3):
-            pyautogui.press('tab')
-        safe_write(cliente.get('domicilio'), interval=0.1)
-
-        # Preencher valor de Departamento
-        pyautogui.press('tab')
-        safe_write(cliente.get('Departamento'), interval=0.1)
-
-        # Preencher valor de Localidad
-        pyautogui.press('tab')
-        safe_write(cliente.get('Localidad'), interval=0.1)
-        
-        # Preencher Codigo Postal
-        pyautogui.press('tab')
-        safe_write(cliente.get('codigo_postal'), interval=0.1)
-
-        # Preencher valor de Dir. Cobro
-        pyautogui.press('tab')
-        safe_write(cliente.get('dir_cobro'), interval=0.1)
-
-        # Preencher valor de Departamento (cobro)
-        pyautogui.press('tab')
-        safe_write(cliente.get('Departamento'), interval=0.1)
-
-        # Preencher valor de Localidad (cobro)
-        pyautogui.press('tab')
-        safe_write(cliente.get('Localidad'), interval=0.1)
-
-        # Preencher Codigo Postal (cobro)
-        pyautogui.press('tab')
-        safe_write(cliente.get('codigo_postal'), interval=0.1)
-
-        # Preencher Email e Observações conforme tipo
-        if tipo == "Particular" or tipo == "Edificio" or tipo == "Otro" or tipo == "Prospecto" or tipo == "Copropiedad":
-                # Preencher valor de Email
-                for _ in range(2):
-                    pyautogui.press('tab')
-                safe_write(cliente.get('email'), interval=0.1)
-                # Preencher valor em Observaciones
-                for _ in range(7):
-                    pyautogui.press('tab')
-                safe_write(cliente.get('Observaciones'), interval=0.1)
-        else:
-                # Preencher valor de Email
-                for _ in range(3):
-                    pyautogui.press('tab')
-                safe_write(cliente.get('email'), interval=0.1)
-                # Preencher valor em Observaciones
-                for _ in range(7):
-                    pyautogui.press('tab')
-                safe_write(cliente.get('Observaciones'), interval=0.1)
-        
-        # ============================================
-        # GUARDAR CLIENTE
-        # ============================================
-        for _ in range(8):
-            pyautogui.press('tab')
-        
-        print("   💾 Guardando cliente...")
-        for _ in range(2):
-            pyautogui.press('enter')
-        time.sleep(0.5)
-        
-        print(f"\n   ✅ Cliente processado com sucesso!\n")
-        time.sleep(2)
-        
     print(f"\n{'='*60}")
     print(f"✅ AUTOMAÇÃO CONCLUÍDA")
-    print(f"📊 Total processado: {len(clientes_ativos)} cliente(s)")
+    prontidao.imprimir_estatisticas()
+    print(f"📊 Total processado: {resumo['processados']} cliente(s)")
+    if resumo['rejeitados']:
+        print(f"⏭️  Rejeitados na validação: {resumo['rejeitados']}")
+    if resumo['duplicados']:
+        print(f"♻️  Já enviados antes (pulados): {resumo['duplicados']}")
     print(f"{'='*60}\n")
+    return resumo
 
 
 if __name__ == "__main__":
+    import pyautogui
+
     try:
         processar_clientes()
     except KeyboardInterrupt:
@@ -0,0 +1,225 @@
+"""
+AUTOMAÇÃO COMPLETA - Cliente (se faltar) + póliza numa única sessão
+Recebe o mesmo item['output'] de carros.json (que já traz datos_cliente)
+e cadastra o cliente que ainda não foi enviado e depois a póliza, com um
+login só. Dentro de cada bloco do lote o trabalho é reordenado para trocar
+de tela o mínimo possível:
+1. todos os clientes novos do bloco, seguidos, na tela de clientes
+2. todas as pólizas do bloco, a partir do Portal
+Assim são duas navegações por bloco, em vez de duas por registro.
+
+O cliente de cada póliza sai de datos_cliente; ele é "novo" quando não está
+no índice de idempotência de clientes nem apareceu antes no mesmo bloco.
+Um datos_cliente sem os campos do cadastro (ex: sem tipo) não trava a
+póliza: ela segue como em processar_automoveis.
+"""
+import os
+import re
+from itertools import islice
+
+import metricas
+import prontidao
+from automacao_carros_corrigida_testes import compilar_automovel, extrair_automoveis
+from automacao_clientes_corrigida_testes import compilar_cliente
+from idempotencia import Deduplicador, impressao_digital, obter_indice
+from leitura_stream import iterar_registros
+from lote import processar_lote
+from sessao_velneo import obter_sessao
+from validacao import validar_registro
+
+
+# Itens lidos de uma vez: cada bloco custa duas trocas de tela
+# (lotes em stream não são carregados inteiros)
+TAMANHO_BLOCO = 50
+
+
+def cliente_da_poliza(poliza):
+    """
+    datos_cliente da póliza no formato do cadastro de clientes
+
+    "PARTICULAR (Lineas Particulares)" -> "PARTICULAR" (o tipo vira a opção do combo)
+    """
+    cliente = dict(poliza.get('datos_cliente') or {})
+    tipo = cliente.get('tipo')
+    if isinstance(tipo, str):
+        cliente['tipo'] = re.sub(r'\s*\(.*\)\s*$', '', tipo)
+    return cliente
+
+
+def _blocos(itens, tamanho):
+    """(índice, item) em blocos de `tamanho` (índices começam em 1)"""
+    numerados = enumerate(itens, 1)
+    while True:
+        bloco = list(islice(numerados, tamanho))
+        if not bloco:
+            return
+        yield bloco
+
+
+def planejar_bloco(bloco, clientes, carros, resumo, ao_progresso=None):
+    """
+    Valida o bloco e separa o que vai para cada tela
+
+    Args:
+        bloco: [(indice, item['output'])]
+        clientes: Deduplicador de clientes
+        carros: Deduplicador de carros
+
+    Returns:
+        ([(indice, cliente novo)], [(indice, póliza normalizada)])
+    """
+    novos, vistos, polizas = [], set(), []
+    for i, poliza in bloco:
+        avisos = []
+        normalizada, erros = validar_registro('carros', poliza, avisos)
+        if erros:
+            resumo["rejeitados"] += 1
+            print(f"   ⏭️  Registro {i} rejeitado: {'; '.join(erros)}")
+            metricas.REGISTROS.inc(tipo='carros', resultado='invalido')
+            if ao_progresso is not None:
+                ao_progresso(i, {"status": "invalido", "erro": "; ".join(erros),
+                                 "impressao": impressao_digital('carros', poliza)})
+            continue
+
+        if avisos:
+            print(f"   ⚠️  Registro {i} (conferir): {'; '.join(avisos)}")
+
+        # Sem dados para o cadastro, a póliza segue sozinha (como em /api/carros)
+        cliente, erros_cliente = validar_registro('clientes', cliente_da_poliza(poliza))
+        if erros_cliente:
+            print(f"   ⚠️  Registro {i}: cliente não será cadastrado ({'; '.join(erros_cliente)})")
+            polizas.append((i, normalizada))
+            continue
+
+        # Póliza já enviada: processar_lote a pula, o cliente não precisa de tela
+        impressao, _ = clientes.identificar(cliente)
+        if (impressao not in vistos and not carros.contem(normalizada)
+                and not clientes.contem(cliente)):
+            novos.append((i, cliente))
+        vistos.add(impressao)
+        polizas.append((i, normalizada))
+    return novos, polizas
+
+
+def processar_completo(dados_json=None, arquivo_json=None, driver=None, sessao=None,
+                       inicio=1, ao_progresso=None, idempotencia=None,
+                       tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Cadastra cliente (se faltar) e póliza de cada item na mesma sessão
+
+    Args:
+        dados_json: Lista de dados já carregados (para uso via API)
+        arquivo_json: Nome do arquivo JSON para ler (para uso standalone)
+        driver: Driver de entrada (padrão: PyAutoGUI; DriverGravacao para dry-run)
+        sessao: SessaoVelneo a reaproveitar (padrão: sessão compartilhada do driver)
+        inicio: Índice (a partir de 1) do primeiro item a processar (retomada)
+        ao_progresso: Chamada após cada póliza com (indice, resultado)
+        idempotencia: IndiceIdempotencia (padrão: índice compartilhado do driver)
+        tamanho_bloco: Itens reordenados juntos (clientes primeiro, pólizas depois)
+
+    Returns:
+        Dicionário com total, processados (pólizas ok), pulados, rejeitados,
+        duplicados e clientes (clientes novos cadastrados)
+    """
+    sessao = sessao or obter_sessao(driver)
+    indice = idempotencia or obter_indice(sessao.driver)
+    clientes = Deduplicador(indice, 'clientes')
+    carros = Deduplicador(indice, 'carros')
+
+    print("\n" + "="*60)
+    print("🎯 AUTOMAÇÃO: Cliente + Póliza")
+    print("="*60 + "\n")
+
+    # ============================================
+    # CARREGAR JSON
+    # ============================================
+    try:
+        if dados_json is not None:
+            print("📡 Usando dados recebidos via API")
+            dados = dados_json
+        else:
+            arquivo = arquivo_json or 'carros.json'
+            print(f"📁 Lendo arquivo: {arquivo}")
+            if not os.path.isfile(arquivo):
+                raise FileNotFoundError(arquivo)
+            dados = iterar_registros(arquivo)
+        total = len(dados) if hasattr(dados, '__len__') else '?'
+        print(f"✅ JSON aberto: {total} póliza(s)\n")
+    except Exception as e:
+        print(f"❌ Erro ao carregar JSON: {e}")
+        raise
+
+    if inicio > 1:
+        print(f"⏩ Retomando a partir do registro {inicio}")
+
+    resumo = {"total": 0, "processados": 0, "pulados": 0, "rejeitados": 0,
+              "duplicados": 0, "clientes": 0}
+
+    def cabecalho_cliente(i, cliente):
+        print(f"\n👤 Cliente novo: {cliente.get('assegurado', 'N/A')}")
+
+    for bloco in _blocos(extrair_automoveis(dados), tamanho_bloco):
+        resumo["total"] += len(bloco)
+        pulados = sum(1 for i, _ in bloco if i < inicio)
+        resumo["pulados"] += pulados
+        novos, polizas = planejar_bloco(bloco[pulados:], clientes, carros, resumo, ao_progresso)
+        if not polizas:
+            continue
+
+        # ============================================
+        # 1. CLIENTES NOVOS DO BLOCO (tela de clientes)
+        # ============================================
+        if novos:
+            sessao.abrir_tela('clientes')
+            feitos = processar_lote(sessao, [c for _, c in novos], compilar_cliente,
+                                    cabecalho_cliente, deduplicar=clientes, tipo='clientes',
+                                    indices=[i for i, _ in novos])
+            resumo["clientes"] += feitos["processados"]
+
+        # ============================================
+        # 2. PÓLIZAS DO BLOCO (a partir do Portal)
+        # ============================================
+        sessao.abrir_tela('portal')
+
+        def cabecalho(i, carro):
+            vehiculo = carro.get('datos_vehiculo', {})
+            print(f"\n{'='*60}")
+            print(f"[{i}/{total}] 🚗 {vehiculo.get('marca_modelo', 'N/A')}")
+            print(f"{'='*60}\n")
+
+        feitos = processar_lote(sessao, [p for _, p in polizas], compilar_automovel, cabecalho,
+                                ao_progresso=ao_progresso, deduplicar=carros, tipo='carros',
+                                indices=[i for i, _ in polizas])
+        resumo["processados"] += feitos["processados"]
+        resumo["duplicados"] += feitos["duplicados"]
+
+    # ============================================
+    # FIM
+    # ============================================
+    print(f"\n{'='*60}")
+    print(f"✅ AUTOMAÇÃO CONCLUÍDA")
+    prontidao.imprimir_estatisticas()
+    print(f"👤 Clientes novos cadastrados: {resumo['clientes']}")
+    print(f"🚗 Pólizas processadas: {resumo['processados']}")
+    if resumo['rejeitados']:
+        print(f"⏭️  Rejeitados na validação: {resumo['rejeitados']}")
+    if resumo['duplicados']:
+        print(f"♻️  Já enviados antes (pulados): {resumo['duplicados']}")
+    print(f"🔐 Logins nesta sessão: {sessao.logins}")
+    print(f"{'='*60}\n")
+    return resumo
+
+
+if __name__ == "__main__":
+    import pyautogui
+
+    try:
+        processar_completo()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Automação interrompida pelo usuário (Ctrl+C)")
+    except pyautogui.FailSafeException:
+        print("\n\n⚠️  Automação interrompida (FAILSAFE - mouse no canto)")
+    except Exception as e:
+        print(f"\n\n❌ Erro: {e}")
+        import traceback
+        traceback.print_exc()
@@ -1,14 +1,38 @@
-from fastapi import FastAPI, BackgroundTasks, Request
+from fastapi import FastAPI, File, Form, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from typing import List, Dict, Any, Optional, Union
 from pydantic import BaseModel
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import uuid
+import json
+import os
 from datetime import datetime
+from functools import partial
+from urllib.parse import urlparse
 import sys
 
 # Importar suas automações existentes
-from automacao_clientes_corrigida_testes import processar_clientes
-from automacao_carros_corrigida_testes import processar_automoveis
+from automacao_clientes_corrigida_testes import processar_clientes, extrair_clientes
+from automacao_carros_corrigida_testes import processar_automoveis, extrair_automoveis
+from automacao_completa import processar_completo
+from sessao_velneo import estado_sessao
+from fila_tarefas import FilaTarefas
+from frota import Despachante, AgenteLocal, TarefaCedida
+from checkpoint import RegistroCheckpoint
+from leitura_stream import ParserIncremental, seguir_ndjson, TAMANHO_BLOCO
+from importacao_planilha import iterar_planilha, EXTENSOES
+from validacao import validar_registro
+from lote import verificar_lote
+from idempotencia import Deduplicador, obter_indice
+from driver_entrada import obter_driver
+from eventos import DifusorEventos, STATUS_FINAIS, formatar_sse
+from armazem_tarefas import ArmazemTarefas, LIMITE_PAGINA
+from webhooks import FilaWebhooks
+from resultados import ArquivoResultados
+from escalonamento import validar_prioridade
+import metricas
 
 app = FastAPI(
     title="API Automação Seguros",
@@ -23,8 +47,195 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Armazenar tarefas em memória (SIMPLES!)
-tarefas_memoria = {}
+# Tarefas em memória, indexadas por status e criação; as finalizadas saem depois
+# de TAREFAS_RETENCAO_HORAS (a fila durável continua respondendo por elas)
+tarefas = ArmazemTarefas(
+    retencao=float(os.environ.get("TAREFAS_RETENCAO_HORAS", 24)) * 3600,
+    maximo_finalizadas=int(os.environ.get("TAREFAS_MAXIMO_FINALIZADAS", 10000)),
+    arquivo=os.environ.get("TAREFAS_ARQUIVO") or None,
+)
+
+# Progresso empurrado para as conexões SSE (GET /api/status/{tarefa_id}/eventos)
+difusor = DifusorEventos()
+
+# Trabalho bloqueante dos endpoints async (validação de lote, SQLite) fora do event loop
+executor = ThreadPoolExecutor(max_workers=int(os.environ.get("API_TRABALHADORES", 4)),
+                              thread_name_prefix="api")
+
+# Intervalo dos comentários de keep-alive no SSE (proxies fecham conexões mudas)
+INTERVALO_KEEPALIVE = 15
+
+async def em_executor(funcao, *args):
+    """Roda `funcao` no executor da API sem travar o event loop"""
+    return await asyncio.get_running_loop().run_in_executor(executor, funcao, *args)
+
+# Avisos de conclusão para o callback_url de cada tarefa
+webhooks = FilaWebhooks()
+
+def publicar_status(tarefa_id: str):
+    """Avisa os ouvintes da tarefa que o status mudou (e o callback_url, se terminou)"""
+    tarefa = tarefas.obter(tarefa_id)
+    if tarefa is None:
+        return
+    difusor.publicar(tarefa_id, {"evento": "status", **tarefa})
+    if tarefa["status"] in STATUS_FINAIS and tarefa.get("callback_url"):
+        webhooks.notificar(tarefa["callback_url"], aviso_conclusao(tarefa))
+
+def aviso_conclusao(tarefa: Dict) -> Dict:
+    """Corpo do webhook: resultado da tarefa e de cada registro"""
+    tarefa_id = tarefa["tarefa_id"]
+    return {
+        "evento": "tarefa_finalizada",
+        **{campo: tarefa.get(campo) for campo in (
+            "tarefa_id", "tipo", "status", "erro", "total", "processados",
+            "rejeitados", "duplicados")},
+        "finalizado_em": datetime.now().isoformat(),
+        "registros": checkpoints.listar(tarefa_id),
+    }
+
+def obter_callback(request, callback_url: Optional[str]) -> Optional[str]:
+    """callback_url da query string ou do envelope; ValueError se não for http(s)"""
+    url = callback_url or (request.get("callback_url") if isinstance(request, dict) else None)
+    if url and (urlparse(url).scheme not in ("http", "https") or not urlparse(url).netloc):
+        raise ValueError(f"callback_url inválido: {url}")
+    return url
+
+def obter_escalonamento(request, prioridade: Optional[str], inquilino: Optional[str]):
+    """(prioridade, inquilino) da query string ou do envelope; ValueError se a prioridade não existir"""
+    envelope = request if isinstance(request, dict) else {}
+    prioridade = validar_prioridade(prioridade or envelope.get("prioridade"))
+    inquilino = inquilino or envelope.get("inquilino")
+    return prioridade, str(inquilino) if inquilino else None
+
+# Fila durável: as tarefas sobrevivem a reinícios
+fila = FilaTarefas()
+
+def tarefa_devolvida(tarefa_id: str):
+    """Tarefa de um agente morto voltou para a fila"""
+    if tarefas.atualizar(tarefa_id, status="pendente", agente=None):
+        publicar_status(tarefa_id)
+
+# Despachante: distribui a fila entre os agentes (um vClient por agente)
+despachante = Despachante(
+    fila,
+    duracao_lease=float(os.environ.get("FROTA_DURACAO_LEASE", 60)),
+    limite_heartbeat=float(os.environ.get("FROTA_LIMITE_HEARTBEAT", 30)),
+    ao_devolver=tarefa_devolvida,
+)
+# A máquina da API também processa tarefas, a não ser que AGENTE_LOCAL=0
+AGENTE_LOCAL = os.environ.get("AGENTE_LOCAL", "1") != "0"
+agente_local = None
+
+# Resultado de cada registro (para retomar do primeiro não concluído)
+checkpoints = RegistroCheckpoint()
+# Histórico de cada registro (impressão, duração, avisos) em output/resultados_<id>.jsonl
+resultados = ArquivoResultados()
+
+# Lotes recebidos em streaming são gravados em NDJSON aqui
+PASTA_LOTES = "data"
+
+# Tarefas cujo upload em streaming ainda está chegando
+uploads_ativos = set()
+
+# Como tirar os registros de cada item recebido, por tipo de tarefa
+EXTRATORES = {
+    "clientes": extrair_clientes,
+    "carros": extrair_automoveis,
+}
+
+# ============================================
+# CICLO DE VIDA
+# ============================================
+
+def deduplicador(tipo: str) -> Deduplicador:
+    """Índice de registros já enviados (o mesmo que os processadores consultam)"""
+    return Deduplicador(obter_indice(obter_driver()), tipo)
+
+def arquivo_lote(tarefa_id: str) -> str:
+    return os.path.join(PASTA_LOTES, f"lote_{tarefa_id}.ndjson")
+
+def contar_registros(payload) -> int:
+    """Total de um payload da fila (lista em memória ou {"arquivo": NDJSON})"""
+    if isinstance(payload, list):
+        return len(payload)
+    if not os.path.exists(payload["arquivo"]):
+        return 0
+    with open(payload["arquivo"], "r", encoding="utf-8") as f:
+        return sum(1 for linha in f if linha.strip())
+
+def registros_da_tarefa(tarefa_id: str, payload):
+    """Iterável de registros de uma tarefa, sem carregar lotes em arquivo inteiros"""
+    if isinstance(payload, list):
+        return payload
+
+    arquivo = payload["arquivo"]
+    if os.path.exists(arquivo + ".parcial") and tarefa_id not in uploads_ativos:
+        raise RuntimeError("Upload incompleto: reenvie o lote")
+
+    def registros():
+        # Segue o arquivo enquanto o upload ainda está chegando
+        yield from seguir_ndjson(arquivo, ativo=lambda: tarefa_id in uploads_ativos)
+        if os.path.exists(arquivo + ".parcial"):
+            raise RuntimeError("Upload incompleto: reenvie o lote")
+    return registros()
+
+def registrar_tarefa_da_fila(tarefa: Dict):
+    """Recria o registro em memória de uma tarefa que só existe na fila durável"""
+    tarefas.criar({
+        "tarefa_id": tarefa["tarefa_id"],
+        "tipo": tarefa["tipo"],
+        "status": tarefa["status"],
+        "total": contar_registros(tarefa["payload"]),
+        "processados": checkpoints.primeiro_pendente(tarefa["tarefa_id"]) - 1,
+        "callback_url": tarefa.get("callback"),
+        "prioridade": tarefa.get("prioridade"),
+        "inquilino": tarefa.get("inquilino"),
+        "criado_em": datetime.fromtimestamp(tarefa["criado_em"]).isoformat(),
+        "atualizado_em": datetime.now().isoformat()
+    })
+
+# Medidores lidos na hora da coleta (GET /metrics)
+metricas.registrar(metricas.Medidor(
+    "fila_tarefas_pendentes", "Tarefas esperando agente", lambda: fila.estatisticas()["pendentes"]))
+metricas.registrar(metricas.Medidor(
+    "fila_tarefas_processando", "Tarefas em execução", lambda: fila.estatisticas()["processando"]))
+metricas.registrar(metricas.Medidor(
+    "fila_espera_mais_antiga_segundos", "Espera da tarefa pendente mais antiga",
+    lambda: fila.estatisticas()["espera_mais_antiga"]))
+metricas.registrar(metricas.Medidor(
+    "webhooks_avisos_pendentes", "Avisos de conclusão esperando entrega", webhooks.pendentes))
+metricas.registrar(metricas.Medidor(
+    "frota_agentes_vivos", "Agentes com heartbeat em dia",
+    lambda: sum(1 for a in despachante.estado() if a["vivo"])))
+
+@app.on_event("startup")
+def iniciar_fila():
+    """Recupera tarefas interrompidas e inicia o despachante (e o agente local)"""
+    global agente_local
+    recuperadas = fila.recuperar_interrompidas(agentes_locais=["local"])
+    if recuperadas:
+        print(f"♻️  {recuperadas} tarefa(s) interrompida(s) voltaram para a fila")
+
+    for tarefa in fila.pendentes():
+        registrar_tarefa_da_fila(tarefa)
+
+    despachante.iniciar()
+    webhooks.iniciar()
+    if AGENTE_LOCAL:
+        agente_local = AgenteLocal(despachante, {
+            "clientes": processar_clientes_background,
+            "carros": processar_carros_background,
+            "completo": processar_completo_background,
+        })
+        agente_local.iniciar()
+
+@app.on_event("shutdown")
+def parar_fila():
+    if agente_local:
+        agente_local.parar()
+    despachante.parar()
+    webhooks.parar()
+    executor.shutdown(wait=False)
 
 # ============================================
 # ENDPOINTS
@@ -35,12 +246,17 @@ def home():
     """Health check"""
     return {
         "status": "online",
-        "tarefas_ativas": len([t for t in tarefas_memoria.values() if t["status"] in ["pendente", "processando"]]),
-        "total_tarefas": len(tarefas_memoria)
+        "tarefas_ativas": tarefas.contar("pendente") + tarefas.contar("processando"),
+        "total_tarefas": tarefas.contar(),
+        "fila": fila.estatisticas(),
+        "agentes": len([a for a in despachante.estado() if a["vivo"]]),
+        "sessao_velneo": estado_sessao(),
+        "registros_ja_enviados": obter_indice(obter_driver()).total()
     }
 
 @app.post("/api/clientes")
-async def api_cadastrar_clientes(request: Union[List[Dict], Dict], background_tasks: BackgroundTasks):
+async def api_cadastrar_clientes(request: Union[List[Dict], Dict], callback_url: Optional[str] = None,
+                                 prioridade: Optional[str] = None, inquilino: Optional[str] = None):
     """
     Recebe JSON do n8n e processa clientes
     
@@ -57,8 +273,15 @@ async def api_cadastrar_clientes(request: Union[List[Dict], Dict], background_ta
     
     Formato 2 - COM ENVELOPE:
     {
-      "clientes": [...]
+      "clientes": [...],
+      "callback_url": "https://...",  (opcional)
+      "prioridade": "urgente",        (opcional: urgente | normal | lote)
+      "inquilino": "corretora-x"      (opcional)
     }
+    
+    callback_url (query string ou envelope): recebe um POST quando a tarefa terminar
+    prioridade/inquilino (query string ou envelope): divisão justa dos agentes
+    (ver escalonamento.py); um cadastro urgente não espera um lote grande
     """
     # Detectar formato e extrair dados
     if isinstance(request, list):
@@ -71,38 +294,54 @@ async def api_cadastrar_clientes(request: Union[List[Dict], Dict], background_ta
         print("📦 Formato detectado: OBJETO COM ENVELOPE")
     else:
         return {"erro": "Formato inválido. Envie array ou objeto com chave 'clientes'"}
+    try:
+        callback_url = obter_callback(request, callback_url)
+        prioridade, inquilino = obter_escalonamento(request, prioridade, inquilino)
+    except ValueError as e:
+        return {"erro": str(e)}
+    
+    # Validar o lote inteiro antes de ocupar a fila
+    validacao = await em_executor(
+        verificar_lote, "clientes", extrair_clientes(dados_clientes), deduplicador("clientes"))
+    if validacao["a_processar"] == 0:
+        return {"erro": "Nenhum cliente novo e válido", "validacao": validacao}
     
     tarefa_id = str(uuid.uuid4())[:8]  # ID curto
     
     # Criar registro da tarefa
-    tarefas_memoria[tarefa_id] = {
+    tarefas.criar({
         "tarefa_id": tarefa_id,
         "tipo": "clientes",
         "status": "pendente",
         "total": len(dados_clientes),
         "processados": 0,
+        "rejeitados": 0,
+        "duplicados": 0,
+        "callback_url": callback_url,
+        "prioridade": prioridade,
+        "inquilino": inquilino,
         "criado_em": datetime.now().isoformat(),
         "atualizado_em": datetime.now().isoformat()
-    }
+    })
     
     print(f"✅ Nova tarefa criada: {tarefa_id} ({len(dados_clientes)} clientes)")
     
-    # Processar em background
-    background_tasks.add_task(
-        processar_clientes_background,
-        tarefa_id,
-        dados_clientes
-    )
+    # Enfileirar (o consumidor da fila processa uma tarefa por vez)
+    await em_executor(fila.enfileirar, tarefa_id, "clientes", dados_clientes, callback_url,
+                      prioridade, inquilino)
     
     return {
         "tarefa_id": tarefa_id,
         "status": "pendente",
-        "mensagem": f"Processando {len(dados_clientes)} cliente(s)",
-        "consultar_status": f"/api/status/{tarefa_id}"
+        "mensagem": f"Processando {validacao['a_processar']} cliente(s)",
+        "validacao": validacao,
+        "consultar_status": f"/api/status/{tarefa_id}",
+        "acompanhar": f"/api/status/{tarefa_id}/eventos"
     }
 
 @app.post("/api/carros")
-async def api_cadastrar_carros(request: Union[List[Dict], Dict], background_tasks: BackgroundTasks):
+async def api_cadastrar_carros(request: Union[List[Dict], Dict], callback_url: Optional[str] = None,
+                               prioridade: Optional[str] = None, inquilino: Optional[str] = None):
     """
     Recebe JSON do n8n e processa carros
     
@@ -120,8 +359,15 @@ async def api_cadastrar_carros(request: Union[List[Dict], Dict], background_task
     
     Formato 2 - COM ENVELOPE:
     {
-      "carros": [...]
+      "carros": [...],
+      "callback_url": "https://...",  (opcional)
+      "prioridade": "urgente",        (opcional: urgente | normal | lote)
+      "inquilino": "corretora-x"      (opcional)
     }
+    
+    callback_url (query string ou envelope): recebe um POST quando a tarefa terminar
+    prioridade/inquilino (query string ou envelope): divisão justa dos agentes
+    (ver escalonamento.py); um cadastro urgente não espera um lote grande
     """
     # Detectar formato
     if isinstance(request, list):
@@ -132,118 +378,742 @@ async def api_cadastrar_carros(request: Union[List[Dict], Dict], background_task
         print("📦 Formato detectado: OBJETO COM ENVELOPE")
     else:
         return {"erro": "Formato inválido. Envie array ou objeto com chave 'carros'"}
+    try:
+        callback_url = obter_callback(request, callback_url)
+        prioridade, inquilino = obter_escalonamento(request, prioridade, inquilino)
+    except ValueError as e:
+        return {"erro": str(e)}
+    
+    # Validar o lote inteiro antes de ocupar a fila
+    validacao = await em_executor(
+        verificar_lote, "carros", extrair_automoveis(dados_carros), deduplicador("carros"))
+    if validacao["a_processar"] == 0:
+        return {"erro": "Nenhum carro novo e válido", "validacao": validacao}
     
     tarefa_id = str(uuid.uuid4())[:8]
     
-    tarefas_memoria[tarefa_id] = {
+    tarefas.criar({
         "tarefa_id": tarefa_id,
         "tipo": "carros",
         "status": "pendente",
         "total": len(dados_carros),
         "processados": 0,
+        "rejeitados": 0,
+        "duplicados": 0,
+        "callback_url": callback_url,
+        "prioridade": prioridade,
+        "inquilino": inquilino,
         "criado_em": datetime.now().isoformat(),
         "atualizado_em": datetime.now().isoformat()
-    }
+    })
     
     print(f"✅ Nova tarefa criada: {tarefa_id} ({len(dados_carros)} carros)")
     
-    background_tasks.add_task(
-        processar_carros_background,
-        tarefa_id,
-        dados_carros
-    )
+    await em_executor(fila.enfileirar, tarefa_id, "carros", dados_carros, callback_url,
+                      prioridade, inquilino)
+    
+    return {
+        "tarefa_id": tarefa_id,
+        "status": "pendente",
+        "mensagem": f"Processando {validacao['a_processar']} carro(s)",
+        "validacao": validacao,
+        "consultar_status": f"/api/status/{tarefa_id}",
+        "acompanhar": f"/api/status/{tarefa_id}/eventos"
+    }
+
+@app.post("/api/completo")
+async def api_cadastrar_completo(request: Union[List[Dict], Dict], callback_url: Optional[str] = None,
+                                 prioridade: Optional[str] = None, inquilino: Optional[str] = None):
+    """
+    Cliente (se ainda não foi enviado) + póliza, numa única sessão do Velneo
+    
+    Mesmo item de /api/carros (output com datos_cliente), em array direto
+    ou com envelope {"polizas": [...], "callback_url": "...", "prioridade": "...", "inquilino": "..."}
+    """
+    if isinstance(request, list):
+        dados_polizas = request
+        print("📡 Formato detectado: ARRAY DIRETO (n8n)")
+    elif isinstance(request, dict) and "polizas" in request:
+        dados_polizas = request["polizas"]
+        print("📦 Formato detectado: OBJETO COM ENVELOPE")
+    else:
+        return {"erro": "Formato inválido. Envie array ou objeto com chave 'polizas'"}
+    try:
+        callback_url = obter_callback(request, callback_url)
+        prioridade, inquilino = obter_escalonamento(request, prioridade, inquilino)
+    except ValueError as e:
+        return {"erro": str(e)}
+    
+    # A póliza decide o que entra na fila (o cliente é validado junto dela no processamento)
+    validacao = await em_executor(
+        verificar_lote, "carros", extrair_automoveis(dados_polizas), deduplicador("carros"))
+    if validacao["a_processar"] == 0:
+        return {"erro": "Nenhuma póliza nova e válida", "validacao": validacao}
+    
+    tarefa_id = str(uuid.uuid4())[:8]
+    
+    tarefas.criar({
+        "tarefa_id": tarefa_id,
+        "tipo": "completo",
+        "status": "pendente",
+        "total": len(dados_polizas),
+        "processados": 0,
+        "rejeitados": 0,
+        "duplicados": 0,
+        "callback_url": callback_url,
+        "prioridade": prioridade,
+        "inquilino": inquilino,
+        "criado_em": datetime.now().isoformat(),
+        "atualizado_em": datetime.now().isoformat()
+    })
+    
+    print(f"✅ Nova tarefa criada: {tarefa_id} ({len(dados_polizas)} pólizas com cliente)")
+    
+    await em_executor(fila.enfileirar, tarefa_id, "completo", dados_polizas, callback_url,
+                      prioridade, inquilino)
     
     return {
         "tarefa_id": tarefa_id,
         "status": "pendente",
-        "mensagem": f"Processando {len(dados_carros)} carro(s)",
-        "consultar_status": f"/api/status/{tarefa_id}"
+        "mensagem": f"Processando {validacao['a_processar']} póliza(s) com cliente",
+        "validacao": validacao,
+        "consultar_status": f"/api/status/{tarefa_id}",
+        "acompanhar": f"/api/status/{tarefa_id}/eventos"
     }
 
+def validar_item(tipo: str, item: Dict, validacao: Dict, dedup: Deduplicador, vistas: set):
+    """Acrescenta os registros de um item recebido ao relatório de validação do upload"""
+    for registro in EXTRATORES[tipo]([item]):
+        validacao["total"] += 1
+        avisos = []
+        normalizado, erros = validar_registro(tipo, registro, avisos)
+        if erros:
+            validacao["rejeitados"].append({"indice": validacao["total"], "erros": erros})
+            continue
+        validacao["validos"] += 1
+        if avisos:
+            validacao["baixa_confianca"].append({"indice": validacao["total"], "avisos": avisos})
+        impressao, chave = dedup.identificar(normalizado)
+        if impressao in vistas or dedup.indice.contem(impressao):
+            validacao["duplicados"].append({"indice": validacao["total"], "chave": chave})
+        vistas.add(impressao)
+
+def iniciar_upload(arquivo: str):
+    """Marca de upload em andamento e arquivo do lote aberto para escrita (roda no executor)"""
+    # Se a API cair no meio, o lote não roda pela metade
+    open(arquivo + ".parcial", "w").close()
+    return open(arquivo, "w", encoding="utf-8")
+
+def gravar_pedaco(f, parser: ParserIncremental, tipo: str, tarefa: Dict, validacao: Dict,
+                  dedup: Deduplicador, vistas: set, pedaco: bytes, final: bool = False):
+    """
+    Itens completos de um pedaço do upload: grava no NDJSON do lote e valida
+    (roda no executor, um pedaço de até TAMANHO_BLOCO por vez)
+    """
+    itens = parser.alimentar(pedaco)
+    if final:
+        itens += parser.finalizar()
+    if not itens:
+        return
+    f.write("".join(json.dumps(item, ensure_ascii=False) + "\n" for item in itens))
+    f.flush()
+    tarefa["total"] += len(itens)
+    # Validação já na chegada (o relatório sai na resposta do upload)
+    for item in itens:
+        validar_item(tipo, item, validacao, dedup, vistas)
+
+async def receber_lote_stream(request: Request, tipo: str, callback_url: Optional[str] = None,
+                              prioridade: Optional[str] = None, inquilino: Optional[str] = None):
+    """
+    Grava o corpo (array, envelope ou NDJSON) em data/lote_<id>.ndjson
+    conforme os pedaços chegam; a tarefa entra na fila logo no início e
+    o consumidor já processa os primeiros registros durante o upload.
+    Leitura, gravação e validação rodam no executor, um bloco por vez.
+    """
+    tarefa_id = str(uuid.uuid4())[:8]
+    arquivo = arquivo_lote(tarefa_id)
+    os.makedirs(PASTA_LOTES, exist_ok=True)
+
+    tarefa = {
+        "tarefa_id": tarefa_id,
+        "tipo": tipo,
+        "status": "pendente",
+        "total": 0,
+        "processados": 0,
+        "rejeitados": 0,
+        "duplicados": 0,
+        "recebendo": True,
+        "callback_url": callback_url,
+        "prioridade": prioridade,
+        "inquilino": inquilino,
+        "criado_em": datetime.now().isoformat(),
+        "atualizado_em": datetime.now().isoformat()
+    }
+    # O contador "total" é atualizado direto neste dicionário (é o mesmo do armazém)
+    tarefas.criar(tarefa)
+    validacao = {"total": 0, "validos": 0, "rejeitados": [], "baixa_confianca": [],
+                 "duplicados": []}
+
+    f = await em_executor(iniciar_upload, arquivo)
+    uploads_ativos.add(tarefa_id)
+    gravar = partial(gravar_pedaco, f, ParserIncremental(), tipo, tarefa, validacao,
+                     deduplicador(tipo), set())
+    try:
+        await em_executor(fila.enfileirar, tarefa_id, tipo, {"arquivo": arquivo}, callback_url,
+                          prioridade, inquilino)
+        print(f"✅ Nova tarefa criada: {tarefa_id} (recebendo {tipo} em streaming)")
+        try:
+            pedacos, tamanho = [], 0
+            async for pedaco in request.stream():
+                pedacos.append(pedaco)
+                tamanho += len(pedaco)
+                if tamanho >= TAMANHO_BLOCO:
+                    await em_executor(gravar, b"".join(pedacos))
+                    pedacos, tamanho = [], 0
+            await em_executor(gravar, b"".join(pedacos), True)
+        except Exception as e:
+            print(f"❌ Upload da tarefa {tarefa_id} interrompido: {e}")
+            tarefas.atualizar(tarefa_id, erro=f"Upload incompleto: {e}")
+            return {"erro": f"JSON inválido ou incompleto: {e}", "tarefa_id": tarefa_id}
+        else:
+            # Antes de sair de uploads_ativos: o consumidor não pode ver o marcador
+            await em_executor(os.remove, arquivo + ".parcial")
+        finally:
+            uploads_ativos.discard(tarefa_id)
+            tarefas.atualizar(tarefa_id, recebendo=False)
+    finally:
+        f.close()
+
+    print(f"📥 Upload da tarefa {tarefa_id} concluído: {tarefa['total']} {tipo}")
+
+    return {
+        "tarefa_id": tarefa_id,
+        "status": tarefa["status"],
+        "mensagem": f"Recebido(s) {tarefa['total']} registro(s) de {tipo}",
+        "validacao": validacao,
+        "consultar_status": f"/api/status/{tarefa_id}",
+        "acompanhar": f"/api/status/{tarefa_id}/eventos"
+    }
+
+@app.post("/api/clientes/stream")
+async def api_cadastrar_clientes_stream(request: Request, callback_url: Optional[str] = None,
+                                        prioridade: Optional[str] = None, inquilino: Optional[str] = None):
+    """Lotes grandes de clientes: corpo chunked em array, envelope ou NDJSON"""
+    try:
+        callback_url = obter_callback(None, callback_url)
+        prioridade, inquilino = obter_escalonamento(None, prioridade, inquilino)
+    except ValueError as e:
+        return {"erro": str(e)}
+    return await receber_lote_stream(request, "clientes", callback_url, prioridade, inquilino)
+
+@app.post("/api/carros/stream")
+async def api_cadastrar_carros_stream(request: Request, callback_url: Optional[str] = None,
+                                      prioridade: Optional[str] = None, inquilino: Optional[str] = None):
+    """Lotes grandes de carros: corpo chunked em array, envelope ou NDJSON"""
+    try:
+        callback_url = obter_callback(None, callback_url)
+        prioridade, inquilino = obter_escalonamento(None, prioridade, inquilino)
+    except ValueError as e:
+        return {"erro": str(e)}
+    return await receber_lote_stream(request, "carros", callback_url, prioridade, inquilino)
+
+def converter_planilha(tarefa_id: str, tipo: str, planilha: str, mapeamento: Optional[Dict]):
+    """
+    Planilha salva -> lote NDJSON da tarefa, linha a linha, validando cada item
+
+    Returns:
+        (itens gravados, relatório de validação)
+    """
+    validacao = {"total": 0, "validos": 0, "rejeitados": [], "baixa_confianca": [],
+                 "duplicados": []}
+    dedup, vistas, total = deduplicador(tipo), set(), 0
+    with open(arquivo_lote(tarefa_id), "w", encoding="utf-8") as f:
+        for item in iterar_planilha(planilha, tipo, mapeamento):
+            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+            total += 1
+            validar_item(tipo, item, validacao, dedup, vistas)
+    validacao["a_processar"] = validacao["validos"] - len(validacao["duplicados"])
+    return total, validacao
+
+async def receber_planilha(arquivo: UploadFile, tipo: str, mapeamento: Optional[str],
+                           callback_url: Optional[str], prioridade: Optional[str],
+                           inquilino: Optional[str]):
+    """
+    Grava a planilha (CSV/XLSX) em data/planilha_<id>.<ext> em pedaços,
+    converte linha a linha para data/lote_<id>.ndjson e enfileira o lote
+    """
+    extensao = os.path.splitext(arquivo.filename or "")[1].lower()
+    if extensao not in EXTENSOES:
+        return {"erro": f"Formato não suportado: {arquivo.filename} (use {', '.join(EXTENSOES)})"}
+    try:
+        callback_url = obter_callback(None, callback_url)
+        prioridade, inquilino = obter_escalonamento(None, prioridade, inquilino)
+        colunas = json.loads(mapeamento) if mapeamento else None
+        if colunas is not None and not isinstance(colunas, dict):
+            raise ValueError("mapeamento deve ser um objeto {coluna: caminho}")
+    except json.JSONDecodeError as e:
+        return {"erro": f"mapeamento inválido: {e}"}
+    except ValueError as e:
+        return {"erro": str(e)}
+
+    tarefa_id = str(uuid.uuid4())[:8]
+    os.makedirs(PASTA_LOTES, exist_ok=True)
+    planilha = os.path.join(PASTA_LOTES, f"planilha_{tarefa_id}{extensao}")
+    with open(planilha, "wb") as f:
+        while pedaco := await arquivo.read(TAMANHO_BLOCO):
+            f.write(pedaco)
+
+    try:
+        total, validacao = await em_executor(converter_planilha, tarefa_id, tipo, planilha, colunas)
+    except Exception as e:
+        print(f"❌ Planilha da tarefa {tarefa_id} inválida: {e}")
+        if os.path.exists(arquivo_lote(tarefa_id)):
+            os.remove(arquivo_lote(tarefa_id))
+        return {"erro": f"Planilha inválida: {e}"}
+    if validacao["a_processar"] == 0:
+        os.remove(arquivo_lote(tarefa_id))
+        return {"erro": f"Nenhum registro de {tipo} novo e válido", "validacao": validacao}
+
+    tarefas.criar({
+        "tarefa_id": tarefa_id,
+        "tipo": tipo,
+        "status": "pendente",
+        "total": total,
+        "processados": 0,
+        "rejeitados": 0,
+        "duplicados": 0,
+        "callback_url": callback_url,
+        "prioridade": prioridade,
+        "inquilino": inquilino,
+        "criado_em": datetime.now().isoformat(),
+        "atualizado_em": datetime.now().isoformat()
+    })
+    await em_executor(fila.enfileirar, tarefa_id, tipo, {"arquivo": arquivo_lote(tarefa_id)},
+                      callback_url, prioridade, inquilino)
+    print(f"✅ Nova tarefa criada: {tarefa_id} ({total} {tipo} de {arquivo.filename})")
+
+    return {
+        "tarefa_id": tarefa_id,
+        "status": "pendente",
+        "mensagem": f"Processando {validacao['a_processar']} registro(s) de {tipo} da planilha",
+        "validacao": validacao,
+        "consultar_status": f"/api/status/{tarefa_id}",
+        "acompanhar": f"/api/status/{tarefa_id}/eventos"
+    }
+
+@app.post("/api/clientes/planilha")
+async def api_cadastrar_clientes_planilha(arquivo: UploadFile = File(...),
+                                          mapeamento: Optional[str] = Form(None),
+                                          callback_url: Optional[str] = None,
+                                          prioridade: Optional[str] = None,
+                                          inquilino: Optional[str] = None):
+    """
+    Clientes de uma planilha do back office (multipart: arquivo=.csv/.xlsx)
+
+    mapeamento (campo do formulário, opcional): JSON {"Coluna": "datos_cliente.campo"}
+    somado a data/mapeamento_colunas.json (ver importacao_planilha.py)
+    """
+    return await receber_planilha(arquivo, "clientes", mapeamento, callback_url,
+                                  prioridade, inquilino)
+
+@app.post("/api/carros/planilha")
+async def api_cadastrar_carros_planilha(arquivo: UploadFile = File(...),
+                                        mapeamento: Optional[str] = Form(None),
+                                        callback_url: Optional[str] = None,
+                                        prioridade: Optional[str] = None,
+                                        inquilino: Optional[str] = None):
+    """
+    Pólizas de uma planilha do back office (multipart: arquivo=.csv/.xlsx)
+
+    mapeamento (campo do formulário, opcional): JSON {"Coluna": "datos_vehiculo.campo"}
+    somado a data/mapeamento_colunas.json (ver importacao_planilha.py)
+    """
+    return await receber_planilha(arquivo, "carros", mapeamento, callback_url,
+                                  prioridade, inquilino)
+
 @app.get("/api/status/{tarefa_id}")
 def obter_status(tarefa_id: str):
     """Consultar status de uma tarefa"""
-    if tarefa_id not in tarefas_memoria:
-        return {"erro": "Tarefa não encontrada", "tarefa_id": tarefa_id}
+    tarefa = tarefas.obter(tarefa_id)
+    if tarefa is None:
+        # Tarefas de antes de um reinício só existem na fila durável
+        tarefa = fila.obter(tarefa_id)
+        if tarefa is None:
+            return {"erro": "Tarefa não encontrada", "tarefa_id": tarefa_id}
+        return {
+            "tarefa_id": tarefa_id,
+            "tipo": tarefa["tipo"],
+            "status": tarefa["status"],
+            "total": contar_registros(tarefa["payload"]),
+            "processados": checkpoints.primeiro_pendente(tarefa_id) - 1,
+            "erro": tarefa["erro"],
+        }
     
-    return tarefas_memoria[tarefa_id]
+    return tarefa
+
+@app.get("/api/status/{tarefa_id}/eventos")
+async def acompanhar_tarefa(tarefa_id: str, request: Request):
+    """
+    Progresso da tarefa em Server-Sent Events (substitui o polling do status)
+
+    event: status   -> estado completo da tarefa (primeiro evento e a cada mudança)
+    event: registro -> resultado de cada registro (indice, status, processados, total)
+    O stream fecha depois do status final (concluido ou erro).
+    """
+    # Assinar antes de ler o estado: nada publicado entre os dois se perde
+    fila_eventos = difusor.assinar(tarefa_id)
+    estado = await em_executor(obter_status, tarefa_id)
+    if "erro" in estado and "status" not in estado:
+        difusor.cancelar(tarefa_id, fila_eventos)
+        return JSONResponse(status_code=404, content=estado)
+
+    async def gerar():
+        try:
+            yield formatar_sse("status", {"evento": "status", **estado})
+            if estado["status"] in STATUS_FINAIS:
+                return
+            while not await request.is_disconnected():
+                try:
+                    evento = await asyncio.wait_for(fila_eventos.get(), INTERVALO_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield formatar_sse(evento["evento"], evento)
+                if evento["evento"] == "status" and evento["status"] in STATUS_FINAIS:
+                    return
+        finally:
+            difusor.cancelar(tarefa_id, fila_eventos)
+
+    return StreamingResponse(gerar(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/api/status/{tarefa_id}/registros")
+def obter_registros(tarefa_id: str):
+    """Resultado de cada registro já tentado (checkpoints)"""
+    return {
+        "tarefa_id": tarefa_id,
+        **checkpoints.resumo(tarefa_id),
+        "proximo_indice": checkpoints.primeiro_pendente(tarefa_id),
+        "registros": checkpoints.listar(tarefa_id)
+    }
+
+@app.get("/api/status/{tarefa_id}/resultados")
+def obter_resultados(tarefa_id: str, offset: int = 0, limite: int = 100):
+    """
+    Linhas do arquivo de resultados da tarefa (output/resultados_<id>.jsonl),
+    a partir de `offset`; para conciliar lotes grandes página por página
+    """
+    if tarefa_id not in tarefas and resultados.total(tarefa_id) == 0:
+        return JSONResponse(status_code=404, content={"erro": "Tarefa não encontrada"})
+    return {"tarefa_id": tarefa_id, **resultados.ler(tarefa_id, offset, limite)}
+
+@app.post("/api/tarefas/{tarefa_id}/retomar")
+def retomar_tarefa(tarefa_id: str):
+    """Recoloca na fila uma tarefa com erro; ela continua do primeiro registro pendente"""
+    if not fila.reabrir(tarefa_id):
+        return {"erro": "Tarefa não encontrada ou não está com erro", "tarefa_id": tarefa_id}
+
+    if not tarefas.atualizar(tarefa_id, status="pendente", erro=None):
+        registrar_tarefa_da_fila(fila.obter(tarefa_id))
+    publicar_status(tarefa_id)
+
+    return {
+        "tarefa_id": tarefa_id,
+        "status": "pendente",
+        "retomar_de": checkpoints.primeiro_pendente(tarefa_id)
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Métricas no formato do Prometheus (login, registros, seções, teclas, sleep, fila)"""
+    return PlainTextResponse(metricas.expor(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/fila")
+def status_fila():
+    """Profundidade da fila, tempo de espera e tempo virtual de cada prioridade/inquilino"""
+    return {
+        **fila.estatisticas(),
+        "em_execucao": {a["agente_id"]: a["tarefa_atual"] for a in despachante.estado()
+                        if a["tarefa_atual"]},
+        "escalonamento": despachante.escalonador.estado(),
+    }
 
 @app.get("/api/tarefas")
-def listar_tarefas(status: Optional[str] = None):
-    """Listar todas as tarefas"""
-    tarefas = list(tarefas_memoria.values())
-    
-    if status:
-        tarefas = [t for t in tarefas if t["status"] == status]
+def listar_tarefas(status: Optional[str] = None, limite: int = LIMITE_PAGINA,
+                   cursor: Optional[str] = None):
+    """
+    Listar tarefas (mais recentes primeiro), em páginas
     
-    # Ordenar por data (mais recentes primeiro)
-    tarefas.sort(key=lambda x: x["criado_em"], reverse=True)
+    Passe o `proximo_cursor` da resposta em `cursor` para a página seguinte
+    """
+    try:
+        pagina, proximo = tarefas.pagina(status, limite, cursor)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"erro": str(e)})
     
-    return {"total": len(tarefas), "tarefas": tarefas}
+    return {"total": tarefas.contar(status), "tarefas": pagina, "proximo_cursor": proximo}
+
+# ============================================
+# AGENTES (frota de máquinas com vClient)
+# ============================================
+
+class RegistroAgente(BaseModel):
+    agente_id: str
+    tipos: Optional[List[str]] = None
+
+class Heartbeat(BaseModel):
+    tarefa_id: Optional[str] = None
+
+class ProgressoAgente(BaseModel):
+    indice: int
+    status: str
+    erro: Optional[str] = None
+    impressao: Optional[str] = None
+    duracao: Optional[float] = None
+    avisos: List[str] = []
+
+class ConclusaoAgente(BaseModel):
+    status: str
+    erro: Optional[str] = None
+
+def sem_arrendamento(agente_id: str, tarefa_id: str):
+    return JSONResponse(status_code=409, content={
+        "erro": "Agente não tem o arrendamento desta tarefa",
+        "tarefa_id": tarefa_id, "agente_id": agente_id, "cancelar": True})
+
+@app.get("/api/agentes")
+def listar_agentes():
+    """Agentes registrados, último heartbeat e tarefa em execução"""
+    return {"agentes": despachante.estado()}
+
+@app.post("/api/agentes")
+def registrar_agente(registro: RegistroAgente):
+    """Um agente (agente_automacao.py) entra na frota"""
+    despachante.registrar(registro.agente_id, registro.tipos)
+    return {
+        "agente_id": registro.agente_id,
+        "intervalo_heartbeat": min(despachante.duracao_lease, despachante.limite_heartbeat) / 3
+    }
+
+@app.delete("/api/agentes/{agente_id}")
+def remover_agente(agente_id: str):
+    """Saída limpa: as tarefas do agente voltam para a fila"""
+    return {"agente_id": agente_id, "devolvidas": despachante.remover(agente_id)}
+
+@app.post("/api/agentes/{agente_id}/heartbeat")
+def heartbeat_agente(agente_id: str, heartbeat: Heartbeat):
+    return despachante.heartbeat(agente_id, heartbeat.tarefa_id)
+
+@app.post("/api/agentes/{agente_id}/solicitar")
+def solicitar_tarefa(agente_id: str):
+    """Arrenda a próxima tarefa da fila para o agente"""
+    if agente_id not in despachante.agentes:
+        return JSONResponse(status_code=404, content={"erro": "Agente não registrado"})
+    tarefa = despachante.solicitar(agente_id)
+    if tarefa is None:
+        return {"tarefa": None}
+
+    tarefa_id = tarefa["tarefa_id"]
+    if tarefa_id not in tarefas:
+        registrar_tarefa_da_fila(tarefa)
+    tarefas.atualizar(tarefa_id, status="processando", agente=agente_id)
+    publicar_status(tarefa_id)
+    return {
+        "tarefa": {
+            "tarefa_id": tarefa_id,
+            "tipo": tarefa["tipo"],
+            "inicio": checkpoints.primeiro_pendente(tarefa_id),
+            "lote": f"/api/agentes/{agente_id}/tarefas/{tarefa_id}/lote",
+        }
+    }
+
+@app.get("/api/agentes/{agente_id}/tarefas/{tarefa_id}/lote")
+def lote_da_tarefa(agente_id: str, tarefa_id: str):
+    """Registros da tarefa em NDJSON (em streaming, mesmo durante um upload)"""
+    if not despachante.tem_arrendamento(agente_id, tarefa_id):
+        return sem_arrendamento(agente_id, tarefa_id)
+    registros = registros_da_tarefa(tarefa_id, fila.obter(tarefa_id)["payload"])
+    linhas = (json.dumps(item, ensure_ascii=False) + "\n" for item in registros)
+    return StreamingResponse(linhas, media_type="application/x-ndjson")
+
+@app.post("/api/agentes/{agente_id}/tarefas/{tarefa_id}/progresso")
+def progresso_agente(agente_id: str, tarefa_id: str, progresso: ProgressoAgente):
+    """Resultado de um registro processado por um agente remoto"""
+    if not despachante.tem_arrendamento(agente_id, tarefa_id):
+        return sem_arrendamento(agente_id, tarefa_id)
+    progresso_tarefa(tarefa_id)(progresso.indice, progresso.model_dump(exclude={"indice"}))
+    # O agente mede o resto localmente; aqui entra só o resultado do registro
+    metricas.REGISTROS.inc(tipo=tarefas.obter(tarefa_id)["tipo"], resultado=progresso.status)
+    # ceder=True: o agente para antes do próximo registro e chama /ceder
+    return {"ok": True,
+            "ceder": despachante.registrar_progresso(agente_id, tarefa_id, progresso.status)}
+
+@app.post("/api/agentes/{agente_id}/tarefas/{tarefa_id}/ceder")
+def ceder_tarefa_agente(agente_id: str, tarefa_id: str):
+    """O agente parou para outra prioridade/inquilino: a tarefa volta para a fila"""
+    if not despachante.ceder(agente_id, tarefa_id):
+        return sem_arrendamento(agente_id, tarefa_id)
+    tarefas.atualizar(tarefa_id, status="pendente", agente=None)
+    publicar_status(tarefa_id)
+    return {"ok": True}
+
+@app.post("/api/agentes/{agente_id}/tarefas/{tarefa_id}/concluir")
+def concluir_tarefa_agente(agente_id: str, tarefa_id: str, conclusao: ConclusaoAgente):
+    """Resultado final de uma tarefa executada por um agente remoto"""
+    if not despachante.concluir(agente_id, tarefa_id, conclusao.status, conclusao.erro):
+        return sem_arrendamento(agente_id, tarefa_id)
+    if tarefas.atualizar(tarefa_id, status=conclusao.status, erro=conclusao.erro):
+        publicar_status(tarefa_id)
+    print(f"{'✅' if conclusao.status == 'concluido' else '❌'} Tarefa {tarefa_id} "
+          f"finalizada pelo agente {agente_id}: {conclusao.status}")
+    return {"ok": True}
 
 # ============================================
 # FUNÇÕES DE BACKGROUND
 # ============================================
 
-def processar_clientes_background(tarefa_id: str, dados_json: List[Dict]):
+def progresso_tarefa(tarefa_id: str, agente_id: Optional[str] = None):
     """
-    Executa automação de clientes em background
+    Callback chamado após cada registro: salva checkpoint e atualiza o status
+
+    agente_id: agente local executando a tarefa; se o despachante pedir para
+    ceder a vez, levanta TarefaCedida (a tarefa retoma pelo checkpoint)
+    """
+    def ao_progresso(indice: int, resultado: Dict):
+        checkpoints.salvar(tarefa_id, indice, resultado["status"], resultado.get("erro"))
+        resultados.anexar(tarefa_id, indice, resultado)
+        tarefa = tarefas.obter(tarefa_id)
+        if tarefa is None:
+            return
+        campos = {"ultimo_indice": indice}
+        if resultado["status"] == "invalido":
+            campos["rejeitados"] = tarefa.get("rejeitados", 0) + 1
+        if resultado["status"] == "duplicado":
+            campos["duplicados"] = tarefa.get("duplicados", 0) + 1
+        if resultado["status"] in ("ok", "invalido", "duplicado"):
+            campos["processados"] = checkpoints.primeiro_pendente(tarefa_id) - 1
+        tarefas.atualizar(tarefa_id, **campos)
+        tarefa.update(campos)
+        difusor.publicar(tarefa_id, {
+            "evento": "registro", "tarefa_id": tarefa_id, "indice": indice,
+            "status": resultado["status"], "erro": resultado.get("erro"),
+            "processados": tarefa["processados"], "total": tarefa["total"],
+        })
+        if agente_id and despachante.registrar_progresso(agente_id, tarefa_id, resultado["status"]):
+            raise TarefaCedida(f"Tarefa {tarefa_id} cedeu a vez no registro {indice}")
+    return ao_progresso
+
+def tarefa_cedida(tarefa_id: str, e: TarefaCedida) -> str:
+    """A tarefa local volta para a fila: status 'pendente' até ser arrendada de novo"""
+    print(f"⏸️  {e}")
+    tarefas.atualizar(tarefa_id, status="pendente", agente=None)
+    publicar_status(tarefa_id)
+    return "cedida"
+
+def processar_clientes_background(tarefa_id: str, payload: Union[List[Dict], Dict]):
+    """
+    Executa automação de clientes (chamada pelo consumidor da fila)
     Chama diretamente a função processar_clientes()
     """
     try:
         print(f"🔄 Iniciando processamento da tarefa {tarefa_id}")
         
-        # Atualizar status
-        tarefas_memoria[tarefa_id]["status"] = "processando"
-        tarefas_memoria[tarefa_id]["atualizado_em"] = datetime.now().isoformat()
+        # Atualizar status (tarefas antigas podem já ter saído da memória)
+        if tarefa_id not in tarefas:
+            registrar_tarefa_da_fila(fila.obter(tarefa_id))
+        tarefas.atualizar(tarefa_id, status="processando")
+        publicar_status(tarefa_id)
         
         # ⭐ AQUI É QUE A MÁGICA ACONTECE!
         # Chamar SUA automação passando os dados
-        processar_clientes(dados_json=dados_json)
+        inicio = checkpoints.primeiro_pendente(tarefa_id)
+        processar_clientes(dados_json=registros_da_tarefa(tarefa_id, payload), inicio=inicio,
+                           ao_progresso=progresso_tarefa(tarefa_id, "local"))
         
         # Sucesso!
-        tarefas_memoria[tarefa_id]["status"] = "concluido"
-        tarefas_memoria[tarefa_id]["processados"] = tarefas_memoria[tarefa_id]["total"]
-        tarefas_memoria[tarefa_id]["atualizado_em"] = datetime.now().isoformat()
+        tarefas.atualizar(tarefa_id, status="concluido")
+        publicar_status(tarefa_id)
         
         print(f"✅ Tarefa {tarefa_id} concluída com sucesso!")
+        return "concluido"
         
+    except TarefaCedida as e:
+        return tarefa_cedida(tarefa_id, e)
     except Exception as e:
         print(f"❌ Erro na tarefa {tarefa_id}: {e}")
         import traceback
         traceback.print_exc()
         
-        tarefas_memoria[tarefa_id]["status"] = "erro"
-        tarefas_memoria[tarefa_id]["erro"] = str(e)
-        tarefas_memoria[tarefa_id]["atualizado_em"] = datetime.now().isoformat()
+        tarefas.atualizar(tarefa_id, status="erro", erro=str(e))
+        publicar_status(tarefa_id)
+        return "erro"
 
-def processar_carros_background(tarefa_id: str, dados_json: List[Dict]):
+def processar_carros_background(tarefa_id: str, payload: Union[List[Dict], Dict]):
     """
-    Executa automação de carros em background
+    Executa automação de carros (chamada pelo consumidor da fila)
     """
     try:
         print(f"🔄 Iniciando processamento da tarefa {tarefa_id}")
         
-        tarefas_memoria[tarefa_id]["status"] = "processando"
-        tarefas_memoria[tarefa_id]["atualizado_em"] = datetime.now().isoformat()
+        if tarefa_id not in tarefas:
+            registrar_tarefa_da_fila(fila.obter(tarefa_id))
+        tarefas.atualizar(tarefa_id, status="processando")
+        publicar_status(tarefa_id)
         
         # ⭐ Chamar automação de carros
-        processar_automoveis(dados_json=dados_json)
+        inicio = checkpoints.primeiro_pendente(tarefa_id)
+        processar_automoveis(dados_json=registros_da_tarefa(tarefa_id, payload), inicio=inicio,
+                             ao_progresso=progresso_tarefa(tarefa_id, "local"))
+        
+        tarefas.atualizar(tarefa_id, status="concluido")
+        publicar_status(tarefa_id)
+        
+        print(f"✅ Tarefa {tarefa_id} concluída com sucesso!")
+        return "concluido"
+        
+    except TarefaCedida as e:
+        return tarefa_cedida(tarefa_id, e)
+    except Exception as e:
+        print(f"❌ Erro na tarefa {tarefa_id}: {e}")
+        import traceback
+        traceback.print_exc()
+        
+        tarefas.atualizar(tarefa_id, status="erro", erro=str(e))
+        publicar_status(tarefa_id)
+        return "erro"
+
+def processar_completo_background(tarefa_id: str, payload: Union[List[Dict], Dict]):
+    """
+    Executa cliente + póliza na mesma sessão (chamada pelo consumidor da fila)
+    """
+    try:
+        print(f"🔄 Iniciando processamento da tarefa {tarefa_id}")
+        
+        if tarefa_id not in tarefas:
+            registrar_tarefa_da_fila(fila.obter(tarefa_id))
+        tarefas.atualizar(tarefa_id, status="processando")
+        publicar_status(tarefa_id)
+        
+        inicio = checkpoints.primeiro_pendente(tarefa_id)
+        processar_completo(dados_json=registros_da_tarefa(tarefa_id, payload), inicio=inicio,
+                           ao_progresso=progresso_tarefa(tarefa_id, "local"))
         
-        tarefas_memoria[tarefa_id]["status"] = "concluido"
-        tarefas_memoria[tarefa_id]["processados"] = tarefas_memoria[tarefa_id]["total"]
-        tarefas_memoria[tarefa_id]["atualizado_em"] = datetime.now().isoformat()
+        tarefas.atualizar(tarefa_id, status="concluido")
+        publicar_status(tarefa_id)
         
         print(f"✅ Tarefa {tarefa_id} concluída com sucesso!")
+        return "concluido"
         
+    except TarefaCedida as e:
+        return tarefa_cedida(tarefa_id, e)
     except Exception as e:
         print(f"❌ Erro na tarefa {tarefa_id}: {e}")
         import traceback
         traceback.print_exc()
         
-        tarefas_memoria[tarefa_id]["status"] = "erro"
-        tarefas_memoria[tarefa_id]["erro"] = str(e)
-        tarefas_memoria[tarefa_id]["atualizado_em"] = datetime.now().isoformat()
+        tarefas.atualizar(tarefa_id, status="erro", erro=str(e))
+        publicar_status(tarefa_id)
+        return "erro"
 
 # ============================================
 # INICIAR SERVIDOR
@@ -260,12 +1130,23 @@ if __name__ == "__main__":
     📡 Endpoints:
     • POST /api/clientes  → Cadastrar clientes
     • POST /api/carros    → Cadastrar carros
+    • POST /api/completo  → Cliente (se faltar) + póliza na mesma sessão
+    • POST /api/clientes/stream, /api/carros/stream → Lotes grandes (NDJSON/chunked)
+    • POST /api/clientes/planilha, /api/carros/planilha → Planilha CSV/XLSX (multipart)
     • GET  /api/status/{id} → Ver status
-    • GET  /api/tarefas   → Listar todas
+    • GET  /api/status/{id}/eventos → Progresso ao vivo (SSE)
+    • GET  /api/status/{id}/resultados?offset=&limite= → Resultado de cada registro (output/)
+    • ?callback_url=...   → POST com o resultado quando a tarefa terminar
+    • ?prioridade=urgente|normal|lote&inquilino=... → Divisão justa dos agentes
+    • GET  /api/tarefas   → Listar (páginas com ?limite=&cursor=)
+    • GET  /api/fila      → Profundidade da fila
+    • POST /api/tarefas/{id}/retomar → Retomar tarefa com erro
+    • GET  /api/agentes   → Frota de agentes (agente_automacao.py)
+    • GET  /metrics       → Métricas (Prometheus)
     
     ✅ ACEITA FORMATO DIRETO DO n8n (array)!
     ✅ ACEITA FORMATO COM ENVELOPE (objeto)!
-    ⚡ Sem SQLite - Armazena em memória
+    💾 Fila durável em data/fila_tarefas.db (uma tarefa por vez em cada agente)
     
     Ctrl+C para parar
     """)
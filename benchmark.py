@@ -0,0 +1,296 @@
+"""
+BENCHMARK - Carga sintética e medição ponta a ponta sem desktop
+Gera N automóveis e N clientes no formato de carros.json e
+clientes_exemplo_multiplos.json (passando por todos os tipos de cliente,
+categorias, coberturas e zonas), roda processar_automoveis e
+processar_clientes com DriverGravacao e mede, por registro:
+- teclas enviadas
+- tempo simulado (entrada, pausas e esperas)
+- fração do tempo parado em sleep
+- registros por hora projetados (sem contar o login)
+
+Esperas de prontidão sem condição configurada (data/prontidao.json) custam
+o sleep fixo inteiro, como na automação real.
+
+Cada execução é acrescentada em output/benchmark.jsonl com a versão (git)
+e comparada com a anterior, para regressões aparecerem entre versões.
+
+Uso:
+    python benchmark.py [--n 50] [--semente 42]
+"""
+import contextlib
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import rastro
+from automacao_carros_corrigida_testes import processar_automoveis
+from automacao_clientes_corrigida_testes import processar_clientes
+from dropdowns import obter_dropdown
+from driver_entrada import DriverGravacao
+from idempotencia import IndiceIdempotencia
+
+
+ARQUIVO_HISTORICO = os.path.join('output', 'benchmark.jsonl')
+
+# Variação acima disso (para pior) entre duas execuções é destacada
+LIMITE_REGRESSAO = 0.05
+
+NOMES = ("MARIA", "JUAN", "ANA", "CARLOS", "LUCIA", "DIEGO", "SOFIA", "MARTIN",
+         "VALENTINA", "PABLO", "CAMILA", "GONZALO", "MARIA DE LOS ANGELES", "JOSE LUIS")
+SOBRENOMES = ("RODRIGUEZ", "GONZALEZ", "FERNANDEZ", "LUQUE DELBONO", "PEREZ", "MARTINEZ",
+              "SILVA", "PEREIRA", "SOSA", "SUAREZ", "DA SILVA", "NUÑEZ", "BENITEZ")
+MARCAS = ("KIA MOTORS PICANTO 1.1 MPFI DIR. A/A. BLOQ", "CHEVROLET ONIX 1.4 LT",
+          "VOLKSWAGEN GOL 1.6 POWER", "FIAT FIORINO 1.4 FIRE", "TOYOTA HILUX 2.8 D/C 4X4",
+          "SUZUKI CELERIO 1.0 GL", "RENAULT KANGOO 1.6 EXPRESS", "HYUNDAI HB20 1.6 COMFORT",
+          "YAMAHA YBR 125", "SCANIA R450 6X2")
+COMBUSTIVEIS = ("NAF", "GAS", "ELE", "HIB")
+CALLES = ("Filadelfia M26 Solar 10", "Av. Italia 3456", "18 de Julio 1234 apto 502",
+          "Rambla Rep. de Mexico 5510", "Camino Carrasco 7821", "Bvar. Artigas 998")
+LOCALIDADES = ("San José de Carrasco", "Montevideo", "Ciudad de la Costa", "Las Piedras",
+               "Maldonado", "Salto", "Paysandú")
+DEPARTAMENTOS = ("Canelones", "Montevideo", "Maldonado", "Salto", "Paysandu", "Colonia")
+
+
+def _opcoes(nome):
+    return obter_dropdown(nome).opcoes
+
+
+def _escolher(rng, opcoes, i):
+    """Percorre todas as opções em ordem (cobertura) e sorteia a partir da segunda volta"""
+    return opcoes[i] if i < len(opcoes) else rng.choice(opcoes)
+
+
+def _digitos(rng, n):
+    return ''.join(rng.choice('0123456789') for _ in range(n))
+
+
+def _nome(rng):
+    return f"{rng.choice(SOBRENOMES)}, {rng.choice(NOMES)}"
+
+
+def _domicilio(rng):
+    return f"{rng.choice(CALLES)}, {_digitos(rng, 5)} {rng.choice(LOCALIDADES)}"
+
+
+# ============================================
+# GERADORES
+# ============================================
+
+def gerar_carros(n, semente=42):
+    """N itens no formato de carros.json (pólizas e chassis únicos)"""
+    rng = random.Random(semente)
+    carros = []
+    for i in range(n):
+        moeda = rng.choice(("PES", "DOL"))
+        premio = rng.randint(8000, 90000)
+        carros.append({"output": {
+            "datos_poliza": {
+                "compania": "SAN CRISTÓBAL SEGUROS S.A.",
+                "numero_poliza": f"BENCH{semente}-{i + 1:06d}",
+                "vigencia": {"inicio": "01/01/2026", "fin": "01/01/2027"},
+            },
+            "datos_vehiculo": {
+                "marca_modelo": rng.choice(MARCAS),
+                "ano": str(rng.randint(1995, 2026)),
+                "motor": f"G4HE{_digitos(rng, 7)}",
+                "chasis": f"KNA{semente}{i + 1:06d}{_digitos(rng, 5)}",
+                "destino": _escolher(rng, _opcoes('destino'), i),
+                "categoria": _escolher(rng, _opcoes('categoria'), i),
+                "combustible": rng.choice(COMBUSTIVEIS),
+                "calidad": _escolher(rng, _opcoes('calidad'), i),
+            },
+            "datos_cobertura": {
+                "cobertura": _escolher(rng, _opcoes('cobertura'), i),
+                "moneda": moeda,
+                "deducible": rng.randint(5000, 50000),
+                "zona_circulacao_corrigida": _escolher(rng, _opcoes('zona_circulacao'), i),
+            },
+            "condiciones_pago": {
+                "premio_total": premio,
+                "total": premio,
+                "moneda": moeda,
+                "cuotas": rng.choice((1, 3, 6, 10, 12)),
+            },
+            "datos_cliente": {
+                "assegurado": _nome(rng),
+                "documento": _digitos(rng, 8),
+                "domicilio": _domicilio(rng),
+            },
+        }})
+    return carros
+
+
+def gerar_clientes(n, semente=42):
+    """N itens no formato de clientes_exemplo_multiplos.json (todos os tipos)"""
+    rng = random.Random(semente)
+    tipos = _opcoes('tipo_cliente')
+    clientes = []
+    for i in range(n):
+        tipo = tipos[i % len(tipos)]
+        cliente = {
+            "numero_cliente": f"{semente}{i + 1:08d}",
+            "assegurado": _nome(rng),
+            "corredor": "PAULO BENITEZ",
+            "celular": f"09{_digitos(rng, 7)}",
+            "email": f"cliente{i + 1}@exemplo.com.uy",
+            "tipo": tipo,
+            "domicilio": _domicilio(rng),
+            "dir_cobro": rng.choice(("none", _domicilio(rng))),
+            "Departamento": rng.choice(DEPARTAMENTOS),
+            "Observaciones": "none",
+        }
+        if tipo in ("Empresa", "Particular/Empresa"):
+            cliente["rut"] = _digitos(rng, 12)
+            cliente["razao_social"] = f"{rng.choice(SOBRENOMES)} Y ASOCIADOS S.R.L."
+        if tipo in ("Particular", "Particular/Empresa"):
+            cliente["documento"] = _digitos(rng, 8)
+            cliente["fecha_nacimiento"] = (f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/"
+                                           f"{rng.randint(1940, 2005)}")
+        if tipo == "Edificio":
+            cliente["padron"] = _digitos(rng, 6)
+        clientes.append({"output": {"datos_cliente": cliente}})
+    return clientes
+
+
+# ============================================
+# MEDIÇÃO
+# ============================================
+
+PROCESSADORES = {
+    "carros": (gerar_carros, processar_automoveis),
+    "clientes": (gerar_clientes, processar_clientes),
+}
+
+
+def medir(tipo, n, semente=42):
+    """
+    Roda um lote sintético de `tipo` num DriverGravacao novo
+
+    Returns:
+        Dicionário com as medidas por registro e do lote
+    """
+    gerar, processar = PROCESSADORES[tipo]
+    registros = gerar(n, semente)
+    driver = DriverGravacao()
+
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        resumo = processar(dados_json=registros, driver=driver,
+                           idempotencia=IndiceIdempotencia(':memory:'))
+    cpu = time.perf_counter() - inicio
+
+    por_registro = driver.resumo_por_registro().values()
+    processados = len(por_registro)
+    tempo = sum(r["tempo_total"] for r in por_registro)
+    parado = sum(r["tempo_pausa"] + r["tempo_sleep"] for r in por_registro)
+    total = driver.resumo()
+    return {
+        "registros": n,
+        "processados": processados,
+        "rejeitados": (resumo or {}).get("rejeitados", 0),
+        "teclas_por_registro": round(sum(r["teclas"] for r in por_registro) / processados, 2)
+        if processados else 0,
+        "segundos_por_registro": round(tempo / processados, 3) if processados else 0,
+        "fracao_sleep": round(parado / tempo, 4) if tempo else 0,
+        "registros_por_hora": round(3600 * processados / tempo, 1) if tempo else 0,
+        "segundos_login": round(total["tempo_total"] - tempo, 3),
+        "segundos_simulados": round(total["tempo_total"], 3),
+        "segundos_cpu": round(cpu, 3),
+    }
+
+
+def versao():
+    """Commit atual (ou 'desconhecida' fora de um repositório git)"""
+    try:
+        saida = subprocess.run(["git", "describe", "--always", "--dirty"],
+                               capture_output=True, text=True, timeout=10)
+        return saida.stdout.strip() or "desconhecida"
+    except (OSError, subprocess.SubprocessError):
+        return "desconhecida"
+
+
+def executar(n=50, semente=42):
+    # O benchmark não deve encher logs/ com o rastro de registros sintéticos
+    ativo, rastro.ATIVO = rastro.ATIVO, False
+    try:
+        resultados = {tipo: medir(tipo, n, semente) for tipo in PROCESSADORES}
+    finally:
+        rastro.ATIVO = ativo
+    return {"em": datetime.now().isoformat(timespec='seconds'), "versao": versao(),
+            "n": n, "semente": semente, "resultados": resultados}
+
+
+# ============================================
+# HISTÓRICO
+# ============================================
+
+def ultimo_resultado(n, semente, arquivo=ARQUIVO_HISTORICO):
+    """Última execução salva com os mesmos parâmetros (comparável)"""
+    if not os.path.isfile(arquivo):
+        return None
+    ultimo = None
+    with open(arquivo, encoding='utf-8') as f:
+        for linha in f:
+            try:
+                execucao = json.loads(linha)
+            except json.JSONDecodeError:
+                continue
+            if execucao.get("n") == n and execucao.get("semente") == semente:
+                ultimo = execucao
+    return ultimo
+
+
+def salvar(execucao, arquivo=ARQUIVO_HISTORICO):
+    os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+    with open(arquivo, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(execucao, ensure_ascii=False) + '\n')
+
+
+# Medidas em que um valor maior é pior
+PIOR_SE_MAIOR = ("teclas_por_registro", "segundos_por_registro", "fracao_sleep")
+
+
+def imprimir(execucao, anterior=None):
+    print(f"\n{'='*60}")
+    print(f"⏱️  BENCHMARK ({execucao['n']} registro(s) por tipo, versão {execucao['versao']})")
+    print(f"{'='*60}")
+    for tipo, r in execucao["resultados"].items():
+        antes = (anterior or {}).get("resultados", {}).get(tipo, {})
+        print(f"\n{'🚗' if tipo == 'carros' else '👤'} {tipo}: "
+              f"{r['processados']}/{r['registros']} processado(s), {r['rejeitados']} rejeitado(s)")
+        for medida, rotulo in (("teclas_por_registro", "Teclas por registro"),
+                               ("segundos_por_registro", "Segundos por registro"),
+                               ("fracao_sleep", "Fração em sleep"),
+                               ("registros_por_hora", "Registros por hora"),
+                               ("segundos_login", "Login (s)"),
+                               ("segundos_cpu", "CPU do lote (s)")):
+            linha = f"   {rotulo:<24}{r[medida]:>12}"
+            if antes.get(medida):
+                variacao = (r[medida] - antes[medida]) / antes[medida]
+                pior = variacao > 0 if medida in PIOR_SE_MAIOR else variacao < 0
+                alerta = " ⚠️" if pior and abs(variacao) > LIMITE_REGRESSAO \
+                    and medida != "segundos_cpu" else ""
+                linha += f"   ({variacao:+.1%} vs {anterior['versao']}){alerta}"
+            print(linha)
+    print(f"\n💾 Histórico: {ARQUIVO_HISTORICO}")
+    print(f"{'='*60}\n")
+
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    parametros = {"--n": 50, "--semente": 42}
+    for nome in parametros:
+        if nome in argumentos:
+            parametros[nome] = int(argumentos[argumentos.index(nome) + 1])
+    n, semente = parametros["--n"], parametros["--semente"]
+
+    anterior = ultimo_resultado(n, semente)
+    execucao = executar(n, semente)
+    salvar(execucao)
+    imprimir(execucao, anterior)
@@ -0,0 +1,89 @@
+"""
+CHECKPOINT - Resultado de cada registro de cada tarefa (SQLite)
+Permite saber exatamente quais registros já entraram no Velneo e
+retomar uma tarefa falha/interrompida no primeiro registro não concluído.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+
+ARQUIVO_CHECKPOINTS = os.path.join('data', 'checkpoints.db')
+
+# Resultado que conta como registro concluído
+OK = 'ok'
+# Registro rejeitado na validação ou já enviado antes: não é tentado de novo na retomada
+INVALIDO = 'invalido'
+DUPLICADO = 'duplicado'
+FINALIZADOS = (OK, INVALIDO, DUPLICADO)
+
+
+class RegistroCheckpoint:
+    """Checkpoints (tarefa_id, indice, resultado); índices começam em 1"""
+
+    def __init__(self, caminho=ARQUIVO_CHECKPOINTS):
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        # tarefa_id -> primeiro índice pendente já conhecido (só avança)
+        self._pendentes = {}
+        self._conn = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                tarefa_id TEXT NOT NULL,
+                indice INTEGER NOT NULL,
+                resultado TEXT NOT NULL,
+                detalhe TEXT,
+                em REAL NOT NULL,
+                PRIMARY KEY (tarefa_id, indice)
+            )
+        """)
+
+    def salvar(self, tarefa_id, indice, resultado, detalhe=None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (tarefa_id, indice, resultado, detalhe, em) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (tarefa_id, indice, resultado, detalhe, time.time()))
+            # Um índice já finalizado que volta a ficar pendente recua o cache
+            if resultado not in FINALIZADOS and indice < self._pendentes.get(tarefa_id, 1):
+                self._pendentes[tarefa_id] = indice
+
+    def primeiro_pendente(self, tarefa_id):
+        """
+        Índice do primeiro registro que ainda não foi finalizado
+
+        Parte do último valor conhecido da tarefa e avança com consultas pela
+        chave primária: chamado a cada registro, o lote todo continua O(n).
+        """
+        with self._lock:
+            proximo = self._pendentes.get(tarefa_id, 1)
+            while self._conn.execute(
+                    "SELECT 1 FROM checkpoints WHERE tarefa_id = ? AND indice = ? "
+                    "AND resultado IN (?, ?, ?)", (tarefa_id, proximo, *FINALIZADOS)).fetchone():
+                proximo += 1
+            self._pendentes[tarefa_id] = proximo
+        return proximo
+
+    def resumo(self, tarefa_id):
+        """Contagem por resultado e último índice registrado"""
+        with self._lock:
+            linhas = self._conn.execute(
+                "SELECT resultado, COUNT(*), MAX(indice) FROM checkpoints "
+                "WHERE tarefa_id = ? GROUP BY resultado", (tarefa_id,)).fetchall()
+        return {
+            "por_resultado": {resultado: total for resultado, total, _ in linhas},
+            "ultimo_indice": max((ultimo for _, _, ultimo in linhas), default=0),
+        }
+
+    def listar(self, tarefa_id):
+        with self._lock:
+            linhas = self._conn.execute(
+                "SELECT indice, resultado, detalhe, em FROM checkpoints "
+                "WHERE tarefa_id = ? ORDER BY indice", (tarefa_id,)).fetchall()
+        return [
+            {"indice": i, "resultado": r, "detalhe": d, "em": em}
+            for i, r, d, em in linhas
+        ]
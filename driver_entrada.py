@@ -0,0 +1,278 @@
+"""
+DRIVERS DE ENTRADA - Camada de teclado/tempo usada pelas automações
+Permite trocar o PyAutoGUI (padrão) por um driver de gravação que apenas
+registra as ações com tempo simulado, para medir e testar sem desktop.
+"""
+import time
+
+
+# Pausa que o PyAutoGUI aplica depois de cada chamada (pyautogui.PAUSE)
+PAUSA_PADRAO = 0.8
+
+
+class DriverEntrada:
+    """
+    Interface comum dos drivers de entrada
+
+    Os métodos seguem os nomes do PyAutoGUI para que as automações
+    troquem `pyautogui.press(...)` por `driver.press(...)` sem mudar a lógica.
+    """
+
+    pausa = PAUSA_PADRAO
+    simulado = False
+
+    def press(self, tecla, vezes=1, intervalo=0.0):
+        raise NotImplementedError
+
+    def write(self, texto, interval=0.0):
+        raise NotImplementedError
+
+    def hotkey(self, *teclas):
+        raise NotImplementedError
+
+    def colar(self, texto):
+        """Cola o texto pela área de transferência. Padrão: digita sem intervalo"""
+        self.write(texto)
+
+    def sleep(self, segundos):
+        raise NotImplementedError
+
+    def pixel(self, x, y):
+        """Cor RGB do pixel da tela (usado pelas esperas de prontidão)"""
+        raise NotImplementedError
+
+    def localizar(self, imagem, regiao=None, confianca=None):
+        """Caixa (x, y, w, h) da imagem na tela, ou None"""
+        raise NotImplementedError
+
+    def capturar(self, regiao=None):
+        """PIL.Image da região (x, y, w, h) da tela (usado pelas sondas de tela)"""
+        raise NotImplementedError
+
+    def marcar(self, evento, **dados):
+        """Marca um ponto da execução (ex: início de registro). Padrão: nada"""
+        pass
+
+    def agora(self):
+        """Relógio monotônico usado nas métricas (segundos)"""
+        return time.monotonic()
+
+
+class DriverPyAutoGUI(DriverEntrada):
+    """Driver real: envia as teclas para o desktop via PyAutoGUI"""
+
+    def __init__(self, pausa=PAUSA_PADRAO, failsafe=True):
+        # Import tardio: em Linux headless o pyautogui nem importa sem display
+        import pyautogui
+        self._pyautogui = pyautogui
+        pyautogui.FAILSAFE = failsafe
+        self.pausa = pausa
+
+    @property
+    def pausa(self):
+        return self._pyautogui.PAUSE
+
+    @pausa.setter
+    def pausa(self, valor):
+        self._pyautogui.PAUSE = valor
+
+    def press(self, tecla, vezes=1, intervalo=0.0):
+        self._pyautogui.press(tecla, presses=vezes, interval=intervalo)
+
+    def write(self, texto, interval=0.0):
+        self._pyautogui.write(texto, interval=interval)
+
+    def hotkey(self, *teclas):
+        self._pyautogui.hotkey(*teclas)
+
+    def colar(self, texto):
+        # pyperclip já vem com o pyautogui (dependência do mouseinfo)
+        import pyperclip
+        pyperclip.copy(texto)
+        self._pyautogui.hotkey('ctrl', 'v')
+
+    def sleep(self, segundos):
+        time.sleep(segundos)
+
+    def pixel(self, x, y):
+        return self._pyautogui.pixel(x, y)
+
+    def localizar(self, imagem, regiao=None, confianca=None):
+        kwargs = {"region": regiao}
+        if confianca is not None:
+            kwargs["confidence"] = confianca  # requer opencv
+        try:
+            return self._pyautogui.locateOnScreen(imagem, **kwargs)
+        except self._pyautogui.ImageNotFoundException:
+            return None
+
+    def capturar(self, regiao=None):
+        return self._pyautogui.screenshot(region=regiao)
+
+
+class DriverGravacao(DriverEntrada):
+    """
+    Driver de gravação (dry-run): não toca no teclado
+
+    Cada ação é guardada em `acoes` com o instante simulado em que
+    aconteceria, reproduzindo o custo do PyAutoGUI:
+    - press: vezes * (tempo_tecla + intervalo) + pausa
+    - write: len(texto) * (tempo_tecla + interval) + pausa
+    - colar: Ctrl+V (2 teclas) + tempo_colar + pausa
+    - sleep: os próprios segundos (sem pausa)
+    - espera de prontidão: tempos_prontidao[nome] (ou tempo_prontidao_padrao);
+      sem condição de prontidão para a tela, o sleep fixo (fallback) inteiro
+
+    Args:
+        pausa: Equivalente ao pyautogui.PAUSE
+        tempo_tecla: Custo simulado de cada tecla física
+        tempo_colar: Custo simulado de copiar o texto para a área de transferência
+        tempos_prontidao: Segundos até cada tela ficar pronta, por nome de espera
+    """
+
+    simulado = True
+
+    def __init__(self, pausa=PAUSA_PADRAO, tempo_tecla=0.01, tempos_prontidao=None,
+                 tempo_prontidao_padrao=0.3, tempo_colar=0.05):
+        self.pausa = pausa
+        self.tempo_tecla = tempo_tecla
+        self.tempo_colar = tempo_colar
+        self.tempos_prontidao = tempos_prontidao or {}
+        self.tempo_prontidao_padrao = tempo_prontidao_padrao
+        self.relogio = 0.0
+        self.acoes = []
+        self.registro = None
+
+    def _gravar(self, tipo, valor, teclas, tempo_entrada, tempo_pausa, tempo_sleep):
+        duracao = tempo_entrada + tempo_pausa + tempo_sleep
+        self.acoes.append({
+            "tipo": tipo,
+            "valor": valor,
+            "registro": self.registro,
+            "inicio": self.relogio,
+            "duracao": duracao,
+            "teclas": teclas,
+            "tempo_entrada": tempo_entrada,
+            "tempo_pausa": tempo_pausa,
+            "tempo_sleep": tempo_sleep,
+        })
+        self.relogio += duracao
+
+    def press(self, tecla, vezes=1, intervalo=0.0):
+        self._gravar("press", tecla, vezes,
+                     vezes * (self.tempo_tecla + intervalo), self.pausa, 0.0)
+
+    def write(self, texto, interval=0.0):
+        texto = str(texto)
+        self._gravar("write", texto, len(texto),
+                     len(texto) * (self.tempo_tecla + interval), self.pausa, 0.0)
+
+    def hotkey(self, *teclas):
+        self._gravar("hotkey", "+".join(teclas), len(teclas),
+                     len(teclas) * self.tempo_tecla, self.pausa, 0.0)
+
+    def colar(self, texto):
+        self._gravar("colar", str(texto), 2,
+                     2 * self.tempo_tecla + self.tempo_colar, self.pausa, 0.0)
+
+    def sleep(self, segundos):
+        self._gravar("sleep", segundos, 0, 0.0, 0.0, segundos)
+
+    def pixel(self, x, y):
+        return None
+
+    def localizar(self, imagem, regiao=None, confianca=None):
+        return None
+
+    def capturar(self, regiao=None):
+        return None
+
+    def simular_prontidao(self, nome, fallback, com_condicao=True):
+        """
+        Espera de prontidão simulada: custa o tempo configurado para a tela
+
+        Args:
+            com_condicao: Há condição de prontidão para a tela; sem ela a
+                automação real dorme o fallback inteiro
+        """
+        if nome in self.tempos_prontidao:
+            duracao = self.tempos_prontidao[nome]
+        elif com_condicao:
+            duracao = min(fallback, self.tempo_prontidao_padrao)
+        else:
+            duracao = fallback
+        self._gravar("aguardar", nome, 0, 0.0, 0.0, duracao)
+        return duracao
+
+    def simular_conferencia(self, nome):
+        """Conferência de campo simulada: a captura da região é desprezível"""
+        return True
+
+    def marcar(self, evento, **dados):
+        if evento == "registro":
+            self.registro = dados.get("indice")
+        self.acoes.append({
+            "tipo": "marca",
+            "valor": evento,
+            "registro": self.registro,
+            "inicio": self.relogio,
+            "duracao": 0.0,
+            "teclas": 0,
+            "tempo_entrada": 0.0,
+            "tempo_pausa": 0.0,
+            "tempo_sleep": 0.0,
+            "dados": dados,
+        })
+
+    @staticmethod
+    def _somar(acoes):
+        return {
+            "acoes": sum(1 for a in acoes if a["tipo"] != "marca"),
+            "teclas": sum(a["teclas"] for a in acoes),
+            "tempo_total": sum(a["duracao"] for a in acoes),
+            "tempo_entrada": sum(a["tempo_entrada"] for a in acoes),
+            "tempo_pausa": sum(a["tempo_pausa"] for a in acoes),
+            "tempo_sleep": sum(a["tempo_sleep"] for a in acoes),
+        }
+
+    def resumo(self):
+        """Totais da execução inteira"""
+        return self._somar(self.acoes)
+
+    def resumo_por_registro(self):
+        """Totais agrupados pelo índice marcado com marcar('registro', indice=i)"""
+        grupos = {}
+        for acao in self.acoes:
+            if acao["registro"] is not None:
+                grupos.setdefault(acao["registro"], []).append(acao)
+        return {indice: self._somar(acoes) for indice, acoes in grupos.items()}
+
+    def agora(self):
+        # Tempo simulado: as métricas de um dry-run medem o custo projetado
+        return self.relogio
+
+    def limpar(self):
+        self.relogio = 0.0
+        self.acoes = []
+        self.registro = None
+
+
+# ============================================
+# DRIVER PADRÃO
+# ============================================
+
+_driver_padrao = None
+
+
+def obter_driver():
+    """Driver usado quando a automação não recebe um explicitamente"""
+    global _driver_padrao
+    if _driver_padrao is None:
+        _driver_padrao = DriverPyAutoGUI()
+    return _driver_padrao
+
+
+def definir_driver(driver):
+    """Troca o driver padrão (ex: DriverGravacao para medir sem desktop)"""
+    global _driver_padrao
+    _driver_padrao = driver
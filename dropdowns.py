@@ -0,0 +1,201 @@
+"""
+DROPDOWNS - Registro das listas do Velneo e seleção com o mínimo de teclas
+As tabelas (categoria, destino, calidad, cobertura, zona...) ficam aqui,
+fora do loop de registros. Para cada opção o seletor calcula a sequência
+de teclas mais barata entre:
+- andar com 'down'/'up' a partir da posição atual (como era antes)
+- HOME ou END e depois uma caminhada curta
+- digitar o início do texto (busca por prefixo do combo) e ajustar com 'down'
+- digitar o texto inteiro (só em combos editáveis)
+"""
+import unicodedata
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from plano_acoes import marca, tecla, texto
+
+
+# Estratégias de seleção
+CAMINHAR = 'caminhar'
+HOME_END = 'home_end'
+PREFIXO = 'prefixo'
+DIGITAR = 'digitar'
+
+
+@dataclass
+class Dropdown:
+    """
+    Uma lista suspensa do formulário
+
+    `opcoes` segue a ordem do dropdown. O índice de cada opção começa em 1:
+    com o combo recém focado, o primeiro item requer 1 'down' (posição 0).
+
+    Args:
+        nome: Nome do campo no registro
+        opcoes: Textos na ordem do dropdown
+        estrategias: Estratégias que o combo aceita
+        aliases: Outros valores aceitos -> opção real
+        aproximado: Aceita a opção mais parecida (resolvedor_opcoes) quando não há igual
+    """
+    nome: str
+    opcoes: List[str]
+    estrategias: Tuple[str, ...] = (CAMINHAR, HOME_END, PREFIXO)
+    aliases: Dict[str, str] = field(default_factory=dict)
+    aproximado: bool = True
+
+    def __post_init__(self):
+        self.mapa = {opcao: i for i, opcao in enumerate(self.opcoes, 1)}
+
+    def indice(self, valor) -> Optional[int]:
+        valor = self.aliases.get(valor, valor)
+        return self.mapa.get(valor)
+
+
+def normalizar_texto(valor) -> str:
+    """Maiúsculas, sem acentos e com espaços simples"""
+    sem_acento = unicodedata.normalize('NFKD', str(valor))
+    sem_acento = ''.join(c for c in sem_acento if not unicodedata.combining(c))
+    return ' '.join(sem_acento.upper().split())
+
+
+# ============================================
+# REGISTRO
+# ============================================
+
+REGISTRO_DROPDOWNS = {d.nome: d for d in [
+    Dropdown('categoria', [
+        "AMBULANCIA", "AUTOMOVIL", "CABINA EXTENDIDA", "CAMION", "CAMIONETA",
+        "CASA RODANTE", "CHATA", "CISTERNA", "CUADRICICLOS", "DOBLE CABINA",
+        "EXCAVADORA", "FURGON", "JEEP", "MAQ. AUTOMOTRIZ", "MINI BUS", "MOTO",
+        "MOTORHOME", "OMNIBUS", "PICK UP", "REMOLQUE", "RETROEXCAVADORA", "RURAL",
+        "SEMIREMOLQUE", "TRACTOR", "TRAILER",
+    ]),
+    Dropdown('destino', [
+        "ALQUILER SIN CHOFER", "AUXILIO MECANICO", "COMERCIAL", "EASY GO Y UBER",
+        "PARTICULAR", "PARTICULAR Y TRABAJO", "PASEO", "PLACER", "REMISE",
+        "TAXIMETROS", "TRABAJO", "TRABAJO PERSONAL", "UBER",
+    ]),
+    Dropdown('calidad', [
+        "ARRENDATARIO", "PR. COMPRADOR", "PROPIETARIO", "USUARIO",
+    ]),
+    Dropdown('cobertura', [
+        "BASICA", "TERCEROS", "TERC.+ROBO+INCENDIO", "TODO RIESGO",
+        "T=H+I [RC USD 200,000]", "BASICA+ AUXILIO", "RC- BASICA", "RC- ESTANDAR",
+        "RC- PLUS", "T=H+I/ C1", "T=H+I/ C PLUS", "T=H+I/ C MEGA",
+        "TODO RIESGO/ D1", "TODO RIESGO/D4", "TODO RIESGO/ D PLUS",
+    ]),
+    Dropdown('zona_circulacao', [
+        "AMBITO NACIONAL E INTERNACIONAL", "ARGENTINA", "ARTIGAS", "CANELONES",
+        "CANELONES NORTE", "CANELONES SUR", "CERRO LARGO", "CIUDAD DE LA COSTA",
+        "COLONIA", "COSTA DE ORO", "DURAZNO", "FLORES", "FLORIDA", "MALILEA",
+        "MALDONADO", "MONTEVIDEO", "OTROS", "PAYSANDU", "RESTO DEL PAIS",
+        "RIO NEGRO", "RIVERA", "ROCHA", "SALTO", "SAN JOSE",
+        "SOLO AMBITO NACIONAL", "SORIANO", "TACUAREMBO", "TREINTA Y TRES",
+    ]),
+    # Textos reais do combo de tipo não são conhecidos: só caminhada.
+    # O tipo muda os campos do formulário: nada de opção "parecida"
+    Dropdown('tipo_cliente', [
+        "Empresa", "Particular", "Particular/Empresa", "Edificio", "Prospecto",
+    ], estrategias=(CAMINHAR,), aliases={"Otro": "Particular", "Copropiedad": "Prospecto"},
+        aproximado=False),
+]}
+
+
+def obter_dropdown(nome) -> Dropdown:
+    return REGISTRO_DROPDOWNS[nome]
+
+
+# ============================================
+# SELEÇÃO
+# ============================================
+
+def _caminhar(de, para):
+    if para > de:
+        return [tecla('down', para - de)]
+    if para < de:
+        return [tecla('up', de - para)]
+    return []
+
+
+def _custo(acoes):
+    total = 0
+    for acao in acoes:
+        total += acao.vezes if acao.tipo == 'tecla' else len(acao.valor)
+    return total
+
+
+def _primeiro_com_prefixo(dropdown, prefixo):
+    for i, opcao in enumerate(dropdown.opcoes, 1):
+        if opcao.upper().startswith(prefixo):
+            return i
+    return None
+
+
+def candidatos(dropdown: Dropdown, alvo: int, posicao: int = 0):
+    """Todas as sequências possíveis para chegar em `alvo`, com a estratégia usada"""
+    estrategias = dropdown.estrategias
+    resultado = []
+
+    if CAMINHAR in estrategias:
+        resultado.append((CAMINHAR, _caminhar(posicao, alvo)))
+
+    if HOME_END in estrategias:
+        resultado.append((HOME_END, [tecla('home')] + _caminhar(1, alvo)))
+        resultado.append((HOME_END, [tecla('end')] + _caminhar(len(dropdown.opcoes), alvo)))
+
+    if PREFIXO in estrategias:
+        rotulo = dropdown.opcoes[alvo - 1].upper()
+        for tamanho in range(1, len(rotulo) + 1):
+            prefixo = rotulo[:tamanho]
+            if ' ' in prefixo:
+                # Espaço abre a lista do combo em vez de continuar a busca
+                break
+            inicio = _primeiro_com_prefixo(dropdown, prefixo)
+            # O prefixo tem que ser digitado de uma vez (a busca do combo expira)
+            resultado.append((PREFIXO, [texto(prefixo)] + _caminhar(inicio, alvo)))
+            if inicio == alvo:
+                break
+
+    if DIGITAR in estrategias:
+        resultado.append((DIGITAR, [texto(dropdown.opcoes[alvo - 1])]))
+
+    return resultado
+
+
+def sequencia_minima(dropdown: Dropdown, valor, posicao: int = 0):
+    """
+    Sequência de teclas mais barata para escolher `valor`
+
+    Returns:
+        (estrategia, acoes) ou None se o valor não existe no dropdown.
+        Em empate vence a estratégia listada primeiro (caminhar é a mais segura).
+    """
+    alvo = dropdown.indice(valor)
+    if alvo is None:
+        return None
+    return _melhor_sequencia(dropdown.nome, alvo, posicao)
+
+
+@lru_cache(maxsize=None)
+def _melhor_sequencia(nome, alvo, posicao):
+    # Calculado uma vez por opção; os registros seguintes reaproveitam
+    return min(candidatos(REGISTRO_DROPDOWNS[nome], alvo, posicao), key=lambda c: _custo(c[1]))
+
+
+def selecionar(acoes, nome, valor, rotulo=None):
+    """Adiciona ao plano as teclas para escolher `valor` no dropdown `nome`"""
+    rotulo = rotulo or nome.replace('_', ' ').capitalize()
+    escolha = sequencia_minima(obter_dropdown(nome), valor)
+    if escolha is None:
+        print(f"   ⚠️ {rotulo} desconhecida: {valor}")
+        # O formulário fica com a opção padrão; o aviso vai para o resultado do registro
+        acoes.append(marca('aviso', campo=nome, valor=valor, mensagem=f"{rotulo} desconhecida: {valor}"))
+        return False
+    estrategia, sequencia = escolha
+    acoes.append(marca('dropdown', campo=nome, valor=valor, estrategia=estrategia,
+                       teclas=_custo(sequencia)))
+    # Cópias: a sequência vem do cache e é compartilhada entre registros
+    acoes.extend(replace(a, dados={**a.dados, "campo": nome}) for a in sequencia)
+    print(f"   ✅ {rotulo} selecionada: {valor} ({estrategia}, {_custo(sequencia)} tecla(s))")
+    return True
@@ -0,0 +1,94 @@
+"""
+ENTRADA DE TEXTO - Como cada campo do formulário recebe o texto
+- colar: área de transferência + Ctrl+V (uma ação só, aceita acentos)
+- rapido: digitação sem intervalo entre caracteres
+- pausado: digitação com o intervalo compilado no plano (campos com
+  autocompletar, combos e tudo que não tiver política)
+
+A política é por nome de campo (o `campo` de plano_acoes.texto) e pode
+ser ajustada em data/entrada_texto.json:
+
+{
+  "domicilio": "colar",
+  "localidad": "pausado"
+}
+"""
+import json
+import os
+
+
+ARQUIVO_POLITICA = os.path.join('data', 'entrada_texto.json')
+
+COLAR = 'colar'
+RAPIDO = 'rapido'
+PAUSADO = 'pausado'
+MODOS = (COLAR, RAPIDO, PAUSADO)
+
+# Campos de texto livre (longos, com acentos) e identificadores curtos.
+# Departamento, localidad, categoria, corredor e moneda autocompletam
+# enquanto se digita: ficam de fora (pausado).
+POLITICA_CAMPOS = {
+    # Texto livre
+    'domicilio': COLAR,
+    'dir_cobro': COLAR,
+    'email': COLAR,
+    'observaciones': COLAR,
+    'assegurado': COLAR,
+    'razao_social': COLAR,
+    'marca_modelo': COLAR,
+    # Números e códigos
+    'numero_cliente': RAPIDO,
+    'documento': RAPIDO,
+    'rut': RAPIDO,
+    'padron': RAPIDO,
+    'telefono': RAPIDO,
+    'celular': RAPIDO,
+    'fecha_nacimiento': RAPIDO,
+    'codigo_postal': RAPIDO,
+    'numero_poliza': RAPIDO,
+    'ano': RAPIDO,
+    'motor': RAPIDO,
+    'chasis': RAPIDO,
+    'deducible': RAPIDO,
+    'cuotas': RAPIDO,
+    'total': RAPIDO,
+    'premio_total': RAPIDO,
+}
+
+_politica = dict(POLITICA_CAMPOS)
+
+
+def definir_modo(campo, modo):
+    if modo not in MODOS:
+        raise ValueError(f"modo de entrada inválido: {modo!r} (use {', '.join(MODOS)})")
+    _politica[campo] = modo
+
+
+def modo_texto(campo, valor):
+    """
+    Modo de entrada para `valor` no campo `campo`
+
+    Texto com acentos num campo 'rapido' é colado: a digitação do
+    PyAutoGUI não envia caracteres fora do ASCII de forma confiável.
+    """
+    modo = _politica.get(campo, PAUSADO) if campo else PAUSADO
+    if modo == RAPIDO and not str(valor).isascii():
+        return COLAR
+    return modo
+
+
+def carregar_politica(arquivo=ARQUIVO_POLITICA):
+    """Aplica as políticas do JSON de configuração (se existir)"""
+    if not os.path.exists(arquivo):
+        return 0
+    with open(arquivo, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    for campo, modo in config.items():
+        try:
+            definir_modo(campo, modo)
+        except ValueError as e:
+            print(f"   ⚠️ {campo}: {e}")
+    return len(config)
+
+
+carregar_politica()
@@ -0,0 +1,113 @@
+"""
+ESCALONAMENTO - Divisão justa dos agentes entre prioridades e inquilinos
+Cada tarefa pertence a um fluxo (prioridade, inquilino). Em vez de FIFO,
+os agentes atendem os fluxos por enfileiramento justo ponderado (start-time
+fair queuing), com o registro como unidade de trabalho:
+- cada registro processado custa 1/peso ao fluxo (peso pela prioridade)
+- a próxima tarefa arrendada é a do fluxo com a menor etiqueta de início
+- uma tarefa em execução cede a vez (volta para a fila e retoma pelo
+  checkpoint) quando gastou a sua fatia e outro fluxo está na frente
+- 'urgente' não espera fatia: a tarefa em execução cede no próximo registro,
+  então um registro urgente espera no máximo um registro de cada agente
+
+Um lote de 500 pólizas renovadas não segura mais um cadastro urgente por
+horas; e dois inquilinos com lotes grandes dividem os agentes meio a meio.
+"""
+import threading
+
+
+# Peso de cada prioridade (fatia de registros proporcional)
+PESOS = {"urgente": 8, "normal": 2, "lote": 1}
+PRIORIDADE_PADRAO = "normal"
+URGENTE = "urgente"
+
+# Tempo virtual que uma tarefa roda antes de ceder a vez (5 registros de
+# 'lote', 10 de 'normal', 40 de 'urgente'): trocar de tarefa custa navegação
+FATIA = 5.0
+
+
+def fluxo(tarefa):
+    """(prioridade, inquilino) de uma tarefa da fila"""
+    return (tarefa.get("prioridade") or PRIORIDADE_PADRAO, tarefa.get("inquilino") or "")
+
+
+def validar_prioridade(prioridade):
+    """Prioridade informada (ou a padrão); ValueError se não existir"""
+    prioridade = prioridade or PRIORIDADE_PADRAO
+    if prioridade not in PESOS:
+        raise ValueError(f"prioridade inválida: {prioridade!r} (use {', '.join(PESOS)})")
+    return prioridade
+
+
+class EscalonadorJusto:
+    """
+    Etiquetas de tempo virtual por fluxo
+
+    Args:
+        pesos: {prioridade: peso}
+        fatia: Tempo virtual que uma tarefa roda antes de poder ceder
+    """
+
+    def __init__(self, pesos=PESOS, fatia=FATIA):
+        self.pesos = pesos
+        self.fatia = fatia
+        self.termino = {}    # fluxo -> etiqueta de término do último registro
+        self.rodada = {}     # fluxo -> etiqueta de início da vez atual
+        self.virtual = 0.0   # etiqueta de início do registro em serviço
+        self._lock = threading.Lock()
+
+    def peso(self, f):
+        return self.pesos.get(f[0], self.pesos[PRIORIDADE_PADRAO])
+
+    def _inicio(self, f):
+        return max(self.virtual, self.termino.get(f, self.virtual))
+
+    def escolher(self, cabecas):
+        """
+        seq da tarefa a arrendar
+
+        Args:
+            cabecas: Tarefa pendente mais antiga de cada fluxo ({"seq", "prioridade", "inquilino"})
+        """
+        if not cabecas:
+            return None
+        with self._lock:
+            escolhida = min(cabecas, key=lambda c: (self._inicio(fluxo(c)),
+                                                    -self.peso(fluxo(c)), c["seq"]))
+            f = fluxo(escolhida)
+            self.virtual = self._inicio(f)
+            self.rodada[f] = self.virtual
+        return escolhida["seq"]
+
+    def cobrar(self, f, registros=1):
+        """Registra registros processados pelo fluxo `f`"""
+        with self._lock:
+            inicio = self._inicio(f)
+            self.virtual = inicio
+            self.termino[f] = inicio + registros / self.peso(f)
+
+    def deve_ceder(self, f, cabecas):
+        """
+        A tarefa do fluxo `f` deve voltar para a fila agora?
+
+        Args:
+            cabecas: Pendentes que o mesmo agente poderia pegar (ver escolher)
+        """
+        outras = [fluxo(c) for c in cabecas if fluxo(c) != f]
+        if not outras:
+            return False
+        if f[0] != URGENTE and any(o[0] == URGENTE for o in outras):
+            return True
+        with self._lock:
+            proximo = self._inicio(f)
+            if proximo - self.rodada.get(f, proximo) < self.fatia:
+                return False
+            return min(self._inicio(o) for o in outras) <= proximo
+
+    def estado(self):
+        with self._lock:
+            return {
+                "tempo_virtual": round(self.virtual, 3),
+                "fluxos": [{"prioridade": f[0], "inquilino": f[1], "termino": round(t, 3)}
+                           for f, t in sorted(self.termino.items(), key=lambda i: i[1])],
+            }
@@ -0,0 +1,70 @@
+"""
+EVENTOS - Progresso das tarefas empurrado para quem está ouvindo
+A automação roda em threads (agente local, endpoints síncronos) e publica
+cada registro concluído e cada mudança de status; as conexões SSE da API
+(GET /api/status/{tarefa_id}/eventos) esperam numa asyncio.Queue no event
+loop. publicar() pode ser chamado de qualquer thread e nunca bloqueia.
+"""
+import asyncio
+import json
+import threading
+
+
+# Status em que a tarefa não muda mais (o stream fecha depois deles)
+STATUS_FINAIS = ("concluido", "erro")
+
+# Eventos guardados por conexão lenta; acima disso os mais antigos são descartados
+TAMANHO_FILA = 1000
+
+
+def _entregar(fila, evento):
+    """Roda no event loop da conexão"""
+    if fila.full():
+        fila.get_nowait()
+    fila.put_nowait(evento)
+
+
+class DifusorEventos:
+    """Assinantes por tarefa (cada um é uma asyncio.Queue num event loop)"""
+
+    def __init__(self, tamanho_fila=TAMANHO_FILA):
+        self.tamanho_fila = tamanho_fila
+        self._assinantes = {}
+        self._lock = threading.Lock()
+
+    def assinar(self, tarefa_id):
+        """Chamado dentro do event loop; retorna a fila de eventos da conexão"""
+        fila = asyncio.Queue(maxsize=self.tamanho_fila)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._assinantes.setdefault(tarefa_id, set()).add((loop, fila))
+        return fila
+
+    def cancelar(self, tarefa_id, fila):
+        with self._lock:
+            assinantes = self._assinantes.get(tarefa_id, set())
+            assinantes.difference_update({a for a in assinantes if a[1] is fila})
+            if not assinantes:
+                self._assinantes.pop(tarefa_id, None)
+
+    def assinantes(self, tarefa_id=None):
+        with self._lock:
+            if tarefa_id is not None:
+                return len(self._assinantes.get(tarefa_id, ()))
+            return sum(len(a) for a in self._assinantes.values())
+
+    def publicar(self, tarefa_id, evento):
+        """Entrega `evento` (dict) a todos que ouvem a tarefa"""
+        with self._lock:
+            assinantes = list(self._assinantes.get(tarefa_id, ()))
+        for loop, fila in assinantes:
+            try:
+                loop.call_soon_threadsafe(_entregar, fila, evento)
+            except RuntimeError:
+                # Event loop já encerrado: a conexão morreu junto
+                self.cancelar(tarefa_id, fila)
+
+
+def formatar_sse(evento, dados):
+    """Um evento no formato text/event-stream"""
+    return f"event: {evento}\ndata: {json.dumps(dados, ensure_ascii=False, default=str)}\n\n"
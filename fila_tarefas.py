@@ -0,0 +1,264 @@
+"""
+FILA DE TAREFAS - Fila durável (SQLite em modo WAL) com arrendamentos
+As tarefas sobrevivem a reinícios da API. Cada tarefa é arrendada (lease)
+por um agente de automação por um tempo limitado; o agente renova o
+arrendamento com heartbeats e, se sumir, a tarefa volta para a fila e
+retoma pelo checkpoint em outro agente (ver frota.py).
+
+Cada tarefa tem uma prioridade e um inquilino (quem enviou); a ordem entre
+eles é decidida pelo escalonador justo (ver escalonamento.py).
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+ARQUIVO_FILA = os.path.join('data', 'fila_tarefas.db')
+
+
+class FilaTarefas:
+    """
+    Fila persistente de tarefas
+
+    Status: 'pendente' -> 'processando' -> 'concluido' | 'erro'
+    """
+
+    def __init__(self, caminho=ARQUIVO_FILA):
+        self.caminho = caminho
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._nova_tarefa = threading.Event()
+        self._conn = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS tarefas (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                tarefa_id TEXT UNIQUE NOT NULL,
+                tipo TEXT NOT NULL,
+                status TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                criado_em REAL NOT NULL,
+                iniciado_em REAL,
+                concluido_em REAL,
+                erro TEXT,
+                agente TEXT,
+                lease_ate REAL,
+                callback TEXT,
+                prioridade TEXT,
+                inquilino TEXT
+            )
+        """)
+        # Bancos criados antes dos arrendamentos (webhooks, prioridades) não têm as colunas novas
+        colunas = {linha["name"] for linha in self._conn.execute("PRAGMA table_info(tarefas)")}
+        for coluna, tipo in (("agente", "TEXT"), ("lease_ate", "REAL"), ("callback", "TEXT"),
+                             ("prioridade", "TEXT"), ("inquilino", "TEXT")):
+            if coluna not in colunas:
+                self._conn.execute(f"ALTER TABLE tarefas ADD COLUMN {coluna} {tipo}")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tarefas_status ON tarefas (status, seq)")
+
+    def enfileirar(self, tarefa_id, tipo, payload, callback=None, prioridade=None,
+                   inquilino=None):
+        """
+        Args:
+            callback: URL avisada quando a tarefa terminar (ver webhooks.py)
+            prioridade: 'urgente', 'normal' ou 'lote' (ver escalonamento.py)
+            inquilino: Quem enviou (cliente/fluxo de trabalho), dividido de forma justa
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO tarefas (tarefa_id, tipo, status, payload, criado_em, callback, "
+                "prioridade, inquilino) VALUES (?, ?, 'pendente', ?, ?, ?, ?, ?)",
+                (tarefa_id, tipo, json.dumps(payload, ensure_ascii=False), time.time(), callback,
+                 prioridade, inquilino))
+        self._nova_tarefa.set()
+
+    @staticmethod
+    def _filtro_tipos(tipos):
+        if tipos is None:
+            return "", []
+        return f" AND tipo IN ({','.join('?' * len(tipos))})", list(tipos)
+
+    def _cabecas(self, tipos):
+        filtro, parametros = self._filtro_tipos(tipos)
+        linhas = self._conn.execute(
+            f"SELECT MIN(seq) AS seq, prioridade, inquilino FROM tarefas "
+            f"WHERE status = 'pendente'{filtro} GROUP BY prioridade, inquilino",
+            parametros).fetchall()
+        return [dict(l) for l in linhas]
+
+    def cabecas(self, tipos=None):
+        """Tarefa pendente mais antiga de cada (prioridade, inquilino): {"seq", "prioridade", "inquilino"}"""
+        with self._lock:
+            return self._cabecas(tipos)
+
+    def arrendar(self, agente_id, duracao, tipos=None, escolher=None):
+        """
+        Retira uma tarefa pendente para `agente_id` (marcando como 'processando')
+
+        Args:
+            agente_id: Agente que vai executar a tarefa
+            duracao: Segundos até o arrendamento expirar sem heartbeat
+            tipos: Tipos de tarefa que o agente aceita (None = todos)
+            escolher: funcao(cabecas) -> seq (ver escalonamento.py); None = a mais antiga
+        """
+        filtro, parametros = self._filtro_tipos(tipos)
+        with self._lock:
+            if escolher is not None:
+                seq = escolher(self._cabecas(tipos))
+                linha = self._conn.execute(
+                    "SELECT * FROM tarefas WHERE seq = ?", (seq,)).fetchone() if seq else None
+            else:
+                linha = self._conn.execute(
+                    f"SELECT * FROM tarefas WHERE status = 'pendente'{filtro} ORDER BY seq LIMIT 1",
+                    parametros).fetchone()
+            if linha is None:
+                return None
+            agora = time.time()
+            self._conn.execute(
+                "UPDATE tarefas SET status = 'processando', iniciado_em = ?, agente = ?, "
+                "lease_ate = ? WHERE seq = ?",
+                (agora, agente_id, agora + duracao, linha["seq"]))
+            linha = self._conn.execute(
+                "SELECT * FROM tarefas WHERE seq = ?", (linha["seq"],)).fetchone()
+        return self._converter(linha)
+
+    def renovar(self, tarefa_id, agente_id, duracao):
+        """Estende o arrendamento; False se a tarefa não é mais deste agente"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE tarefas SET lease_ate = ? "
+                "WHERE tarefa_id = ? AND agente = ? AND status = 'processando'",
+                (time.time() + duracao, tarefa_id, agente_id))
+        return cursor.rowcount > 0
+
+    def concluir(self, tarefa_id, status, erro=None, agente_id=None):
+        """
+        Finaliza a tarefa
+
+        Args:
+            agente_id: Se informado, só conclui se o agente ainda tem o arrendamento
+        """
+        consulta = ("UPDATE tarefas SET status = ?, concluido_em = ?, erro = ?, lease_ate = NULL "
+                    "WHERE tarefa_id = ?")
+        parametros = [status, time.time(), erro, tarefa_id]
+        if agente_id is not None:
+            consulta += " AND agente = ? AND status = 'processando'"
+            parametros.append(agente_id)
+        with self._lock:
+            cursor = self._conn.execute(consulta, parametros)
+        return cursor.rowcount > 0
+
+    def devolver(self, tarefa_id, agente_id):
+        """A tarefa cede a vez: volta para a fila (retoma pelo checkpoint) sem perder o lugar"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE tarefas SET status = 'pendente', iniciado_em = NULL, agente = NULL, "
+                "lease_ate = NULL WHERE tarefa_id = ? AND agente = ? AND status = 'processando'",
+                (tarefa_id, agente_id))
+        if cursor.rowcount:
+            self._nova_tarefa.set()
+        return cursor.rowcount > 0
+
+    def liberar(self, agente_id=None, expiradas=False):
+        """
+        Devolve para a fila tarefas em andamento (elas retomam pelo checkpoint)
+
+        Args:
+            agente_id: Tarefas deste agente (ex: agente sem heartbeat)
+            expiradas: Tarefas cujo arrendamento já venceu
+
+        Returns:
+            Lista de tarefa_id devolvidos
+        """
+        condicoes, parametros = [], []
+        if agente_id is not None:
+            condicoes.append("agente = ?")
+            parametros.append(agente_id)
+        if expiradas:
+            condicoes.append("(lease_ate IS NULL OR lease_ate < ?)")
+            parametros.append(time.time())
+        onde = " AND ".join(["status = 'processando'"] + condicoes)
+        with self._lock:
+            ids = [l[0] for l in self._conn.execute(
+                f"SELECT tarefa_id FROM tarefas WHERE {onde}", parametros)]
+            if ids:
+                self._conn.execute(
+                    f"UPDATE tarefas SET status = 'pendente', iniciado_em = NULL, agente = NULL, "
+                    f"lease_ate = NULL WHERE {onde}", parametros)
+        if ids:
+            self._nova_tarefa.set()
+        return ids
+
+    def reabrir(self, tarefa_id):
+        """Devolve uma tarefa com erro para a fila (ela retoma pelo checkpoint)"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE tarefas SET status = 'pendente', iniciado_em = NULL, erro = NULL, agente = NULL "
+                "WHERE tarefa_id = ? AND status = 'erro'", (tarefa_id,))
+        if cursor.rowcount:
+            self._nova_tarefa.set()
+        return cursor.rowcount > 0
+
+    def recuperar_interrompidas(self, agentes_locais=()):
+        """
+        Na subida da API: tarefas dos agentes locais (que caíram junto) e
+        arrendamentos vencidos voltam para a fila. Agentes remotos continuam
+        com as suas até o arrendamento vencer.
+        """
+        recuperadas = self.liberar(expiradas=True)
+        for agente_id in agentes_locais:
+            recuperadas += self.liberar(agente_id=agente_id)
+        return len(recuperadas)
+
+    def obter(self, tarefa_id):
+        with self._lock:
+            linha = self._conn.execute(
+                "SELECT * FROM tarefas WHERE tarefa_id = ?", (tarefa_id,)).fetchone()
+        return self._converter(linha) if linha else None
+
+    def pendentes(self):
+        with self._lock:
+            linhas = self._conn.execute(
+                "SELECT * FROM tarefas WHERE status IN ('pendente', 'processando') ORDER BY seq"
+            ).fetchall()
+        return [self._converter(l) for l in linhas]
+
+    def estatisticas(self):
+        """Profundidade da fila e tempos de espera (segundos)"""
+        agora = time.time()
+        with self._lock:
+            pendentes, mais_antiga = self._conn.execute(
+                "SELECT COUNT(*), MIN(criado_em) FROM tarefas WHERE status = 'pendente'"
+            ).fetchone()
+            processando = self._conn.execute(
+                "SELECT COUNT(*) FROM tarefas WHERE status = 'processando'").fetchone()[0]
+            espera_media = self._conn.execute(
+                "SELECT AVG(iniciado_em - criado_em) FROM ("
+                "  SELECT iniciado_em, criado_em FROM tarefas WHERE iniciado_em IS NOT NULL"
+                "  ORDER BY seq DESC LIMIT 100)"
+            ).fetchone()[0]
+        return {
+            "pendentes": pendentes,
+            "processando": processando,
+            "espera_mais_antiga": (agora - mais_antiga) if mais_antiga else 0.0,
+            "espera_media_recente": espera_media or 0.0,
+        }
+
+    def aguardar_nova(self, timeout):
+        self._nova_tarefa.wait(timeout)
+        self._nova_tarefa.clear()
+
+    @staticmethod
+    def _converter(linha):
+        tarefa = dict(linha)
+        tarefa["payload"] = json.loads(tarefa["payload"])
+        return tarefa
+
+    def fechar(self):
+        with self._lock:
+            self._conn.close()
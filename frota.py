@@ -0,0 +1,310 @@
+"""
+FROTA - Despachante de tarefas para vários agentes de automação
+Cada agente é uma máquina com o seu próprio vClient (um formulário por vez
+por máquina). O despachante:
+- registra os agentes e os tipos de tarefa que cada um aceita
+- arrenda (lease) a próxima tarefa da fila para quem pedir
+- renova o arrendamento a cada heartbeat
+- devolve para a fila as tarefas de agentes sem heartbeat ou com
+  arrendamento vencido (a tarefa retoma pelo checkpoint em outro agente)
+- escolhe a tarefa e decide, a cada registro, se ela cede a vez para
+  outra prioridade ou inquilino (ver escalonamento.py)
+
+Agentes remotos falam com o despachante pela API (agente_automacao.py);
+AgenteLocal roda no mesmo processo e serve tanto para a máquina da API
+quanto para testar o escalonamento com vários agentes numa máquina só.
+"""
+import threading
+import time
+import traceback
+
+import metricas
+import rastro
+from checkpoint import FINALIZADOS
+from escalonamento import EscalonadorJusto, fluxo
+
+
+# Segundos que um arrendamento vale sem heartbeat
+DURACAO_LEASE = 60
+# Agente sem heartbeat há mais que isso é considerado morto
+LIMITE_HEARTBEAT = 30
+# Intervalo entre heartbeats de um agente
+INTERVALO_HEARTBEAT = 5
+
+
+class ArrendamentoPerdido(RuntimeError):
+    """A tarefa foi devolvida para a fila (ou dada a outro agente) durante a execução"""
+
+
+class TarefaCedida(RuntimeError):
+    """A tarefa cedeu a vez a outra prioridade/inquilino; volta para a fila e retoma pelo checkpoint"""
+
+
+class Despachante:
+    """
+    Distribui as tarefas da fila entre os agentes registrados
+
+    Args:
+        fila: FilaTarefas
+        duracao_lease: Validade de cada arrendamento (segundos)
+        limite_heartbeat: Tempo sem heartbeat para o agente ser dado como morto
+        ao_devolver: funcao(tarefa_id) chamada para cada tarefa que volta para a fila
+        escalonador: EscalonadorJusto (padrão: pesos de escalonamento.PESOS)
+    """
+
+    def __init__(self, fila, duracao_lease=DURACAO_LEASE, limite_heartbeat=LIMITE_HEARTBEAT,
+                 ao_devolver=None, escalonador=None):
+        self.fila = fila
+        self.ao_devolver = ao_devolver
+        self.escalonador = escalonador or EscalonadorJusto()
+        self.duracao_lease = duracao_lease
+        self.limite_heartbeat = limite_heartbeat
+        self.agentes = {}
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._thread = None
+
+    # ============================================
+    # AGENTES
+    # ============================================
+
+    def registrar(self, agente_id, tipos=None, local=False):
+        with self._lock:
+            self.agentes[agente_id] = {
+                "agente_id": agente_id,
+                "tipos": list(tipos) if tipos else None,
+                "local": local,
+                "vivo": True,
+                "tarefa_atual": None,
+                "fluxo": None,
+                "concluidas": 0,
+                "registrado_em": time.time(),
+                "ultimo_heartbeat": time.time(),
+            }
+        print(f"🤖 Agente registrado: {agente_id} ({', '.join(tipos) if tipos else 'todos os tipos'})")
+        return self.agentes[agente_id]
+
+    def heartbeat(self, agente_id, tarefa_id=None):
+        """
+        Sinal de vida do agente; renova o arrendamento da tarefa em execução
+
+        Returns:
+            {"ok": bool, "cancelar": bool} - cancelar=True se a tarefa não é mais dele
+        """
+        with self._lock:
+            agente = self.agentes.get(agente_id)
+            if agente is None:
+                return {"ok": False, "cancelar": tarefa_id is not None}
+            agente["ultimo_heartbeat"] = time.time()
+            agente["vivo"] = True
+        if tarefa_id is None:
+            return {"ok": True, "cancelar": False}
+        renovado = self.fila.renovar(tarefa_id, agente_id, self.duracao_lease)
+        return {"ok": True, "cancelar": not renovado}
+
+    def remover(self, agente_id):
+        """Saída limpa do agente: as tarefas dele voltam para a fila"""
+        with self._lock:
+            self.agentes.pop(agente_id, None)
+        devolvidas = self.fila.liberar(agente_id=agente_id)
+        for tarefa_id in devolvidas:
+            if self.ao_devolver is not None:
+                self.ao_devolver(tarefa_id)
+        return devolvidas
+
+    # ============================================
+    # TAREFAS
+    # ============================================
+
+    def solicitar(self, agente_id):
+        """Arrenda a próxima tarefa para o agente (None se a fila está vazia)"""
+        with self._lock:
+            agente = self.agentes.get(agente_id)
+            if agente is None:
+                raise KeyError(f"Agente não registrado: {agente_id}")
+            agente["ultimo_heartbeat"] = time.time()
+            agente["vivo"] = True
+            tipos = agente["tipos"]
+        tarefa = self.fila.arrendar(agente_id, self.duracao_lease, tipos,
+                                    escolher=self.escalonador.escolher)
+        if tarefa is not None:
+            atual = fluxo(tarefa)
+            with self._lock:
+                agente["tarefa_atual"] = tarefa["tarefa_id"]
+                agente["fluxo"] = atual
+            print(f"📤 Tarefa {tarefa['tarefa_id']} ({tarefa['tipo']}, {atual[0]}) "
+                  f"-> agente {agente_id}")
+        return tarefa
+
+    def registrar_progresso(self, agente_id, tarefa_id, status):
+        """
+        Conta um registro processado e decide se a tarefa deve ceder a vez
+
+        Args:
+            status: Status do registro ('ok' e 'erro' gastam tempo de tela)
+
+        Returns:
+            True se o agente deve parar no próximo registro e chamar ceder();
+            nunca depois de um erro (o registro não tem checkpoint finalizado
+            e a tarefa voltaria para ele a cada vez que cedesse)
+        """
+        with self._lock:
+            agente = self.agentes.get(agente_id)
+            if agente is None or agente["tarefa_atual"] != tarefa_id:
+                return False
+            atual, tipos = agente["fluxo"], agente["tipos"]
+        if status in ("ok", "erro"):
+            self.escalonador.cobrar(atual)
+        if status not in FINALIZADOS:
+            return False
+        return self.escalonador.deve_ceder(atual, self.fila.cabecas(tipos))
+
+    def ceder(self, agente_id, tarefa_id):
+        """A tarefa volta para a fila (retoma pelo checkpoint quando for a vez dela)"""
+        devolvida = self.fila.devolver(tarefa_id, agente_id)
+        with self._lock:
+            agente = self.agentes.get(agente_id)
+            if agente is not None and agente["tarefa_atual"] == tarefa_id:
+                agente["tarefa_atual"] = None
+                agente["fluxo"] = None
+        if devolvida:
+            tarefa = self.fila.obter(tarefa_id)
+            metricas.TAREFAS.inc(tipo=tarefa["tipo"] if tarefa else '', status="cedida")
+            print(f"⏸️  Tarefa {tarefa_id} cedeu a vez (agente {agente_id}); volta para a fila")
+        return devolvida
+
+    def concluir(self, agente_id, tarefa_id, status, erro=None):
+        """Resultado final de uma tarefa; ignorado se o agente perdeu o arrendamento"""
+        aceito = self.fila.concluir(tarefa_id, status, erro, agente_id=agente_id)
+        if aceito:
+            tarefa = self.fila.obter(tarefa_id)
+            metricas.TAREFAS.inc(tipo=tarefa["tipo"] if tarefa else '', status=status)
+        with self._lock:
+            agente = self.agentes.get(agente_id)
+            if agente is not None and agente["tarefa_atual"] == tarefa_id:
+                agente["tarefa_atual"] = None
+                agente["fluxo"] = None
+                agente["concluidas"] += aceito
+        if not aceito:
+            print(f"⚠️  Resultado da tarefa {tarefa_id} ignorado: agente {agente_id} não tem mais o arrendamento")
+        return aceito
+
+    def tem_arrendamento(self, agente_id, tarefa_id):
+        tarefa = self.fila.obter(tarefa_id)
+        return (tarefa is not None and tarefa["status"] == "processando"
+                and tarefa["agente"] == agente_id)
+
+    # ============================================
+    # VIGIA (agentes mortos e arrendamentos vencidos)
+    # ============================================
+
+    def vigiar(self):
+        """Devolve para a fila o trabalho de agentes mortos; retorna os tarefa_id devolvidos"""
+        limite = time.time() - self.limite_heartbeat
+        mortos = []
+        with self._lock:
+            for agente in self.agentes.values():
+                if agente["vivo"] and agente["ultimo_heartbeat"] < limite:
+                    agente["vivo"] = False
+                    agente["tarefa_atual"] = None
+                    mortos.append(agente["agente_id"])
+
+        devolvidas = []
+        for agente_id in mortos:
+            print(f"💀 Agente {agente_id} sem heartbeat há mais de {self.limite_heartbeat}s")
+            devolvidas += self.fila.liberar(agente_id=agente_id)
+        devolvidas += self.fila.liberar(expiradas=True)
+        for tarefa_id in devolvidas:
+            print(f"♻️  Tarefa {tarefa_id} voltou para a fila (será retomada pelo checkpoint)")
+            if self.ao_devolver is not None:
+                self.ao_devolver(tarefa_id)
+        return devolvidas
+
+    def iniciar(self, intervalo=5):
+        def loop():
+            while not self._parar.wait(intervalo):
+                try:
+                    self.vigiar()
+                except Exception:
+                    traceback.print_exc()
+        self._thread = threading.Thread(target=loop, name="despachante-vigia", daemon=True)
+        self._thread.start()
+
+    def parar(self, timeout=5):
+        self._parar.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def estado(self):
+        agora = time.time()
+        with self._lock:
+            return [
+                {**a, "segundos_sem_heartbeat": round(agora - a["ultimo_heartbeat"], 1)}
+                for a in self.agentes.values()
+            ]
+
+
+class AgenteLocal:
+    """
+    Agente que roda como thread no mesmo processo do despachante
+
+    Args:
+        despachante: Despachante
+        executores: {tipo: funcao(tarefa_id, payload) -> status final ('cedida' = volta para a fila)}
+        agente_id: Nome do agente
+        intervalo_heartbeat: Segundos entre heartbeats durante uma tarefa
+    """
+
+    def __init__(self, despachante, executores, agente_id="local",
+                 intervalo_heartbeat=INTERVALO_HEARTBEAT):
+        self.despachante = despachante
+        self.executores = executores
+        self.agente_id = agente_id
+        self.intervalo_heartbeat = intervalo_heartbeat
+        self._parar = threading.Event()
+        self._thread = None
+        self.tarefa_atual = None
+
+    def iniciar(self):
+        self.despachante.registrar(self.agente_id, list(self.executores), local=True)
+        self._thread = threading.Thread(target=self._loop, name=f"agente-{self.agente_id}",
+                                        daemon=True)
+        self._thread.start()
+
+    def parar(self, timeout=5):
+        self._parar.set()
+        self.despachante.fila._nova_tarefa.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _loop(self):
+        while not self._parar.is_set():
+            tarefa = self.despachante.solicitar(self.agente_id)
+            if tarefa is None:
+                self.despachante.fila.aguardar_nova(timeout=1)
+                continue
+            self.executar(tarefa)
+
+    def _heartbeats(self, tarefa_id, terminou):
+        while not terminou.wait(self.intervalo_heartbeat):
+            self.despachante.heartbeat(self.agente_id, tarefa_id)
+
+    def executar(self, tarefa):
+        tarefa_id = tarefa["tarefa_id"]
+        self.tarefa_atual = tarefa_id
+        terminou = threading.Event()
+        threading.Thread(target=self._heartbeats, args=(tarefa_id, terminou),
+                         name=f"heartbeat-{self.agente_id}", daemon=True).start()
+        try:
+            with rastro.contexto(tarefa=tarefa_id, agente=self.agente_id):
+                status = self.executores[tarefa["tipo"]](tarefa_id, tarefa["payload"])
+            if status == "cedida":
+                self.despachante.ceder(self.agente_id, tarefa_id)
+            else:
+                self.despachante.concluir(self.agente_id, tarefa_id, status or "concluido")
+        except Exception as e:
+            traceback.print_exc()
+            self.despachante.concluir(self.agente_id, tarefa_id, "erro", str(e))
+        finally:
+            terminou.set()
+            self.tarefa_atual = None
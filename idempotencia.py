@@ -0,0 +1,197 @@
+"""
+IDEMPOTÊNCIA - Índice persistente dos registros já enviados ao Velneo (SQLite)
+Cada registro vira uma impressão digital normalizada:
+- clientes: documento / rut / padron (ou numero_cliente)
+- carros: numero_poliza + chasis
+Um registro cuja impressão já está no índice é pulado e devolvido como
+duplicado, em vez de ser digitado de novo. A impressão é a chave primária
+de uma tabela WITHOUT ROWID: consulta e inserção continuam O(log n) com
+centenas de milhares de entradas.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from dropdowns import normalizar_texto
+
+
+ARQUIVO_IDEMPOTENCIA = os.path.join('data', 'idempotencia.db')
+
+# Campos que identificam o registro no Velneo, por tipo
+CAMPOS_CHAVE = {
+    "clientes": (("documento", "rut", "padron"), ("numero_cliente",)),
+    "carros": (("datos_poliza.numero_poliza", "datos_vehiculo.chasis"),),
+}
+
+# Chaves legíveis maiores que isso (registro sem campo chave) são cortadas
+TAMANHO_CHAVE = 120
+
+# Tamanho dos lotes de consulta (limite de parâmetros do SQLite)
+TAMANHO_CONSULTA = 500
+
+
+def _campo(registro, caminho):
+    valor = registro
+    for parte in caminho.split('.'):
+        if not isinstance(valor, dict):
+            return None
+        valor = valor.get(parte)
+    return valor
+
+
+def _normalizar(valor):
+    """"1.898.222-2 " -> "18982222" / "knaba 244" -> "KNABA244" """
+    if valor is None or str(valor).strip().lower() in ('', 'none', 'n/a'):
+        return None
+    return re.sub(r'[^0-9A-Z]', '', normalizar_texto(valor)) or None
+
+
+def chave_registro(tipo, registro):
+    """
+    Chave legível do registro ("documento=18982222")
+
+    Usa o primeiro grupo de CAMPOS_CHAVE com algum valor; sem nenhum, cai
+    no conteúdo inteiro normalizado.
+    """
+    for grupo in CAMPOS_CHAVE.get(tipo, ()):
+        partes = []
+        for caminho in grupo:
+            valor = _normalizar(_campo(registro, caminho))
+            if valor is not None:
+                partes.append(f"{caminho.rsplit('.', 1)[-1]}={valor}")
+        if partes:
+            return '|'.join(partes)
+    conteudo = json.dumps(registro, sort_keys=True, ensure_ascii=False, default=str)
+    return f"conteudo={normalizar_texto(conteudo)}"
+
+
+def impressao_digital(tipo, registro):
+    return _hash(tipo, chave_registro(tipo, registro))
+
+
+def _hash(tipo, chave):
+    return hashlib.sha1(f"{tipo}|{chave}".encode('utf-8')).hexdigest()
+
+
+class IndiceIdempotencia:
+    """Impressões digitais dos registros concluídos"""
+
+    def __init__(self, caminho=ARQUIVO_IDEMPOTENCIA):
+        if caminho != ':memory:':
+            os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS enviados (
+                impressao TEXT PRIMARY KEY,
+                tipo TEXT NOT NULL,
+                chave TEXT NOT NULL,
+                em REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+
+    def contem(self, impressao):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM enviados WHERE impressao = ?", (impressao,)).fetchone() is not None
+
+    def existentes(self, impressoes):
+        """Subconjunto de `impressoes` que já está no índice"""
+        impressoes = list(impressoes)
+        encontradas = set()
+        with self._lock:
+            for i in range(0, len(impressoes), TAMANHO_CONSULTA):
+                bloco = impressoes[i:i + TAMANHO_CONSULTA]
+                marcadores = ','.join('?' * len(bloco))
+                encontradas.update(linha[0] for linha in self._conn.execute(
+                    f"SELECT impressao FROM enviados WHERE impressao IN ({marcadores})", bloco))
+        return encontradas
+
+    def registrar(self, impressao, tipo, chave):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO enviados (impressao, tipo, chave, em) VALUES (?, ?, ?, ?)",
+                (impressao, tipo, chave, time.time()))
+
+    def remover(self, impressao):
+        """Esquece um registro (para forçar o reenvio)"""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM enviados WHERE impressao = ?", (impressao,))
+        return cursor.rowcount > 0
+
+    def total(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM enviados").fetchone()[0]
+
+
+class Deduplicador:
+    """
+    Liga o índice a um tipo de registro (usado por processar_lote)
+
+    Args:
+        indice: IndiceIdempotencia
+        tipo: 'clientes' ou 'carros'
+    """
+
+    def __init__(self, indice, tipo):
+        self.indice = indice
+        self.tipo = tipo
+
+    def identificar(self, registro):
+        """(impressão digital, chave legível) do registro"""
+        chave = chave_registro(self.tipo, registro)
+        if len(chave) > TAMANHO_CHAVE:
+            return _hash(self.tipo, chave), chave[:TAMANHO_CHAVE - 3] + '...'
+        return _hash(self.tipo, chave), chave
+
+    def contem(self, registro):
+        return self.indice.contem(impressao_digital(self.tipo, registro))
+
+    def registrar(self, registro):
+        impressao, chave = self.identificar(registro)
+        self.indice.registrar(impressao, self.tipo, chave)
+
+    def duplicados(self, identificados):
+        """
+        Registros do lote que seriam pulados como duplicados
+
+        Conta tanto os já enviados antes quanto as repetições dentro do próprio lote.
+
+        Args:
+            identificados: Lista de (indice, impressao, chave) na ordem do lote
+
+        Returns:
+            [{"indice", "chave"}]
+        """
+        ja_enviadas = self.indice.existentes({impressao for _, impressao, _ in identificados})
+        duplicados, vistas = [], set()
+        for i, impressao, chave in identificados:
+            if impressao in ja_enviadas or impressao in vistas:
+                duplicados.append({"indice": i, "chave": chave})
+            vistas.add(impressao)
+        return duplicados
+
+
+_indice_padrao = None
+_indice_simulado = None
+
+
+def obter_indice(driver=None):
+    """
+    Índice compartilhado; drivers simulados (dry-run) usam um índice só em
+    memória para não marcar como enviados registros que nunca foram ao Velneo.
+    """
+    global _indice_padrao, _indice_simulado
+    if getattr(driver, 'simulado', False):
+        if _indice_simulado is None:
+            _indice_simulado = IndiceIdempotencia(':memory:')
+        return _indice_simulado
+    if _indice_padrao is None:
+        _indice_padrao = IndiceIdempotencia()
+    return _indice_padrao
@@ -0,0 +1,177 @@
+"""
+IMPORTAÇÃO DE PLANILHA - Lotes em CSV/XLSX exportados pelo back office
+Cada linha da planilha vira um item no mesmo formato do n8n
+({"output": {"datos_cliente": {...}}} ou {"output": {"datos_poliza": ...}}),
+lida uma linha de cada vez:
+- CSV pelo módulo csv (separador ';' ou ',' detectado no cabeçalho)
+- XLSX pelo openpyxl em modo read_only (a planilha não é carregada inteira)
+
+O cabeçalho de cada coluna diz para onde vai o valor. Sem configuração,
+vale o nome do campo (ex: "documento", "Número Póliza") ou o caminho
+completo (ex: "datos_cobertura.moneda"). Outros nomes de coluna podem ser
+mapeados em data/mapeamento_colunas.json (ver .exemplo.json), por tipo:
+
+{
+  "clientes": {"Nombre": "datos_cliente.assegurado", "CI": "datos_cliente.documento"},
+  "carros": {"Moneda": ["datos_cobertura.moneda", "condiciones_pago.moneda"]}
+}
+
+Para conferir a conversão sem a API:
+    python importacao_planilha.py planilha.xlsx carros > lote.ndjson
+"""
+import csv
+import json
+import os
+import re
+import sys
+import unicodedata
+from datetime import date, datetime
+
+from validacao import DatosCliente, RegistroAutomovel
+
+
+ARQUIVO_MAPEAMENTO = os.path.join('data', 'mapeamento_colunas.json')
+
+EXTENSOES = ('.csv', '.xlsx')
+
+
+def chave_coluna(nome):
+    """"Número Póliza " -> "numero_poliza" (sem acento, minúsculo, com _)"""
+    texto = unicodedata.normalize('NFKD', str(nome))
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return re.sub(r'[^a-z0-9]+', '_', texto.lower()).strip('_')
+
+
+def _mapeamento_padrao(tipo):
+    """Nome de cada campo dos modelos de validação -> caminho(s) no item['output']"""
+    if tipo == 'clientes':
+        return {campo: [f"datos_cliente.{campo}"] for campo in DatosCliente.model_fields}
+    mapa = {}
+    for secao, info in RegistroAutomovel.model_fields.items():
+        for campo in info.annotation.model_fields:
+            mapa.setdefault(campo, []).append(f"{secao}.{campo}")
+    return mapa
+
+
+def carregar_mapeamento(tipo, extra=None, arquivo=ARQUIVO_MAPEAMENTO):
+    """
+    Coluna (chave_coluna) -> lista de caminhos
+
+    Args:
+        tipo: 'clientes' ou 'carros'
+        extra: Mapeamento enviado junto do upload (tem precedência sobre o arquivo)
+    """
+    mapa = {chave_coluna(c): caminhos for c, caminhos in _mapeamento_padrao(tipo).items()}
+    configurados = {}
+    if os.path.exists(arquivo):
+        with open(arquivo, 'r', encoding='utf-8') as f:
+            configurados.update(json.load(f).get(tipo, {}))
+    configurados.update(extra or {})
+    for coluna, caminhos in configurados.items():
+        mapa[chave_coluna(coluna)] = [caminhos] if isinstance(caminhos, str) else list(caminhos)
+    return mapa
+
+
+def caminhos_do_cabecalho(cabecalho, mapeamento):
+    """Caminhos de cada coluna (lista vazia = coluna ignorada)"""
+    caminhos = []
+    for nome in cabecalho:
+        if nome is None or not str(nome).strip():
+            caminhos.append([])
+        elif '.' in str(nome):
+            caminhos.append([str(nome).strip()])
+        else:
+            caminhos.append(mapeamento.get(chave_coluna(nome), []))
+    return caminhos
+
+
+def _valor_celula(valor):
+    """Célula -> valor do JSON (datas em dd/mm/aaaa, 2010.0 -> 2010, vazio -> None)"""
+    if isinstance(valor, (datetime, date)):
+        return valor.strftime('%d/%m/%Y')
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    if isinstance(valor, str):
+        valor = valor.strip()
+        return valor or None
+    return valor
+
+
+def linha_para_item(caminhos, linha):
+    """Uma linha da planilha -> {"output": {...}} (None se a linha está vazia)"""
+    saida = {}
+    for destinos, valor in zip(caminhos, linha):
+        valor = _valor_celula(valor)
+        if valor is None:
+            continue
+        for caminho in destinos:
+            *secoes, campo = caminho.split('.')
+            alvo = saida
+            for secao in secoes:
+                alvo = alvo.setdefault(secao, {})
+            alvo[campo] = valor
+    return {"output": saida} if saida else None
+
+
+def _linhas_csv(arquivo):
+    with open(arquivo, 'r', encoding='utf-8-sig', newline='') as f:
+        primeira = f.readline()
+        f.seek(0)
+        separador = ';' if primeira.count(';') > primeira.count(',') else ','
+        yield from csv.reader(f, delimiter=separador)
+
+
+def _linhas_xlsx(arquivo):
+    import openpyxl
+
+    planilha = openpyxl.load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        yield from planilha.active.iter_rows(values_only=True)
+    finally:
+        planilha.close()
+
+
+def linhas(arquivo):
+    """Linhas da planilha (a primeira é o cabeçalho), uma de cada vez"""
+    extensao = os.path.splitext(arquivo)[1].lower()
+    if extensao == '.csv':
+        return _linhas_csv(arquivo)
+    if extensao == '.xlsx':
+        return _linhas_xlsx(arquivo)
+    raise ValueError(f"formato não suportado: {extensao or arquivo} (use {', '.join(EXTENSOES)})")
+
+
+def iterar_planilha(arquivo, tipo, mapeamento=None):
+    """
+    Itens do lote, um por linha não vazia
+
+    Args:
+        arquivo: .csv ou .xlsx
+        tipo: 'clientes' ou 'carros'
+        mapeamento: Colunas extras {cabeçalho: caminho ou [caminhos]}
+
+    Raises:
+        ValueError: formato não suportado ou nenhuma coluna reconhecida
+    """
+    iterador = iter(linhas(arquivo))
+    cabecalho = next(iterador, None)
+    if cabecalho is None:
+        return
+    caminhos = caminhos_do_cabecalho(cabecalho, carregar_mapeamento(tipo, mapeamento))
+    if not any(caminhos):
+        raise ValueError(f"nenhuma coluna reconhecida no cabeçalho: {list(cabecalho)}")
+    ignoradas = [str(n) for n, c in zip(cabecalho, caminhos) if n is not None and not c]
+    if ignoradas:
+        print(f"⚠️  Colunas sem mapeamento (ignoradas): {', '.join(ignoradas)}")
+    for linha in iterador:
+        item = linha_para_item(caminhos, linha)
+        if item is not None:
+            yield item
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[2] not in ('clientes', 'carros'):
+        print(__doc__)
+        sys.exit(2)
+    for item in iterar_planilha(sys.argv[1], sys.argv[2]):
+        print(json.dumps(item, ensure_ascii=False))
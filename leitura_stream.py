@@ -0,0 +1,249 @@
+"""
+LEITURA EM STREAMING - Registros de lotes grandes, um de cada vez
+Aceita:
+- array JSON: [{"output": {...}}, {"output": {...}}, ...]
+- envelope: {"clientes": [...]} / {"carros": [...]}
+- NDJSON: um objeto {"output": {...}} por linha
+
+O parser é incremental (recebe pedaços de bytes), então o mesmo código
+serve para arquivos em disco e para o corpo de uma requisição chunked,
+sem nunca carregar o lote inteiro na memória.
+"""
+import codecs
+import json
+import os
+import time
+
+
+TAMANHO_BLOCO = 64 * 1024
+
+# Chaves de envelope aceitas ({"clientes": [...]})
+CHAVES_ENVELOPE = ('clientes', 'carros', 'registros')
+
+_ESPACOS = ' \t\r\n'
+
+
+class ParserIncremental:
+    """
+    Parser de JSON empurrado em pedaços
+
+    Uso:
+        parser = ParserIncremental()
+        for pedaco in pedacos:
+            for item in parser.alimentar(pedaco):
+                ...
+        for item in parser.finalizar():
+            ...
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._modo = None   # 'array' | 'objetos' | 'fim'
+        # Objeto de nível superior sendo lido chave a chave (modo 'objetos')
+        self._objeto = None
+        self._chave = None
+        self._etapa = None  # 'dois_pontos' | 'valor' depois de ler a chave
+        self._lista = False     # dentro da lista do envelope
+        self._envelope = False  # o objeto atual é um envelope
+        self.itens = 0
+
+    def alimentar(self, pedaco):
+        if isinstance(pedaco, bytes):
+            pedaco = self._utf8.decode(pedaco)
+        self._buffer = self._buffer[self._pos:] + pedaco
+        self._pos = 0
+        return list(self._extrair(final=False))
+
+    def finalizar(self):
+        self._buffer = self._buffer[self._pos:] + self._utf8.decode(b'', final=True)
+        self._pos = 0
+        itens = list(self._extrair(final=True))
+        if self._modo == 'array' or self._lista:
+            raise ValueError("JSON terminou antes de fechar o array ']'")
+        if self._objeto is not None:
+            raise ValueError("JSON terminou antes de fechar o objeto '}'")
+        return itens
+
+    def _pular(self, caracteres):
+        while self._pos < len(self._buffer) and self._buffer[self._pos] in caracteres:
+            self._pos += 1
+
+    def _decodificar(self, final):
+        """Próximo valor JSON a partir de _pos, ou None se ainda está incompleto"""
+        try:
+            valor, fim = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return None  # valor incompleto: espera o próximo pedaço
+        self._pos = fim
+        return (valor,)
+
+    def _extrair(self, final):
+        while True:
+            self._pular(_ESPACOS)
+            if self._pos >= len(self._buffer):
+                return
+
+            if self._modo is None:
+                self._modo = 'array' if self._buffer[self._pos] == '[' else 'objetos'
+                if self._modo == 'array':
+                    self._pos += 1
+                continue
+
+            if self._modo == 'fim':
+                return
+
+            if self._modo == 'objetos':
+                # Objetos são lidos chave a chave: a lista de um envelope sai
+                # item por item, sem esperar o envelope inteiro chegar
+                if self._objeto is not None or self._buffer[self._pos] == '{':
+                    for item in self._extrair_objeto(final):
+                        self.itens += 1
+                        yield item
+                    if self._objeto is not None:
+                        return  # objeto incompleto: espera o próximo pedaço
+                    continue
+
+            if self._modo == 'array':
+                self._pular(_ESPACOS + ',')
+                if self._pos >= len(self._buffer):
+                    return
+                if self._buffer[self._pos] == ']':
+                    self._pos += 1
+                    self._modo = 'fim'
+                    return
+
+            lido = self._decodificar(final)
+            if lido is None:
+                return
+            self.itens += 1
+            yield lido[0]
+
+    def _extrair_objeto(self, final):
+        """
+        Lê o objeto de nível superior em _pos: os itens da lista do envelope
+        ({"clientes": [...]}) conforme chegam, ou o próprio objeto (NDJSON)
+        quando ele fecha. Sai com _objeto != None se o buffer acabou no meio.
+        """
+        if self._objeto is None:
+            self._pos += 1  # '{'
+            self._objeto, self._chave, self._envelope = {}, None, False
+        while True:
+            self._pular(_ESPACOS)
+            if self._pos >= len(self._buffer):
+                return
+            caractere = self._buffer[self._pos]
+
+            if self._lista:
+                self._pular(_ESPACOS + ',')
+                if self._pos >= len(self._buffer):
+                    return
+                if self._buffer[self._pos] == ']':
+                    self._pos += 1
+                    self._lista = False
+                    continue
+                lido = self._decodificar(final)
+                if lido is None:
+                    return
+                yield lido[0]
+                continue
+
+            if self._chave is None:
+                if caractere == ',':
+                    self._pos += 1
+                    continue
+                if caractere == '}':
+                    self._pos += 1
+                    objeto, self._objeto = self._objeto, None
+                    if not self._envelope:
+                        yield objeto
+                    return
+                lido = self._decodificar(final)
+                if lido is None:
+                    return
+                if not isinstance(lido[0], str):
+                    raise ValueError(f"chave inválida no objeto: {lido[0]!r}")
+                self._chave, self._etapa = lido[0], 'dois_pontos'
+                continue
+
+            if self._etapa == 'dois_pontos':
+                if caractere != ':':
+                    raise ValueError(f"esperado ':' depois da chave {self._chave!r}")
+                self._pos += 1
+                self._etapa = 'valor'
+                continue
+
+            # Envelope: a lista é percorrida item por item
+            if self._chave in CHAVES_ENVELOPE and caractere == '[':
+                self._pos += 1
+                self._lista, self._envelope, self._chave = True, True, None
+                continue
+            lido = self._decodificar(final)
+            if lido is None:
+                return
+            self._objeto[self._chave] = lido[0]
+            self._chave = None
+
+
+def iterar_registros(arquivo, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Lê os itens de um arquivo JSON/NDJSON em streaming
+
+    Args:
+        arquivo: Caminho do arquivo ou objeto de arquivo binário
+    """
+    if isinstance(arquivo, (str, os.PathLike)):
+        with open(arquivo, 'rb') as f:
+            yield from iterar_registros(f, tamanho_bloco)
+        return
+
+    parser = ParserIncremental()
+    while True:
+        pedaco = arquivo.read(tamanho_bloco)
+        if not pedaco:
+            break
+        yield from parser.alimentar(pedaco)
+    yield from parser.finalizar()
+
+
+async def iterar_registros_async(pedacos):
+    """Mesma leitura sobre um iterador assíncrono de bytes (ex: request.stream())"""
+    parser = ParserIncremental()
+    async for pedaco in pedacos:
+        for item in parser.alimentar(pedaco):
+            yield item
+    for item in parser.finalizar():
+        yield item
+
+
+def seguir_ndjson(caminho, ativo, intervalo=0.2):
+    """
+    Lê um NDJSON que ainda pode estar sendo escrito (upload em andamento)
+
+    Args:
+        caminho: Arquivo NDJSON
+        ativo: funcao() -> True enquanto o escritor ainda pode acrescentar linhas
+    """
+    with open(caminho, 'r', encoding='utf-8') as f:
+        resto = ''
+        while True:
+            linha = f.readline()
+            if linha:
+                resto += linha
+                if resto.endswith('\n'):
+                    if resto.strip():
+                        yield json.loads(resto)
+                    resto = ''
+                continue
+            if not ativo():
+                # Releitura final: o escritor pode ter terminado entre as duas checagens
+                resto += f.read()
+                for sobra in resto.splitlines():
+                    if sobra.strip():
+                        yield json.loads(sobra)
+                return
+            time.sleep(intervalo)
@@ -0,0 +1,146 @@
+"""
+LOTE - Loop comum de processamento de registros
+Usado por processar_clientes e processar_automoveis: valida cada registro,
+executa o plano dos válidos na sessão, avisa o progresso depois de cada um
+e permite começar a partir de um índice (retomada após falha/interrupção).
+Registros já enviados antes (índice de idempotência) são pulados.
+
+O resultado de cada registro leva a impressão digital da entrada, a duração
+no formulário e os avisos do plano (ex: categoria desconhecida), para o
+arquivo de resultados da tarefa (resultados.py).
+"""
+import metricas
+from idempotencia import impressao_digital
+from validacao import imprimir_relatorio, validar_lote
+
+
+def avisos_do_plano(plano):
+    """Mensagens das marcas 'aviso' do plano (valores que ficaram no padrão do formulário)"""
+    return [a.dados.get("mensagem") for a in plano if a.tipo == "marca" and a.valor == "aviso"]
+
+
+def _avisar(ao_progresso, indice, resultado, tipo=None):
+    metricas.REGISTROS.inc(tipo=tipo or '', resultado=resultado["status"])
+    if ao_progresso is not None:
+        ao_progresso(indice, resultado)
+
+
+def _impressao(tipo, registro):
+    return impressao_digital(tipo, registro) if tipo else None
+
+
+def _duracao(sessao, comeco):
+    return round(sessao.driver.agora() - comeco, 3)
+
+
+def verificar_lote(tipo, registros, deduplicar=None):
+    """
+    Validação e duplicados do lote inteiro, antes do login
+
+    Args:
+        tipo: 'clientes' ou 'carros'
+        registros: Iterável de registros (índices começam em 1)
+        deduplicar: Deduplicador (opcional)
+
+    Returns:
+        Relatório de validar_lote com "duplicados" e "a_processar"
+    """
+    identificados = []
+    ao_validar = None
+    if deduplicar is not None:
+        ao_validar = lambda i, registro: identificados.append((i, *deduplicar.identificar(registro)))
+
+    relatorio = validar_lote(tipo, registros, ao_validar=ao_validar)
+    relatorio["duplicados"] = deduplicar.duplicados(identificados) if deduplicar else []
+    relatorio["a_processar"] = relatorio["validos"] - len(relatorio["duplicados"])
+    return relatorio
+
+
+def imprimir_verificacao(relatorio):
+    imprimir_relatorio(relatorio)
+    if relatorio["duplicados"]:
+        print(f"♻️  {len(relatorio['duplicados'])} registro(s) já enviado(s) serão pulados")
+        for d in relatorio["duplicados"]:
+            print(f"   ♻️  Registro {d['indice']}: {d['chave']}")
+
+
+def processar_lote(sessao, registros, compilar, cabecalho=None, inicio=1, ao_progresso=None,
+                   validar=None, deduplicar=None, tipo=None, indices=None):
+    """
+    Processa os registros um a um na sessão do Velneo
+
+    Args:
+        sessao: SessaoVelneo já na tela certa
+        registros: Iterável de registros (índices começam em 1)
+        compilar: funcao(registro, indice=i) -> plano de ações
+        cabecalho: funcao(indice, registro) chamada antes de cada registro
+        inicio: Primeiro índice a processar; os anteriores são pulados
+        ao_progresso: funcao(indice, resultado) chamada após cada registro
+        validar: funcao(registro, avisos=lista) -> (registro normalizado, erros);
+            registros com erros são rejeitados sem abrir o formulário e os
+            avisos (dropdowns de baixa confiança) vão para o resultado
+        deduplicar: Deduplicador; registros já enviados são pulados e os
+            concluídos entram no índice
+        tipo: 'clientes' ou 'carros' (rótulo das métricas)
+        indices: Índice de cada registro no lote original, quando `registros`
+            é só uma parte dele (padrão: posição, a partir de 1)
+
+    Returns:
+        {"total", "processados", "pulados", "rejeitados", "duplicados"}
+    """
+    resumo = {"total": 0, "processados": 0, "pulados": 0, "rejeitados": 0, "duplicados": 0}
+    try:
+        numerados = zip(indices, registros) if indices is not None else enumerate(registros, 1)
+        for i, registro in numerados:
+            resumo["total"] += 1
+            if i < inicio:
+                resumo["pulados"] += 1
+                continue
+
+            avisos = []
+            if validar is not None:
+                original = registro
+                registro, erros = validar(registro, avisos=avisos)
+                if erros:
+                    resumo["rejeitados"] += 1
+                    print(f"   ⏭️  Registro {i} rejeitado: {'; '.join(erros)}")
+                    _avisar(ao_progresso, i, {"status": "invalido", "erro": "; ".join(erros),
+                                              "impressao": _impressao(tipo, original)}, tipo)
+                    continue
+                if avisos:
+                    print(f"   ⚠️  Registro {i} (conferir): {'; '.join(avisos)}")
+
+            impressao = _impressao(tipo, registro)
+            if deduplicar is not None and deduplicar.contem(registro):
+                resumo["duplicados"] += 1
+                print(f"   ♻️  Registro {i} já enviado antes: pulando")
+                _avisar(ao_progresso, i, {"status": "duplicado", "impressao": impressao}, tipo)
+                continue
+
+            if cabecalho is not None:
+                cabecalho(i, registro)
+            comeco = sessao.driver.agora()
+            plano = compilar(registro, indice=i)
+            avisos += avisos_do_plano(plano)
+            try:
+                sessao.executar(plano)
+            except Exception as e:
+                try:
+                    _avisar(ao_progresso, i, {"status": "erro", "erro": str(e), "impressao": impressao,
+                                              "duracao": _duracao(sessao, comeco), "avisos": avisos}, tipo)
+                except Exception as aviso:
+                    # O erro do registro é o que vale (ex: TarefaCedida não pode escondê-lo)
+                    print(f"   ⚠️  Progresso do registro {i} não avisado: {aviso}")
+                raise
+            duracao = _duracao(sessao, comeco)
+            metricas.REGISTRO_SEGUNDOS.observar(duracao, tipo=tipo or '')
+
+            if deduplicar is not None:
+                deduplicar.registrar(registro)
+            resumo["processados"] += 1
+            _avisar(ao_progresso, i, {"status": "ok", "impressao": impressao, "duracao": duracao,
+                                      "avisos": avisos}, tipo)
+    except Exception:
+        sessao.tela_desconhecida()
+        raise
+    return resumo
@@ -0,0 +1,163 @@
+"""
+MÉTRICAS - Contadores e histogramas no formato texto do Prometheus
+Alimentados pela sessão (login), pelo executor de planos (seções, teclas,
+sleep) e pelo loop de lote (registros); expostos em GET /metrics.
+Sem dependência externa: só o necessário do formato de exposição.
+"""
+import threading
+
+
+def _rotulos(nomes, valores):
+    if not nomes:
+        return ''
+    pares = ','.join(f'{n}="{str(v)}"' for n, v in zip(nomes, valores))
+    return '{' + pares + '}'
+
+
+def _numero(valor):
+    if valor == float('inf'):
+        return '+Inf'
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Contador:
+    """Valor que só aumenta (ex: teclas enviadas)"""
+
+    tipo = 'counter'
+
+    def __init__(self, nome, ajuda, rotulos=()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def inc(self, valor=1, **rotulos):
+        chave = tuple(rotulos.get(r, '') for r in self.rotulos)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def valor(self, **rotulos):
+        return self._valores.get(tuple(rotulos.get(r, '') for r in self.rotulos), 0)
+
+    def linhas(self):
+        with self._lock:
+            valores = dict(self._valores)
+        return [f"{self.nome}{_rotulos(self.rotulos, chave)} {_numero(v)}"
+                for chave, v in sorted(valores.items())]
+
+
+class Histograma:
+    """Distribuição de durações em faixas cumulativas (le)"""
+
+    tipo = 'histogram'
+
+    def __init__(self, nome, ajuda, faixas, rotulos=()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.faixas = tuple(sorted(faixas)) + (float('inf'),)
+        self.rotulos = tuple(rotulos)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor, **rotulos):
+        chave = tuple(rotulos.get(r, '') for r in self.rotulos)
+        with self._lock:
+            serie = self._series.setdefault(chave, {"contagens": [0] * len(self.faixas),
+                                                    "soma": 0.0, "total": 0})
+            for i, limite in enumerate(self.faixas):
+                if valor <= limite:
+                    serie["contagens"][i] += 1
+                    break
+            serie["soma"] += valor
+            serie["total"] += 1
+
+    def linhas(self):
+        with self._lock:
+            series = {k: {**s, "contagens": list(s["contagens"])} for k, s in self._series.items()}
+        linhas = []
+        for chave, serie in sorted(series.items()):
+            acumulado = 0
+            for limite, contagem in zip(self.faixas, serie["contagens"]):
+                acumulado += contagem
+                rotulos = _rotulos(self.rotulos + ('le',), chave + (_numero(limite),))
+                linhas.append(f"{self.nome}_bucket{rotulos} {acumulado}")
+            rotulos = _rotulos(self.rotulos, chave)
+            linhas.append(f"{self.nome}_sum{rotulos} {_numero(serie['soma'])}")
+            linhas.append(f"{self.nome}_count{rotulos} {serie['total']}")
+        return linhas
+
+
+class Medidor:
+    """Valor lido na hora da coleta (ex: profundidade da fila)"""
+
+    tipo = 'gauge'
+
+    def __init__(self, nome, ajuda, funcao):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.funcao = funcao
+
+    def linhas(self):
+        return [f"{self.nome} {_numero(self.funcao())}"]
+
+
+# ============================================
+# REGISTRO
+# ============================================
+
+_registro = {}
+
+
+def registrar(metrica):
+    _registro[metrica.nome] = metrica
+    return metrica
+
+
+def expor():
+    """Todas as métricas no formato texto do Prometheus (GET /metrics)"""
+    linhas = []
+    for metrica in _registro.values():
+        try:
+            corpo = metrica.linhas()
+        except Exception:
+            continue  # medidor cuja fonte falhou não derruba a coleta
+        linhas.append(f"# HELP {metrica.nome} {metrica.ajuda}")
+        linhas.append(f"# TYPE {metrica.nome} {metrica.tipo}")
+        linhas.extend(corpo)
+    return '\n'.join(linhas) + '\n'
+
+
+# ============================================
+# MÉTRICAS DA AUTOMAÇÃO
+# ============================================
+
+LOGIN_SEGUNDOS = registrar(Histograma(
+    "velneo_login_segundos", "Duração do login no vClient",
+    (1, 2, 5, 10, 20, 30, 60, 120)))
+
+REGISTRO_SEGUNDOS = registrar(Histograma(
+    "velneo_registro_segundos", "Tempo de preenchimento de um registro",
+    (5, 10, 20, 30, 45, 60, 90, 120, 180, 300), rotulos=("tipo",)))
+
+SECAO_SEGUNDOS = registrar(Histograma(
+    "velneo_secao_segundos", "Tempo por seção do formulário",
+    (0.5, 1, 2, 5, 10, 20, 30, 60), rotulos=("secao",)))
+
+TECLAS = registrar(Contador(
+    "velneo_teclas_total", "Teclas enviadas ao vClient"))
+
+SLEEP_SEGUNDOS = registrar(Contador(
+    "velneo_sleep_segundos_total",
+    "Tempo parado em pausas, esperas fixas e esperas de prontidão", rotulos=("origem",)))
+
+REGISTROS = registrar(Contador(
+    "velneo_registros_total", "Registros por resultado (ok, erro, invalido, duplicado)",
+    rotulos=("tipo", "resultado")))
+
+TAREFAS = registrar(Contador(
+    "tarefas_total", "Tarefas finalizadas por status", rotulos=("tipo", "status")))
+
+WEBHOOKS = registrar(Contador(
+    "webhooks_avisos_total", "Avisos de conclusão enviados ao callback_url por resultado",
+    rotulos=("resultado",)))
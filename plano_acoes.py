@@ -0,0 +1,242 @@
+"""
+PLANO DE AÇÕES - Compila cada registro numa lista plana de ações
+e executa essa lista num driver de entrada, otimizando antes:
+- rajadas de teclas iguais (ex: 20 TABs) saem numa única chamada
+- ações sem efeito (texto vazio, 0 teclas, espera 0) são descartadas
+- a pausa só é aplicada nas ações que o formulário realmente precisa
+- as esperas de tela usam prontidao.aguardar (consulta a tela, com fallback)
+- cada texto é colado, digitado rápido ou pausado conforme o campo (entrada_texto)
+"""
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List
+
+import entrada_texto
+import metricas
+import prontidao
+import rastro
+
+
+# Pausas aplicadas depois de ações específicas (substituem o PAUSE global)
+PAUSA_TELA = 0.8            # ENTER que abre/fecha telas ou confirma formulários
+PAUSA_AUTOCOMPLETAR = 0.8   # letra que dispara o autocompletar (corredor, moneda)
+
+# Intervalo entre teclas dentro de uma rajada (ex: 20 TABs seguidos)
+INTERVALO_RAJADA = 0.02
+
+
+@dataclass
+class Acao:
+    """
+    Uma ação do plano
+
+    tipo: 'tecla' | 'texto' | 'espera' | 'aguardar' | 'conferir' | 'marca'
+    """
+    tipo: str
+    valor: Any = None
+    vezes: int = 1
+    intervalo: float = 0.0
+    pausa: float = 0.0
+    dados: Dict[str, Any] = field(default_factory=dict)
+
+
+def tecla(nome, vezes=1, pausa=0.0):
+    return Acao("tecla", nome, vezes=vezes, pausa=pausa)
+
+
+def texto(valor, intervalo=0.0, pausa=0.0, campo=None):
+    """campo: nome do campo do formulário (aparece no rastro)"""
+    return Acao("texto", valor, intervalo=intervalo, pausa=pausa,
+                dados={"campo": campo} if campo else {})
+
+
+def texto_seguro(valor, intervalo=0.1, pausa=0.0, campo=None):
+    """Texto que só é digitado se não for None, vazio ou 'none' (como safe_write)"""
+    if not valor_preenchido(valor):
+        valor = None
+    return texto(valor, intervalo=intervalo, pausa=pausa, campo=campo)
+
+
+def espera(segundos):
+    return Acao("espera", segundos)
+
+
+def aguardar_pronto(nome, fallback, timeout=None):
+    """Espera a tela `nome` ficar pronta (fallback: sleep fixo de `fallback` segundos)"""
+    return Acao("aguardar", nome, dados={"fallback": fallback, "timeout": timeout})
+
+
+def conferir_campo(nome, timeout=prontidao.TIMEOUT_CONFERENCIA):
+    """Confere o campo `nome` na tela antes de digitar (sem custo se não houver sonda)"""
+    return Acao("conferir", nome, dados={"timeout": timeout})
+
+
+def marca(evento, **dados):
+    return Acao("marca", evento, dados=dados)
+
+
+def valor_preenchido(valor):
+    return bool(valor) and str(valor).lower() != 'none' and str(valor).strip() != ''
+
+
+def compilar_login(senha='1234'):
+    """Abre o Velneo vClient, conecta no Portal e fecha a notificação"""
+    return [
+        tecla('win'),
+        aguardar_pronto('menu_iniciar', 0.5),
+        texto('velneo vClient', intervalo=0.1),
+        aguardar_pronto('busca_vclient', 0.5),
+        tecla('enter'),
+        aguardar_pronto('janela_conexao', 3),
+        # Navegar para senha (2 TABs)
+        tecla('tab', 2),
+        texto(senha, intervalo=0.05),
+        # Conectar e selecionar Portal
+        tecla('enter'),
+        aguardar_pronto('selecao_portal', 0.5),
+        tecla('enter'),
+        aguardar_pronto('notificacao', 2.5),
+        # Fechar notificação e esperar o Portal ficar utilizável
+        tecla('enter', pausa=PAUSA_TELA),
+        tecla('enter'),
+        aguardar_pronto('portal', 4),
+    ]
+
+
+# ============================================
+# OTIMIZAÇÃO
+# ============================================
+
+def _sem_efeito(acao):
+    if acao.tipo == "tecla":
+        return acao.vezes <= 0
+    if acao.tipo == "texto":
+        return acao.valor is None or str(acao.valor) == ''
+    if acao.tipo == "espera":
+        return not acao.valor or acao.valor <= 0
+    return False
+
+
+def otimizar(plano: List[Acao]) -> List[Acao]:
+    """
+    Descarta ações sem efeito e junta sequências:
+    - teclas iguais seguidas viram uma rajada (só se a anterior não tem pausa)
+    - esperas seguidas viram uma só; a pausa de uma ação absorve a espera seguinte
+    """
+    otimizado = []
+    for acao in plano:
+        if _sem_efeito(acao):
+            continue
+        anterior = otimizado[-1] if otimizado else None
+
+        if (anterior is not None and acao.tipo == "tecla" and anterior.tipo == "tecla"
+                and anterior.valor == acao.valor and anterior.pausa == 0
+                and anterior.intervalo == acao.intervalo):
+            otimizado[-1] = replace(anterior, vezes=anterior.vezes + acao.vezes,
+                                    pausa=acao.pausa)
+            continue
+
+        if anterior is not None and acao.tipo == "espera":
+            if anterior.tipo == "espera":
+                otimizado[-1] = espera(anterior.valor + acao.valor)
+                continue
+            if anterior.tipo in ("tecla", "texto"):
+                # A espera explícita já cobre a pausa da ação anterior
+                otimizado[-1] = replace(anterior, pausa=max(anterior.pausa, acao.valor))
+                continue
+
+        otimizado.append(acao)
+    return otimizado
+
+
+# ============================================
+# EXECUÇÃO
+# ============================================
+
+class ExecutorPlano:
+    """
+    Executa planos num driver de entrada
+
+    Durante a execução o PAUSE global do driver fica em 0: a pausa de cada
+    ação vem do próprio plano.
+    """
+
+    def __init__(self, driver, intervalo_rajada=INTERVALO_RAJADA):
+        self.driver = driver
+        self.intervalo_rajada = intervalo_rajada
+        self._secao = None  # (nome, início) da seção de formulário em andamento
+
+    def executar(self, plano: List[Acao]):
+        """Otimiza e executa o plano. Retorna o número de ações antes/depois"""
+        otimizado = otimizar(plano)
+        pausa_original = self.driver.pausa
+        self.driver.pausa = 0
+        self._secao = None
+        # Planos de registro começam com a marca 'registro'; os outros (login, telas) não
+        rastro.definir(registro=None, secao=None)
+        try:
+            for acao in otimizado:
+                self._executar_acao(acao)
+            self._fechar_secao()
+        finally:
+            self.driver.pausa = pausa_original
+        return {"acoes": len(plano), "acoes_otimizadas": len(otimizado)}
+
+    def _fechar_secao(self, nova=None):
+        """Mede a seção que estava aberta (marca 'secao') e abre a próxima"""
+        agora = self.driver.agora()
+        if self._secao is not None:
+            nome, inicio = self._secao
+            metricas.SECAO_SEGUNDOS.observar(agora - inicio, secao=nome)
+        self._secao = (nova, agora) if nova is not None else None
+
+    def _executar_acao(self, acao: Acao):
+        driver = self.driver
+        inicio = driver.agora()
+        evento = {}
+        if acao.tipo == "tecla":
+            intervalo = acao.intervalo
+            if acao.vezes > 1:
+                intervalo = max(intervalo, self.intervalo_rajada)
+            driver.press(acao.valor, vezes=acao.vezes, intervalo=intervalo)
+            metricas.TECLAS.inc(acao.vezes)
+            evento = {"valor": acao.valor, "vezes": acao.vezes}
+        elif acao.tipo == "texto":
+            valor = str(acao.valor)
+            modo = entrada_texto.modo_texto(acao.dados.get("campo"), valor)
+            if modo == entrada_texto.COLAR:
+                driver.colar(valor)
+                metricas.TECLAS.inc(2)
+            else:
+                driver.write(valor, interval=0.0 if modo == entrada_texto.RAPIDO
+                             else acao.intervalo)
+                metricas.TECLAS.inc(len(valor))
+            # Só o tamanho: o conteúdo (documentos, nomes) não vai para o log
+            evento = {"tamanho": len(valor), "modo": modo}
+        elif acao.tipo == "espera":
+            driver.sleep(acao.valor)
+            metricas.SLEEP_SEGUNDOS.inc(acao.valor, origem="espera")
+        elif acao.tipo == "aguardar":
+            prontidao.aguardar(driver, acao.valor, acao.dados["fallback"],
+                               timeout=acao.dados["timeout"])
+            metricas.SLEEP_SEGUNDOS.inc(driver.agora() - inicio, origem="prontidao")
+            evento = {"tela": acao.valor}
+        elif acao.tipo == "conferir":
+            prontidao.conferir(driver, acao.valor, timeout=acao.dados["timeout"])
+            metricas.SLEEP_SEGUNDOS.inc(driver.agora() - inicio, origem="prontidao")
+            evento = {"campo": acao.valor}
+        elif acao.tipo == "marca":
+            driver.marcar(acao.valor, **acao.dados)
+            if acao.valor == "secao":
+                self._fechar_secao(acao.dados.get("nome"))
+                rastro.definir(secao=acao.dados.get("nome"))
+            elif acao.valor == "registro":
+                rastro.definir(registro=acao.dados.get("indice"), secao=None)
+            else:
+                rastro.emitir(acao.valor, inicio, **acao.dados)
+            return
+
+        if acao.pausa:
+            driver.sleep(acao.pausa)
+            metricas.SLEEP_SEGUNDOS.inc(acao.pausa, origem="pausa")
+        rastro.emitir(acao.tipo, inicio, duracao=round(driver.agora() - inicio, 4),
+                      pausa=acao.pausa, **acao.dados, **evento)
@@ -0,0 +1,244 @@
+"""
+PRONTIDÃO - Esperas guiadas pela tela em vez de sleeps fixos
+Cada espera tem um nome (ex: 'formulario_poliza'). Se existir uma condição
+registrada para esse nome (pixel ou imagem), ela é consultada até ficar
+verdadeira ou estourar o timeout; senão, cai no sleep fixo antigo (fallback).
+
+Antes de digitar num campo-chave (ex: corredor), conferir() consulta a
+condição do campo: se ela existe e o campo não aparece, o registro falha
+em vez de o texto cair no campo errado; sem condição, segue às cegas.
+
+Condições de imagem usam sonda_tela (referência em cache, só a região).
+As condições podem ser configuradas em data/prontidao.json
+(ver data/prontidao.exemplo.json):
+
+{
+  "formulario_poliza": {"tipo": "pixel", "x": 640, "y": 120, "cor": [0, 120, 215]},
+  "campo_corredor": {"tipo": "imagem", "imagem": "imagens/campo_corredor.png",
+                     "regiao": [300, 200, 400, 120]}
+}
+"""
+import json
+import os
+import time
+
+from sonda_tela import LIMIAR_PADRAO, Sonda
+
+
+ARQUIVO_CONDICOES = os.path.join('data', 'prontidao.json')
+
+# Intervalo entre consultas à tela enquanto espera
+INTERVALO_CONSULTA = 0.1
+
+# Tempo máximo para um campo conferido aparecer
+TIMEOUT_CONFERENCIA = 2.0
+
+# Tempo máximo da sonda de uma tela que já deveria estar visível
+TIMEOUT_SONDA = 1.0
+
+
+class ProntidaoEsgotada(TimeoutError):
+    """A tela não ficou pronta dentro do timeout"""
+
+
+class CampoNaoEncontrado(ProntidaoEsgotada):
+    """O campo conferido antes de digitar não apareceu (foco fora do lugar)"""
+
+
+# ============================================
+# CONDIÇÕES
+# ============================================
+
+class CondicaoPixel:
+    """Pronto quando o pixel (x, y) tem a cor esperada (com tolerância por canal)"""
+
+    def __init__(self, x, y, cor, tolerancia=10):
+        self.x = x
+        self.y = y
+        self.cor = tuple(cor)
+        self.tolerancia = tolerancia
+
+    def verificar(self, driver):
+        atual = driver.pixel(self.x, self.y)
+        if atual is None:
+            return False
+        return all(abs(a - b) <= self.tolerancia for a, b in zip(atual, self.cor))
+
+
+class CondicaoImagem:
+    """
+    Pronto quando a imagem de referência aparece (de preferência numa região pequena)
+
+    Args:
+        confianca: Correlação mínima de 0 a 1 (padrão: sonda_tela.LIMIAR_PADRAO)
+    """
+
+    def __init__(self, imagem, regiao=None, confianca=None):
+        self.sonda = Sonda(imagem, regiao, confianca or LIMIAR_PADRAO)
+
+    def verificar(self, driver):
+        return self.sonda.verificar(driver)
+
+
+_condicoes = {}
+
+
+def registrar_condicao(nome, condicao):
+    _condicoes[nome] = condicao
+
+
+def obter_condicao(nome):
+    return _condicoes.get(nome)
+
+
+def carregar_condicoes(arquivo=ARQUIVO_CONDICOES):
+    """Carrega as condições do JSON de configuração (se existir)"""
+    if not os.path.exists(arquivo):
+        return 0
+    with open(arquivo, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    for nome, c in config.items():
+        if c.get('tipo') == 'pixel':
+            registrar_condicao(nome, CondicaoPixel(c['x'], c['y'], c['cor'],
+                                                   c.get('tolerancia', 10)))
+        elif c.get('tipo') == 'imagem':
+            registrar_condicao(nome, CondicaoImagem(c['imagem'], c.get('regiao'),
+                                                    c.get('confianca')))
+        else:
+            print(f"   ⚠️ Condição de prontidão inválida: {nome}")
+    return len(config)
+
+
+# ============================================
+# ESTATÍSTICAS
+# ============================================
+
+_estatisticas = {}
+
+
+def _registrar_estatistica(nome, duracao, modo):
+    est = _estatisticas.setdefault(nome, {
+        "esperas": 0, "tempo_total": 0.0, "tempo_max": 0.0,
+        "por_condicao": 0, "por_fallback": 0, "esgotadas": 0,
+    })
+    est["esperas"] += 1
+    est["tempo_total"] += duracao
+    est["tempo_max"] = max(est["tempo_max"], duracao)
+    est[modo] += 1
+
+
+def estatisticas_esperas():
+    """Tempo gasto por espera nomeada (com média calculada)"""
+    return {
+        nome: {**est, "tempo_medio": est["tempo_total"] / est["esperas"]}
+        for nome, est in _estatisticas.items()
+    }
+
+
+def limpar_estatisticas():
+    _estatisticas.clear()
+
+
+def imprimir_estatisticas():
+    for nome, est in sorted(estatisticas_esperas().items()):
+        print(f"   ⏱️ {nome}: {est['esperas']}x, média {est['tempo_medio']:.2f}s, "
+              f"máx {est['tempo_max']:.2f}s (fallback: {est['por_fallback']}, "
+              f"esgotadas: {est['esgotadas']})")
+
+
+# ============================================
+# ESPERA
+# ============================================
+
+def aguardar(driver, nome, fallback, timeout=None, intervalo=INTERVALO_CONSULTA):
+    """
+    Espera a tela `nome` ficar pronta
+
+    Args:
+        driver: Driver de entrada (usado para ler a tela e para dormir)
+        nome: Nome da espera / condição registrada
+        fallback: Sleep fixo usado quando não há condição registrada
+        timeout: Tempo máximo de espera (padrão: 3x o fallback, mínimo 10s)
+    """
+    if timeout is None:
+        timeout = max(fallback * 3, 10)
+
+    condicao = obter_condicao(nome)
+
+    # Driver simulado: cada espera custa o tempo simulado de prontidão
+    # (sem condição registrada, o sleep fixo inteiro, como em produção)
+    if getattr(driver, 'simulado', False):
+        duracao = driver.simular_prontidao(nome, fallback, condicao is not None)
+        _registrar_estatistica(nome, duracao,
+                               "por_condicao" if condicao is not None else "por_fallback")
+        return duracao
+
+    if condicao is None:
+        driver.sleep(fallback)
+        _registrar_estatistica(nome, fallback, "por_fallback")
+        return fallback
+
+    inicio = time.monotonic()
+    while True:
+        if condicao.verificar(driver):
+            duracao = time.monotonic() - inicio
+            _registrar_estatistica(nome, duracao, "por_condicao")
+            return duracao
+        if time.monotonic() - inicio >= timeout:
+            _registrar_estatistica(nome, time.monotonic() - inicio, "esgotadas")
+            raise ProntidaoEsgotada(f"Tela '{nome}' não ficou pronta em {timeout}s")
+        driver.sleep(intervalo)
+
+
+def conferir(driver, nome, timeout=TIMEOUT_CONFERENCIA, intervalo=INTERVALO_CONSULTA):
+    """
+    Confere que o campo `nome` está na tela antes de digitar nele
+
+    Sem condição registrada para `nome` não espera nada (comportamento antigo).
+
+    Raises:
+        CampoNaoEncontrado: O campo não apareceu dentro do timeout
+    """
+    if getattr(driver, 'simulado', False):
+        driver.simular_conferencia(nome)
+        return 0.0
+
+    condicao = obter_condicao(nome)
+    if condicao is None:
+        return None
+
+    inicio = time.monotonic()
+    while True:
+        if condicao.verificar(driver):
+            duracao = time.monotonic() - inicio
+            _registrar_estatistica(nome, duracao, "por_condicao")
+            return duracao
+        if time.monotonic() - inicio >= timeout:
+            _registrar_estatistica(nome, time.monotonic() - inicio, "esgotadas")
+            raise CampoNaoEncontrado(f"Campo '{nome}' não apareceu em {timeout}s")
+        driver.sleep(intervalo)
+
+
+def tela_visivel(driver, nome, timeout=TIMEOUT_SONDA, intervalo=INTERVALO_CONSULTA):
+    """
+    Sonda rápida: a tela `nome` está visível agora?
+
+    Returns:
+        True/False, ou None se não há condição registrada para `nome`
+        (ou o driver é simulado e não tem tela para ler)
+    """
+    if getattr(driver, 'simulado', False):
+        return None
+    condicao = obter_condicao(nome)
+    if condicao is None:
+        return None
+
+    inicio = time.monotonic()
+    while not condicao.verificar(driver):
+        if time.monotonic() - inicio >= timeout:
+            return False
+        driver.sleep(intervalo)
+    return True
+
+
+carregar_condicoes()
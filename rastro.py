@@ -0,0 +1,140 @@
+"""
+RASTRO - Log estruturado (JSONL) de cada ação enviada ao vClient
+Cada tecla, texto, espera e escolha de dropdown vira um evento com
+instante monotônico, tarefa e índice do registro, gravado em
+logs/rastro_<data>_<pid>.jsonl. A gravação é feita por uma thread
+separada em lotes: emitir() só enfileira e nunca bloqueia a automação.
+Leia os arquivos com analisar_rastro.py.
+
+Os prints com emoji continuam como saída para quem acompanha no console;
+o rastro é o registro completo do que foi enviado ao vClient.
+"""
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+PASTA_LOGS = 'logs'
+
+# RASTRO=0 desliga a gravação
+ATIVO = os.environ.get('RASTRO', '1') != '0'
+
+
+class EscritorRastro:
+    """
+    Grava eventos em JSONL numa thread de fundo
+
+    Args:
+        pasta: Pasta dos arquivos de rastro
+        intervalo: Segundos máximos entre duas gravações
+        tamanho_lote: Eventos acumulados que forçam uma gravação
+    """
+
+    def __init__(self, pasta=PASTA_LOGS, intervalo=0.5, tamanho_lote=500):
+        os.makedirs(pasta, exist_ok=True)
+        nome = f"rastro_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}.jsonl"
+        self.caminho = os.path.join(pasta, nome)
+        self.intervalo = intervalo
+        self.tamanho_lote = tamanho_lote
+        self.descartados = 0
+        self._fila = queue.SimpleQueue()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="rastro", daemon=True)
+        self._thread.start()
+
+    def emitir(self, evento):
+        self._fila.put(evento)
+
+    def _loop(self):
+        with open(self.caminho, 'a', encoding='utf-8') as arquivo:
+            while not (self._parar.is_set() and self._fila.empty()):
+                lote = self._coletar()
+                if lote:
+                    arquivo.write(''.join(lote))
+                    arquivo.flush()
+
+    def _coletar(self):
+        lote = []
+        limite = time.monotonic() + self.intervalo
+        while len(lote) < self.tamanho_lote:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                evento = self._fila.get(timeout=restante)
+            except queue.Empty:
+                break
+            try:
+                lote.append(json.dumps(evento, ensure_ascii=False, default=str) + '\n')
+            except (TypeError, ValueError):
+                self.descartados += 1
+        return lote
+
+    def fechar(self, timeout=5):
+        """Grava o que falta e encerra a thread"""
+        self._parar.set()
+        self._thread.join(timeout)
+
+
+# ============================================
+# CONTEXTO (tarefa, registro e seção da thread atual)
+# ============================================
+
+_contexto = threading.local()
+
+
+def _campos_contexto():
+    return getattr(_contexto, 'campos', {})
+
+
+def definir(**campos):
+    """Atualiza o contexto da thread (ex: registro=3, secao='vehiculo')"""
+    _contexto.campos = {**_campos_contexto(), **campos}
+
+
+@contextmanager
+def contexto(**campos):
+    """Contexto temporário: with rastro.contexto(tarefa=tarefa_id): ..."""
+    anterior = _campos_contexto()
+    _contexto.campos = {**anterior, **campos}
+    try:
+        yield
+    finally:
+        _contexto.campos = anterior
+
+
+# ============================================
+# EMISSÃO
+# ============================================
+
+_escritor = None
+_lock = threading.Lock()
+
+
+def obter_escritor():
+    global _escritor
+    if _escritor is None:
+        with _lock:
+            if _escritor is None:
+                _escritor = EscritorRastro()
+                atexit.register(_escritor.fechar)
+    return _escritor
+
+
+def emitir(evento, t, **dados):
+    """
+    Registra um evento
+
+    Args:
+        evento: 'tecla' | 'texto' | 'espera' | 'aguardar' | 'conferir' | 'registro' | 'secao'
+            | 'dropdown' | 'aviso'
+        t: Instante monotônico do início (driver.agora())
+    """
+    if not ATIVO:
+        return
+    obter_escritor().emitir({"t": round(t, 4), "evento": evento, **_campos_contexto(), **dados})
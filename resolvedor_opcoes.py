@@ -0,0 +1,154 @@
+"""
+RESOLVEDOR DE OPÇÕES - Valor recebido -> opção de dropdown mais parecida
+Os valores que chegam do n8n nem sempre vêm escritos como a opção do combo
+("Pick-Up", "Todo Riesgo D1", "camioneta 4x4"). Antes, tudo que não batia
+exatamente era rejeitado. Agora:
+- a comparação ignora acentos, caixa e pontuação ("Pick-Up" = "PICK UP")
+- sem igualdade, vale a opção com mais trigramas em comum (coeficiente de
+  Dice), com o índice de trigramas de cada dropdown montado uma vez só
+- códigos com número que não batem ("TODO RIESGO D2" x "TODO RIESGO") eliminam
+  a opção: parecido no texto não quer dizer o mesmo plano
+- cada resolução vem com a confiança (1.0 = igual); abaixo de LIMIAR_MINIMO
+  o valor continua desconhecido, abaixo de LIMIAR_CONFIANCA ele é rejeitado
+  na validação, a não ser com ACEITAR_BAIXA_CONFIANCA=1 no ambiente (aí é
+  aceito e sinalizado como aviso)
+- consultas repetidas (o mesmo valor em todo o lote) saem do cache
+
+Dropdowns que mudam o formulário (tipo de cliente) não aceitam aproximação
+(Dropdown.aproximado=False).
+
+Para testar um valor:
+    python resolvedor_opcoes.py categoria "Pick-Up"
+"""
+import os
+import re
+import sys
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from dropdowns import REGISTRO_DROPDOWNS, normalizar_texto, obter_dropdown
+
+
+# Confiança mínima para aceitar a opção
+LIMIAR_MINIMO = 0.5
+# Abaixo disso a opção é de baixa confiança: rejeitada, ou aceita com aviso
+# quando ACEITAR_BAIXA_CONFIANCA=1
+LIMIAR_CONFIANCA = 0.8
+ACEITAR_BAIXA_CONFIANCA = os.environ.get('ACEITAR_BAIXA_CONFIANCA', '0') == '1'
+
+TAMANHO_NGRAMA = 3
+
+
+@dataclass(frozen=True)
+class Resolucao:
+    opcao: str
+    confianca: float
+
+    @property
+    def baixa_confianca(self):
+        return self.confianca < LIMIAR_CONFIANCA
+
+
+def chave(valor):
+    """"Todo Riesgo/ D1" -> "TODO RIESGO D1" (sem acento, caixa nem pontuação)"""
+    return ' '.join(re.sub(r'[^0-9A-Z]+', ' ', normalizar_texto(valor)).split())
+
+
+def codigos(texto):
+    """Palavras com algum dígito: "TODO RIESGO D1" -> {"D1"}"""
+    return frozenset(p for p in texto.split() if any(c.isdigit() for c in p))
+
+
+def ngramas(texto, tamanho=TAMANHO_NGRAMA):
+    """Trigramas do texto com um espaço em cada ponta (o início da palavra pesa)"""
+    texto = f" {texto} "
+    return {texto[i:i + tamanho] for i in range(len(texto) - tamanho + 1)}
+
+
+class IndiceOpcoes:
+    """
+    Índice invertido trigrama -> opções de um dropdown (opções e aliases)
+
+    Args:
+        dropdown: dropdowns.Dropdown
+    """
+
+    def __init__(self, dropdown):
+        self.nome = dropdown.nome
+        self.aproximado = dropdown.aproximado
+        self.exatas = {}
+        self.termos = []  # (opção, quantidade de trigramas, códigos)
+        self.postagens = defaultdict(list)
+        pares = [(o, o) for o in dropdown.opcoes] + list(dropdown.aliases.items())
+        for texto, opcao in pares:
+            k = chave(texto)
+            if not k:
+                continue
+            self.exatas.setdefault(k, opcao)
+            gramas = ngramas(k)
+            for g in gramas:
+                self.postagens[g].append(len(self.termos))
+            self.termos.append((opcao, len(gramas), codigos(k)))
+
+    def resolver(self, valor) -> Optional[Resolucao]:
+        k = chave(valor)
+        if not k:
+            return None
+        if k in self.exatas:
+            return Resolucao(self.exatas[k], 1.0)
+        if not self.aproximado:
+            return None
+
+        gramas, numeros = ngramas(k), codigos(k)
+        comuns = Counter(t for g in gramas for t in self.postagens.get(g, ()))
+        melhor = None
+        for termo, n in comuns.items():
+            opcao, tamanho, codigos_termo = self.termos[termo]
+            # Códigos com número diferentes ("D1", "4X4", "200") = outra opção
+            if codigos_termo != numeros:
+                continue
+            dice = 2 * n / (len(gramas) + tamanho)
+            # Empate: vence a opção listada primeiro (ordem do combo)
+            if melhor is None or dice > melhor[1] or (dice == melhor[1] and termo < melhor[2]):
+                melhor = (opcao, dice, termo)
+        if melhor is None or melhor[1] < LIMIAR_MINIMO:
+            return None
+        return Resolucao(melhor[0], round(melhor[1], 3))
+
+
+@lru_cache(maxsize=None)
+def obter_indice(nome) -> IndiceOpcoes:
+    """Índice do dropdown `nome`, montado na primeira consulta"""
+    return IndiceOpcoes(obter_dropdown(nome))
+
+
+@lru_cache(maxsize=4096)
+def resolver(nome, valor) -> Optional[Resolucao]:
+    """
+    Opção do dropdown `nome` para `valor`, com a confiança
+
+    Returns:
+        Resolucao ou None se nenhuma opção é parecida o bastante
+    """
+    if valor is None:
+        return None
+    return obter_indice(nome).resolver(str(valor))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] not in REGISTRO_DROPDOWNS:
+        print(__doc__)
+        print(f"Dropdowns: {', '.join(REGISTRO_DROPDOWNS)}")
+        sys.exit(2)
+    resolucao = resolver(sys.argv[1], sys.argv[2])
+    if resolucao is None:
+        print(f"❌ {sys.argv[2]!r}: nenhuma opção parecida em {sys.argv[1]}")
+        sys.exit(1)
+    if resolucao.baixa_confianca and not ACEITAR_BAIXA_CONFIANCA:
+        print(f"❌ {sys.argv[2]!r} -> {resolucao.opcao} (confiança {resolucao.confianca:.0%}): "
+              f"baixa confiança, rejeitado (ACEITAR_BAIXA_CONFIANCA=1 para aceitar)")
+        sys.exit(1)
+    marca = "⚠️ " if resolucao.baixa_confianca else "✅"
+    print(f"{marca} {sys.argv[2]!r} -> {resolucao.opcao} (confiança {resolucao.confianca:.0%})")
@@ -0,0 +1,104 @@
+"""
+RESULTADOS - Arquivo de resultados por tarefa em output/ (JSONL só de acréscimo)
+Cada registro processado vira uma linha compacta em
+output/resultados_<tarefa_id>.jsonl:
+
+{"indice":3,"status":"ok","impressao":"9f1c...","duracao":41.2,"em":1732550400.1,
+ "avisos":["Categoria desconhecida: PICK-UP"]}
+
+Ao lado fica output/resultados_<tarefa_id>.idx com a posição (8 bytes) de
+cada linha: ler as linhas N..N+limite é um seek no índice e outro no JSONL,
+sem ler o arquivo inteiro, mesmo com lotes de centenas de milhares.
+
+Uma tarefa retomada acrescenta de novo os registros tentados outra vez;
+para conciliar, vale a última linha de cada índice.
+"""
+import json
+import os
+import struct
+import threading
+import time
+
+
+PASTA_RESULTADOS = 'output'
+
+# Linhas devolvidas por consulta, no máximo
+LIMITE_LEITURA = 1000
+
+_POSICAO = struct.Struct('<Q')
+
+
+class ArquivoResultados:
+    """
+    Resultados de todas as tarefas, um par .jsonl/.idx por tarefa
+
+    Args:
+        pasta: Onde ficam os arquivos (padrão: output/)
+    """
+
+    def __init__(self, pasta=PASTA_RESULTADOS):
+        self.pasta = pasta
+        os.makedirs(pasta, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def caminhos(self, tarefa_id):
+        base = os.path.join(self.pasta, f"resultados_{tarefa_id}")
+        return base + ".jsonl", base + ".idx"
+
+    def anexar(self, tarefa_id, indice, resultado):
+        """
+        Acrescenta o resultado de um registro
+
+        Args:
+            indice: Índice do registro no lote (a partir de 1)
+            resultado: {"status", "erro", "impressao", "duracao", "avisos"} (ausentes ficam de fora)
+        """
+        linha = {"indice": indice, "em": round(time.time(), 3)}
+        linha.update((campo, valor) for campo, valor in resultado.items()
+                     if valor is not None and valor != [])
+        dados = (json.dumps(linha, ensure_ascii=False, separators=(',', ':')) + "\n").encode('utf-8')
+        jsonl, idx = self.caminhos(tarefa_id)
+        with self._lock:
+            # Linha antes do índice: uma queda no meio deixa no máximo uma linha sem índice (invisível)
+            with open(jsonl, 'ab') as f:
+                posicao = f.tell()
+                f.write(dados)
+            with open(idx, 'ab') as f:
+                f.write(_POSICAO.pack(posicao))
+
+    def total(self, tarefa_id):
+        _, idx = self.caminhos(tarefa_id)
+        if not os.path.exists(idx):
+            return 0
+        return os.path.getsize(idx) // _POSICAO.size
+
+    def ler(self, tarefa_id, offset=0, limite=100):
+        """
+        Linhas [offset, offset + limite) do arquivo da tarefa
+
+        Returns:
+            {"total", "offset", "proximo" (None no fim), "resultados": [...]}
+        """
+        offset = max(0, offset)
+        limite = max(0, min(limite, LIMITE_LEITURA))
+        jsonl, idx = self.caminhos(tarefa_id)
+        total = self.total(tarefa_id)
+        fim = min(total, offset + limite)
+        resultados = []
+        if offset < fim:
+            with open(idx, 'rb') as f:
+                f.seek(offset * _POSICAO.size)
+                bloco = f.read((fim - offset) * _POSICAO.size)
+            posicoes = [p for (p,) in _POSICAO.iter_unpack(bloco)]
+            with open(jsonl, 'rb') as f:
+                for posicao in posicoes:
+                    # Linhas seguidas dispensam o seek (o caso comum)
+                    if f.tell() != posicao:
+                        f.seek(posicao)
+                    resultados.append(json.loads(f.readline()))
+        return {
+            "total": total,
+            "offset": offset,
+            "proximo": fim if fim < total else None,
+            "resultados": resultados,
+        }
@@ -0,0 +1,186 @@
+"""
+SESSÃO VELNEO - Login único no vClient compartilhado entre tarefas
+Guarda se a sessão está viva e em qual tela está, para que tarefas
+seguidas (ex: várias chamadas da API) reaproveitem o vClient aberto
+em vez de abrir e logar de novo a cada vez.
+"""
+import os
+import time
+
+import metricas
+from driver_entrada import obter_driver
+from plano_acoes import ExecutorPlano, PAUSA_TELA, aguardar_pronto, compilar_login, tecla
+from prontidao import ProntidaoEsgotada, tela_visivel
+
+
+SENHA_VELNEO = os.getenv('VELNEO_SENHA', '1234')
+
+# Teclas que fecham o formulário aberto e voltam para o Portal
+TECLAS_VOLTAR_INICIO = 2
+
+# Condição de prontidão (data/prontidao.json) visível em qualquer tela do
+# vClient, ex: um pixel da barra de título; sem ela a sonda usa a do Portal
+CONDICAO_VCLIENT = 'vclient'
+
+
+def compilar_voltar_inicio():
+    """Fecha formulários abertos (ESC) até voltar ao Portal"""
+    return [
+        tecla('escape', TECLAS_VOLTAR_INICIO, pausa=PAUSA_TELA),
+        aguardar_pronto('portal', 1),
+    ]
+
+
+def compilar_navegacao_clientes():
+    """Do Portal até o formulário de cadastro de clientes"""
+    return [
+        tecla('enter'),
+        aguardar_pronto('lista_clientes', 5),
+        tecla('tab', 4),
+        tecla('enter', pausa=PAUSA_TELA),
+    ]
+
+
+# Como chegar em cada tela a partir do Portal
+# (as pólizas navegam por registro, então partem do próprio Portal)
+NAVEGACAO_TELAS = {
+    'portal': lambda: [],
+    'clientes': compilar_navegacao_clientes,
+}
+
+
+class SessaoVelneo:
+    """
+    Sessão do Velneo vClient
+
+    Attributes:
+        ativa: Login feito e vClient respondendo
+        tela: Tela atual ('portal', 'clientes') ou None se desconhecida
+        logins: Quantas vezes o login foi feito nesta sessão
+    """
+
+    def __init__(self, driver=None, senha=None):
+        self.driver = driver or obter_driver()
+        self.executor = ExecutorPlano(self.driver)
+        self.senha = senha or SENHA_VELNEO
+        self.ativa = False
+        self.tela = None
+        self.logins = 0
+        self.duracao_ultimo_login = None
+        self.ultima_atividade = None
+
+    def garantir_login(self):
+        """Faz o login só se a sessão ainda não estiver ativa (e viva)"""
+        if self.ativa:
+            if self.viva():
+                return False
+            print("⚠️ vClient não responde - sessão será refeita")
+            self.invalidar()
+
+        print("🔵 Abrindo Aplicacao de Seguros (Velneo vClient)...")
+        print("🔐 Preenchendo campo Senha e conectando ao Portal...")
+        inicio = self.driver.agora()
+        self.executar(compilar_login(self.senha))
+        self.duracao_ultimo_login = self.driver.agora() - inicio
+        metricas.LOGIN_SEGUNDOS.observar(self.duracao_ultimo_login)
+
+        self.ativa = True
+        self.tela = 'portal'
+        self.logins += 1
+        self._tocar()
+        return True
+
+    def voltar_inicio(self):
+        """Volta para o Portal; se não conseguir, a sessão é dada como morta"""
+        try:
+            self.executar(compilar_voltar_inicio())
+        except ProntidaoEsgotada:
+            print("⚠️ vClient não voltou ao Portal - sessão será refeita")
+            self.invalidar()
+            return False
+        self.tela = 'portal'
+        self._tocar()
+        return True
+
+    def abrir_tela(self, tela):
+        """Garante login e leva a sessão até `tela`, sem navegar se já estiver nela"""
+        self.garantir_login()
+        if self.tela == tela:
+            return
+
+        if self.tela != 'portal' and not self.voltar_inicio():
+            self.garantir_login()
+
+        print(f"🧭 Abrindo tela: {tela}")
+        self.executar(NAVEGACAO_TELAS[tela]())
+        self.tela = tela
+        self._tocar()
+
+    def executar(self, plano):
+        """
+        Executa o plano na sessão; qualquer erro no meio invalida a sessão
+        (o vClient pode ter fechado ou travado, e o foco não é mais confiável)
+        """
+        try:
+            self.executor.executar(plano)
+        except Exception:
+            self.invalidar()
+            raise
+
+    def viva(self):
+        """
+        Sonda barata antes de reaproveitar a sessão: a condição 'vclient'
+        (qualquer tela) ou, sem ela, a do Portal se a sessão está nele.
+        Sem condição configurada não há como ler a tela: vale o flag `ativa`.
+        """
+        visivel = tela_visivel(self.driver, CONDICAO_VCLIENT)
+        if visivel is None and self.tela == 'portal':
+            visivel = tela_visivel(self.driver, 'portal')
+        return visivel is not False
+
+    def tela_desconhecida(self):
+        """Após um erro no meio do formulário não dá para saber onde o foco parou"""
+        self.tela = None
+
+    def invalidar(self):
+        """Sessão perdida (vClient fechado/travado): o próximo uso refaz o login"""
+        self.ativa = False
+        self.tela = None
+
+    def _tocar(self):
+        self.ultima_atividade = time.time()
+
+    def estado(self):
+        return {
+            "ativa": self.ativa,
+            "tela": self.tela,
+            "logins": self.logins,
+            "duracao_ultimo_login": self.duracao_ultimo_login,
+            "ultima_atividade": self.ultima_atividade,
+        }
+
+
+# ============================================
+# SESSÃO PADRÃO
+# ============================================
+
+_sessao_padrao = None
+
+
+def obter_sessao(driver=None):
+    """
+    Sessão compartilhada: chamadas seguidas com o mesmo driver reaproveitam
+    o login. Um driver diferente (ex: DriverGravacao novo) ganha sessão própria.
+    """
+    global _sessao_padrao
+    driver = driver or obter_driver()
+    if _sessao_padrao is None or _sessao_padrao.driver is not driver:
+        _sessao_padrao = SessaoVelneo(driver)
+    return _sessao_padrao
+
+
+def estado_sessao():
+    """Estado da sessão compartilhada (sem criar driver/sessão se ainda não existe)"""
+    if _sessao_padrao is None:
+        return {"ativa": False, "tela": None, "logins": 0}
+    return _sessao_padrao.estado()
@@ -0,0 +1,499 @@
+"""
+SIMULADOR VELNEO - Modelo em processo dos formulários de cliente e póliza
+Driver que recebe as mesmas ações do ExecutorPlano (tab, setas, texto,
+enter, escape) e mantém a tela atual, o campo com foco e o valor de cada
+campo, para conferir sem Windows se as contagens de tab e as teclas dos
+dropdowns põem cada valor no campo certo:
+- ordem de tab de cada formulário (o de clientes muda conforme o tipo)
+- dropdowns com as listas de dropdowns.py (setas, HOME/END, busca por prefixo)
+- campos que autocompletam com a primeira letra (moneda 'P'/'D', corredor 'P')
+- esperas de prontidão e conferências de campo (conferir_campo) batem com a
+  tela e o foco do simulador
+
+Cada formulário guardado entra em `salvos`; texto digitado fora de um
+campo conhecido, enter sem efeito e tela errada entram em `erros`.
+
+Uso:
+    python simulador_velneo.py [--n 1000] [--semente 42]
+"""
+import contextlib
+import io
+import sys
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import rastro
+from automacao_carros_corrigida_testes import processar_automoveis
+from automacao_clientes_corrigida_testes import processar_clientes
+from benchmark import gerar_carros, gerar_clientes
+from dropdowns import normalizar_texto, obter_dropdown
+from driver_entrada import DriverGravacao
+from idempotencia import IndiceIdempotencia
+from plano_acoes import valor_preenchido
+from validacao import validar_registro
+
+
+TEXTO = 'texto'
+DROPDOWN = 'dropdown'
+AUTOCOMPLETAR = 'autocompletar'
+BOTAO = 'botao'
+
+
+@dataclass(frozen=True)
+class Campo:
+    """
+    Um campo na ordem de tab do formulário
+
+    Args:
+        nome: Nome do valor guardado
+        tipo: TEXTO, DROPDOWN, AUTOCOMPLETAR ou BOTAO
+        opcoes: Itens da lista (dropdown) ou do autocompletar
+    """
+    nome: str
+    tipo: str = TEXTO
+    opcoes: Optional[Tuple[str, ...]] = None
+
+
+def _dropdown(nome, campo=None):
+    return Campo(campo or nome, DROPDOWN, tuple(obter_dropdown(nome).opcoes))
+
+
+COMPANHIAS = ("SAN CRISTÓBAL SEGUROS S.A.",)
+CORREDORES = ("PAULO BENITEZ",)
+MOEDAS = ("PES", "DOL")
+
+# Posição que o seletor de ramo precisa para AUTOMOVIL ('down' x4)
+RAMO_AUTOMOVIL = 4
+
+# ============================================
+# FORMULÁRIOS (posição do tab -> campo)
+# ============================================
+
+# Diálogo de nova póliza: companhia e ramo
+DIALOGO_POLIZA = {
+    0: Campo('companhia', AUTOCOMPLETAR, COMPANHIAS),
+    1: Campo('ramo', DROPDOWN),
+    2: Campo('confirmar', BOTAO),
+}
+
+FORMULARIO_POLIZA = {
+    13: Campo('numero_poliza'),
+    15: Campo('marca_modelo'),
+    16: Campo('ano'),
+    18: Campo('combustible'),
+    19: _dropdown('categoria'),
+    20: Campo('motor'),
+    21: Campo('chasis'),
+    23: _dropdown('destino'),
+    24: _dropdown('calidad'),
+    29: _dropdown('cobertura'),
+    33: _dropdown('zona_circulacao'),
+    35: Campo('deducible'),
+    36: Campo('moneda_cobertura', AUTOCOMPLETAR, MOEDAS),
+    38: Campo('moneda_pago', AUTOCOMPLETAR, MOEDAS),
+    39: Campo('cuotas'),
+    40: Campo('total'),
+    42: Campo('premio_total'),
+    62: Campo('assegurado'),
+    90: Campo('guardar', BOTAO),
+}
+
+# Cabeçalho do formulário de clientes (igual para todos os tipos)
+FORMULARIO_CLIENTE = {
+    0: Campo('numero_cliente'),
+    7: Campo('assegurado'),
+    8: _dropdown('tipo_cliente', 'tipo'),
+}
+
+# Campos que aparecem depois de escolher o tipo:
+# (campos próprios do tipo, posição do telefone, tabs até o email)
+# Empresa segue o plano sem categoria (como chegam os clientes do n8n): com
+# categoria, compilar_cliente dá um tab a mais antes do telefone e só o
+# formulário real diz qual dos dois caminhos está certo
+CAMPOS_POR_TIPO = {
+    "Empresa": ({9: 'corredor', 10: 'corredor_cobro', 12: 'rut', 13: 'razao_social'}, 15, 3),
+    "Particular": ({9: 'corredor', 11: 'documento', 12: 'categoria'}, 13, 2),
+    "Particular/Empresa": ({9: 'corredor', 11: 'rut', 12: 'razao_social', 13: 'documento',
+                            14: 'categoria'}, 15, 3),
+    "Edificio": ({9: 'corredor', 11: 'padron', 12: 'categoria'}, 13, 2),
+    "Prospecto": ({9: 'corredor', 11: 'categoria'}, 12, 2),
+}
+
+# Contato e endereços, a partir do telefone
+CAMPOS_CONTATO = {
+    0: 'telefono', 1: 'celular', 2: 'fecha_nacimiento', 5: 'domicilio', 6: 'departamento',
+    7: 'localidad', 8: 'codigo_postal', 9: 'dir_cobro', 10: 'departamento_cobro',
+    11: 'localidad_cobro', 12: 'codigo_postal_cobro',
+}
+
+
+def formulario_cliente(tipo):
+    """Ordem de tab do formulário de clientes com o tipo escolhido"""
+    campos = dict(FORMULARIO_CLIENTE)
+    if tipo not in CAMPOS_POR_TIPO:
+        return campos
+    proprios, telefone, tabs_email = CAMPOS_POR_TIPO[tipo]
+    for posicao, nome in proprios.items():
+        corredor = nome.startswith('corredor')
+        campos[posicao] = Campo(nome, AUTOCOMPLETAR, CORREDORES) if corredor else Campo(nome)
+    for deslocamento, nome in CAMPOS_CONTATO.items():
+        campos[telefone + deslocamento] = Campo(nome)
+    email = telefone + max(CAMPOS_CONTATO) + tabs_email
+    campos[email] = Campo('email')
+    campos[email + 7] = Campo('observaciones')
+    campos[email + 15] = Campo('guardar', BOTAO)
+    return campos
+
+
+# ============================================
+# TELAS
+# ============================================
+
+# Enter nas telas de passagem do login
+PASSOS_LOGIN = {
+    'conexao': 'selecao_portal',
+    'selecao_portal': 'notificacao',
+    'notificacao': 'notificacao_fechada',
+    'notificacao_fechada': 'portal',
+}
+
+# ESC volta um nível
+VOLTAR = {
+    'formulario_poliza': 'lista',
+    'dialogo_poliza': 'lista',
+    'formulario_cliente': 'lista',
+    'lista': 'portal',
+}
+
+# Tab a partir do topo da lista -> botão que o enter aciona
+BOTOES_LISTA = {4: 'formulario_cliente', 5: 'dialogo_poliza'}
+
+# Tela em que cada espera de prontidão deve encontrar o simulador
+TELAS_PRONTIDAO = {
+    'menu_iniciar': 'menu',
+    'busca_vclient': 'menu',
+    'janela_conexao': 'conexao',
+    'selecao_portal': 'selecao_portal',
+    'notificacao': 'notificacao',
+    'portal': 'portal',
+    'lista_polizas': 'lista',
+    'lista_clientes': 'lista',
+    'formulario_poliza': 'formulario_poliza',
+    'cliente_guardado': 'formulario_cliente',
+}
+
+BUSCA_VCLIENT = 'velneo vClient'
+SENHA_POSICAO = 2
+
+
+class DriverSimulado(DriverGravacao):
+    """
+    DriverGravacao que também reproduz o efeito de cada tecla nos formulários
+
+    Attributes:
+        tela: Tela atual ('desktop', 'portal', 'lista', 'formulario_poliza'...)
+        valores: Valor de cada campo do formulário aberto
+        salvos: [{"formulario", "registro", "campos"}] na ordem em que foram guardados
+        erros: [{"registro", "tela", "erro"}]
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.tela = 'desktop'
+        self.salvos = []
+        self.erros = []
+        self.senha = None
+        self._abrir('desktop')
+
+    def _abrir(self, tela, valores=None):
+        self.tela = tela
+        self.foco = 0
+        self.valores = valores or {}
+        self.posicoes = {}
+        self.busca = ''
+
+    def _erro(self, mensagem):
+        self.erros.append({"registro": self.registro, "tela": self.tela, "erro": mensagem})
+
+    def campos(self):
+        if self.tela == 'formulario_poliza':
+            return FORMULARIO_POLIZA
+        if self.tela == 'formulario_cliente':
+            return formulario_cliente(self.valores.get('tipo'))
+        if self.tela == 'dialogo_poliza':
+            return DIALOGO_POLIZA
+        if self.tela == 'conexao':
+            return {SENHA_POSICAO: Campo('senha')}
+        return {}
+
+    # ============================================
+    # ENTRADA
+    # ============================================
+
+    def press(self, tecla, vezes=1, intervalo=0.0):
+        super().press(tecla, vezes, intervalo)
+        for _ in range(vezes):
+            self._tecla(tecla)
+
+    def write(self, texto, interval=0.0):
+        super().write(texto, interval)
+        self._digitar(str(texto))
+
+    def colar(self, texto):
+        super().colar(texto)
+        self._digitar(str(texto))
+
+    def simular_prontidao(self, nome, fallback, com_condicao=True):
+        esperada = TELAS_PRONTIDAO.get(nome)
+        if esperada is not None and esperada != self.tela:
+            self._erro(f"espera '{nome}' com o simulador em '{self.tela}'")
+        return super().simular_prontidao(nome, fallback, com_condicao)
+
+    def simular_conferencia(self, nome):
+        """'campo_corredor' passa se o foco está num campo corredor"""
+        campo = self.campos().get(self.foco)
+        alvo = nome.removeprefix('campo_')
+        if campo is None or not campo.nome.startswith(alvo):
+            self._erro(f"conferência '{nome}' com o foco em "
+                       f"{campo.nome if campo else f'tab {self.foco}'}")
+            return False
+        return True
+
+    def _tecla(self, tecla):
+        if tecla == 'tab':
+            self.foco += 1
+        elif tecla == 'enter':
+            self._enter()
+        elif tecla == 'escape':
+            if self.tela in VOLTAR:
+                self._abrir(VOLTAR[self.tela])
+        elif tecla == 'win':
+            if self.tela == 'desktop':
+                self._abrir('menu')
+        elif tecla in ('down', 'up', 'home', 'end'):
+            self._mover(tecla)
+        elif len(tecla) == 1:
+            self._digitar(tecla)
+        elif tecla not in ('left', 'right'):
+            self._erro(f"tecla '{tecla}' sem efeito")
+
+    def _digitar(self, texto):
+        if self.tela == 'menu':
+            self.busca += texto
+            return
+        campo = self.campos().get(self.foco)
+        if campo is None or campo.tipo == BOTAO:
+            self._erro(f"texto {texto!r} digitado fora de campo (tab {self.foco})")
+            return
+        if campo.tipo == TEXTO:
+            self.valores[campo.nome] = self.valores.get(campo.nome, '') + texto
+            return
+
+        # Dropdown e autocompletar: primeira opção que começa com o texto
+        alvo = normalizar_texto(texto)
+        posicao = next((i for i, opcao in enumerate(campo.opcoes or (), 1)
+                        if normalizar_texto(opcao).startswith(alvo)), None)
+        if posicao is None:
+            if campo.tipo == DROPDOWN:
+                self._erro(f"{campo.nome}: nenhuma opção começa com {texto!r}")
+                return
+            self.valores[campo.nome] = texto
+            return
+        self.posicoes[campo.nome] = posicao
+        self.valores[campo.nome] = campo.opcoes[posicao - 1]
+
+    def _mover(self, tecla):
+        campo = self.campos().get(self.foco)
+        if campo is None or campo.tipo != DROPDOWN:
+            self._erro(f"'{tecla}' fora de dropdown (tab {self.foco})")
+            return
+        atual = self.posicoes.get(campo.nome, 0)
+        total = len(campo.opcoes) if campo.opcoes else None
+        posicao = {'down': atual + 1, 'up': max(1, atual - 1), 'home': 1,
+                   'end': total or atual}[tecla]
+        if total:
+            posicao = min(posicao, total)
+        self.posicoes[campo.nome] = posicao
+        # Lista sem opções conhecidas (ramo): guarda a posição
+        self.valores[campo.nome] = campo.opcoes[posicao - 1] if campo.opcoes else posicao
+
+    def _enter(self):
+        tela = self.tela
+        if tela == 'menu':
+            if normalizar_texto(self.busca) != normalizar_texto(BUSCA_VCLIENT):
+                self._erro(f"busca do menu iniciar: {self.busca!r}")
+                return
+            self._abrir('conexao')
+        elif tela in PASSOS_LOGIN:
+            if tela == 'conexao':
+                self.senha = self.valores.get('senha')
+            self._abrir(PASSOS_LOGIN[tela])
+        elif tela == 'portal':
+            self._abrir('lista')
+        elif tela == 'lista':
+            destino = BOTOES_LISTA.get(self.foco)
+            if destino is None:
+                self._erro(f"enter na lista com foco no tab {self.foco}")
+                return
+            self._abrir(destino)
+        elif tela in ('dialogo_poliza', 'formulario_poliza', 'formulario_cliente'):
+            campo = self.campos().get(self.foco)
+            if campo is None or campo.tipo != BOTAO:
+                # Enter num campo só confirma o valor
+                return
+            if tela == 'dialogo_poliza':
+                self._abrir('formulario_poliza', valores=dict(self.valores))
+            else:
+                self.tela = 'confirmacao_' + tela.rsplit('_', 1)[-1]
+        elif tela.startswith('confirmacao_'):
+            formulario = tela.rsplit('_', 1)[-1]
+            self.salvos.append({"formulario": formulario, "registro": self.registro,
+                                "campos": dict(self.valores)})
+            # Póliza guardada fecha até o Portal; cliente abre um formulário novo
+            self._abrir('portal' if formulario == 'poliza' else 'formulario_cliente')
+        else:
+            self._erro("enter sem efeito")
+
+    def limpar(self):
+        super().limpar()
+        self.salvos = []
+        self.erros = []
+
+
+# ============================================
+# VERIFICAÇÃO
+# ============================================
+
+def _texto_esperado(valor):
+    return str(valor) if valor_preenchido(valor) else ''
+
+
+def esperado_poliza(carro):
+    """Valores que o formulário de póliza deve ter para o registro normalizado"""
+    vehiculo = carro.get('datos_vehiculo', {})
+    cobertura = carro.get('datos_cobertura', {})
+    pago = carro.get('condiciones_pago', {})
+    esperado = {"companhia": COMPANHIAS[0], "ramo": RAMO_AUTOMOVIL,
+                "numero_poliza": carro['datos_poliza']['numero_poliza'],
+                "assegurado": carro['datos_cliente']['assegurado'],
+                "zona_circulacao": cobertura.get('zona_circulacao_corrigida'),
+                "moneda_cobertura": cobertura.get('moneda'),
+                "moneda_pago": pago.get('moneda')}
+    for secao, campos in ((vehiculo, ('marca_modelo', 'ano', 'combustible', 'categoria',
+                                      'motor', 'chasis', 'destino', 'calidad')),
+                          (cobertura, ('cobertura', 'deducible')),
+                          (pago, ('cuotas', 'total', 'premio_total'))):
+        for campo in campos:
+            esperado[campo] = secao.get(campo)
+    return {campo: valor if campo == 'ramo' else str(valor)
+            for campo, valor in esperado.items() if valor is not None}
+
+
+def esperado_cliente(cliente):
+    """Valores que o formulário de clientes deve ter para o registro normalizado"""
+    origem = {
+        'numero_cliente': 'numero_cliente', 'assegurado': 'assegurado', 'tipo': 'tipo',
+        'rut': 'rut', 'razao_social': 'razao_social', 'documento': 'documento',
+        'padron': 'padron', 'categoria': 'categoria', 'telefono': 'telefono',
+        'celular': 'celular', 'fecha_nacimiento': 'fecha_nacimiento',
+        'domicilio': 'domicilio', 'departamento': 'Departamento', 'localidad': 'Localidad',
+        'codigo_postal': 'codigo_postal', 'dir_cobro': 'dir_cobro',
+        'departamento_cobro': 'Departamento', 'localidad_cobro': 'Localidad',
+        'codigo_postal_cobro': 'codigo_postal', 'email': 'email',
+        'observaciones': 'Observaciones',
+    }
+    nomes = {campo.nome for campo in formulario_cliente(cliente.get('tipo')).values()}
+    esperado = {campo: _texto_esperado(cliente.get(chave))
+                for campo, chave in origem.items() if campo in nomes}
+    for campo in ('corredor', 'corredor_cobro'):
+        if campo in nomes:
+            esperado[campo] = CORREDORES[0]
+    return esperado
+
+
+def divergencias(esperado, obtido):
+    """[(campo, esperado, obtido)] dos campos com valor diferente"""
+    return [(campo, valor, obtido.get(campo, ''))
+            for campo, valor in esperado.items() if obtido.get(campo, '') != valor]
+
+
+VERIFICACOES = {
+    "carros": (gerar_carros, processar_automoveis, esperado_poliza),
+    "clientes": (gerar_clientes, processar_clientes, esperado_cliente),
+}
+
+
+def verificar(tipo, registros):
+    """
+    Roda o lote no simulador e confere cada formulário guardado
+
+    Args:
+        tipo: 'carros' ou 'clientes'
+        registros: Itens no formato do JSON de entrada
+
+    Returns:
+        {"registros", "salvos", "divergencias": [{"registro", "campo", "esperado",
+        "obtido"}], "erros", "segundos_cpu"}
+    """
+    _, processar, esperado = VERIFICACOES[tipo]
+    driver = DriverSimulado()
+    ativo, rastro.ATIVO = rastro.ATIVO, False
+    inicio = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            processar(dados_json=registros, driver=driver,
+                      idempotencia=IndiceIdempotencia(':memory:'))
+    finally:
+        rastro.ATIVO = ativo
+    cpu = time.perf_counter() - inicio
+
+    # Mesmos registros normalizados que o plano recebeu, pelo índice no lote
+    extrair = (lambda item: item['output']) if tipo == 'carros' \
+        else (lambda item: item['output']['datos_cliente'])
+    normalizados = {i: validar_registro(tipo, extrair(item))[0]
+                    for i, item in enumerate(registros, 1)}
+
+    encontradas = []
+    for salvo in driver.salvos:
+        registro = normalizados.get(salvo["registro"])
+        if registro is None:
+            continue
+        for campo, valor, obtido in divergencias(esperado(registro), salvo["campos"]):
+            encontradas.append({"registro": salvo["registro"], "campo": campo,
+                                "esperado": valor, "obtido": obtido})
+    return {"registros": len(registros), "salvos": len(driver.salvos),
+            "divergencias": encontradas, "erros": driver.erros, "segundos_cpu": round(cpu, 3)}
+
+
+def imprimir_verificacao(tipo, resultado, limite=10):
+    ok = not resultado["divergencias"] and not resultado["erros"]
+    print(f"\n{'✅' if ok else '❌'} {tipo}: {resultado['salvos']}/{resultado['registros']} "
+          f"formulário(s) guardado(s) em {resultado['segundos_cpu']}s")
+    for d in resultado["divergencias"][:limite]:
+        print(f"   ❌ Registro {d['registro']}: {d['campo']} = {d['obtido']!r} "
+              f"(esperado {d['esperado']!r})")
+    for e in resultado["erros"][:limite]:
+        print(f"   ⚠️  Registro {e['registro']} ({e['tela']}): {e['erro']}")
+    restantes = (len(resultado["divergencias"]) + len(resultado["erros"])) - 2 * limite
+    if restantes > 0:
+        print(f"   ... e mais {restantes}")
+    return ok
+
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    parametros = {"--n": 1000, "--semente": 42}
+    for nome in parametros:
+        if nome in argumentos:
+            parametros[nome] = int(argumentos[argumentos.index(nome) + 1])
+    n, semente = parametros["--n"], parametros["--semente"]
+
+    print(f"\n{'='*60}")
+    print(f"🧪 SIMULADOR VELNEO ({n} registro(s) por tipo)")
+    print(f"{'='*60}")
+    tudo_ok = True
+    for tipo, (gerar, _, _) in VERIFICACOES.items():
+        tudo_ok &= imprimir_verificacao(tipo, verificar(tipo, gerar(n, semente)))
+    print(f"{'='*60}\n")
+    sys.exit(0 if tudo_ok else 1)
@@ -0,0 +1,170 @@
+"""
+SONDA DE TELA - Confere um elemento da tela comparando com uma imagem de referência
+Em vez do locateOnScreen (tela inteira, centenas de ms por consulta):
+- cada imagem de referência é lida uma vez e guardada em cache já em
+  tons de cinza (numpy), com média e norma pré-calculadas
+- a captura é só da região configurada (alguns KB, não a tela inteira)
+- a comparação é correlação cruzada normalizada via FFT, com as somas de
+  cada janela por imagem integral: poucos ms numa região de 400x120
+
+As sondas entram como condições de prontidão (prontidao.py), tanto nas
+esperas de tela quanto na conferência de campo antes de digitar.
+
+Para testar sem desktop contra capturas salvas:
+    python sonda_tela.py captura.png imagens/campo_corredor.png [x y largura altura]
+"""
+import sys
+import time
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image
+
+
+# Correlação mínima (0 a 1) para considerar a imagem encontrada
+LIMIAR_PADRAO = 0.9
+
+
+def _cinza(imagem):
+    """PIL.Image ou caminho -> matriz float64 em tons de cinza"""
+    if not isinstance(imagem, Image.Image):
+        imagem = Image.open(imagem)
+    return np.asarray(imagem.convert('L'), dtype=np.float64)
+
+
+class Modelo:
+    """Imagem de referência pré-processada (sem a média, com a norma guardada)"""
+
+    def __init__(self, caminho):
+        cinza = _cinza(caminho)
+        self.caminho = caminho
+        self.forma = cinza.shape
+        self.centrado = cinza - cinza.mean()
+        self.norma = float(np.sqrt((self.centrado ** 2).sum()))
+
+    @lru_cache(maxsize=8)
+    def espectro(self, forma):
+        """FFT do modelo invertido, no tamanho da região (reaproveitada entre capturas)"""
+        return np.fft.rfft2(self.centrado[::-1, ::-1], s=forma)
+
+
+@lru_cache(maxsize=None)
+def carregar_modelo(caminho):
+    """Modelo de `caminho`, lido do disco só na primeira vez"""
+    return Modelo(caminho)
+
+
+def _somas_janela(matriz, altura, largura):
+    """Soma de cada janela altura x largura (modo 'valid') pela imagem integral"""
+    integral = np.pad(matriz.cumsum(0).cumsum(1), ((1, 0), (1, 0)))
+    return (integral[altura:, largura:] - integral[:-altura, largura:]
+            - integral[altura:, :-largura] + integral[:-altura, :-largura])
+
+
+def correlacao(imagem, modelo):
+    """
+    Correlação cruzada normalizada do modelo em cada posição da imagem
+
+    Args:
+        imagem: Matriz em tons de cinza (região capturada)
+        modelo: Modelo
+
+    Returns:
+        Matriz (H-h+1, W-w+1) com valores de -1 a 1, ou None se o modelo
+        é maior que a imagem
+    """
+    H, W = imagem.shape
+    h, w = modelo.forma
+    if h > H or w > W or modelo.norma == 0:
+        return None
+    # Convolução circular com o modelo invertido: a parte 'valid' é a correlação exata
+    produto = np.fft.irfft2(np.fft.rfft2(imagem) * modelo.espectro((H, W)), s=(H, W))
+    produto = produto[h - 1:, w - 1:]
+
+    n = h * w
+    soma = _somas_janela(imagem, h, w)
+    variancia = _somas_janela(imagem ** 2, h, w) - soma ** 2 / n
+    denominador = np.sqrt(np.clip(variancia, 0, None)) * modelo.norma
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominador > 1e-6, produto / denominador, 0.0)
+
+
+def procurar(imagem, modelo, limiar=LIMIAR_PADRAO):
+    """
+    Melhor posição do modelo na imagem
+
+    Returns:
+        (x, y, pontuação) relativos à imagem, ou None abaixo do limiar
+    """
+    mapa = correlacao(imagem, modelo)
+    if mapa is None:
+        return None
+    y, x = np.unravel_index(np.argmax(mapa), mapa.shape)
+    pontuacao = float(mapa[y, x])
+    return (int(x), int(y), pontuacao) if pontuacao >= limiar else None
+
+
+class Sonda:
+    """
+    Um elemento esperado numa região da tela
+
+    Args:
+        imagem: Caminho da imagem de referência (ex: imagens/campo_corredor.png)
+        regiao: (x, y, largura, altura) onde procurar; None = tela inteira (lento)
+        limiar: Correlação mínima (0 a 1)
+    """
+
+    def __init__(self, imagem, regiao=None, limiar=LIMIAR_PADRAO):
+        self.imagem = imagem
+        self.regiao = tuple(regiao) if regiao else None
+        self.limiar = limiar
+
+    def localizar(self, driver):
+        """(x, y, largura, altura) na tela, ou None"""
+        captura = driver.capturar(self.regiao)
+        if captura is None:
+            return None
+        modelo = carregar_modelo(self.imagem)
+        achado = procurar(_cinza(captura), modelo, self.limiar)
+        if achado is None:
+            return None
+        x, y, _ = achado
+        dx, dy = self.regiao[:2] if self.regiao else (0, 0)
+        return (dx + x, dy + y, modelo.forma[1], modelo.forma[0])
+
+    def verificar(self, driver):
+        return self.localizar(driver) is not None
+
+
+class TelaSalva:
+    """Captura de tela salva em arquivo, no lugar do driver (testes sem desktop)"""
+
+    def __init__(self, arquivo):
+        self.imagem = Image.open(arquivo)
+        self.imagem.load()
+
+    def capturar(self, regiao=None):
+        if regiao is None:
+            return self.imagem
+        x, y, largura, altura = regiao
+        return self.imagem.crop((x, y, x + largura, y + altura))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 7):
+        print(__doc__)
+        sys.exit(2)
+    captura, referencia = sys.argv[1], sys.argv[2]
+    regiao = tuple(int(v) for v in sys.argv[3:7]) or None
+
+    tela = TelaSalva(captura)
+    sonda = Sonda(referencia, regiao)
+    carregar_modelo(referencia)  # a primeira leitura do disco fica fora da medida
+    inicio = time.perf_counter()
+    caixa = sonda.localizar(tela)
+    duracao = (time.perf_counter() - inicio) * 1000
+    if caixa:
+        print(f"✅ {referencia} encontrada em {caixa} ({duracao:.1f} ms)")
+    else:
+        print(f"❌ {referencia} não encontrada ({duracao:.1f} ms)")
+        sys.exit(1)
@@ -0,0 +1,330 @@
+"""
+VALIDAÇÃO - Modelos tipados dos registros e normalização antes da GUI
+Cada registro do lote passa por aqui antes de qualquer tecla:
+- textos sem espaços sobrando e 'none'/vazio viram ausentes
+- dropdowns (categoria, destino, cobertura, tipo...) viram a opção real do combo,
+  inclusive por aproximação ("Pick-Up" -> "PICK UP"); as de baixa confiança
+  são rejeitadas, ou voltam como avisos com ACEITAR_BAIXA_CONFIANCA=1
+  (ver resolvedor_opcoes.py)
+- moedas viram PES/DOL e números viram números
+- o nome do assegurado ("APELLIDO, NOMBRE") já sai na ordem do formulário
+Registros inválidos são rejeitados com a lista de erros, sem abrir formulário.
+"""
+import re
+from contextvars import ContextVar
+from datetime import date
+from typing import Dict, List, Optional, Union
+
+from pydantic import BaseModel, ConfigDict, ValidationError, field_validator, model_validator
+
+from plano_acoes import valor_preenchido
+import resolvedor_opcoes
+from resolvedor_opcoes import resolver
+
+
+# Variações aceitas para cada moeda do Velneo
+MOEDAS = {
+    "PES": ("PES", "PESOS", "PESO", "UYU", "$", "$U", "URUGUAYOS"),
+    "DOL": ("DOL", "DOLARES", "DÓLARES", "DOLAR", "DÓLAR", "USD", "U$S", "US$", "U$D"),
+}
+_MOEDAS = {variacao: moeda for moeda, variacoes in MOEDAS.items() for variacao in variacoes}
+
+# Campos obrigatórios de datos_cliente conforme o tipo (os do formulário de cada tipo)
+CAMPOS_POR_TIPO = {
+    "Empresa": ("rut", "razao_social"),
+    "Particular": ("documento",),
+    "Particular/Empresa": ("rut", "razao_social", "documento"),
+    "Edificio": ("padron",),
+    "Prospecto": (),
+}
+
+
+# ============================================
+# NORMALIZADORES
+# ============================================
+
+def _texto(valor):
+    """Texto limpo; None, vazio e 'none' viram None"""
+    if not valor_preenchido(valor):
+        return None
+    return ' '.join(str(valor).split())
+
+
+# Avisos do registro em validação (resoluções de baixa confiança)
+_avisos = ContextVar('avisos_validacao', default=None)
+
+
+def _opcao(nome, valor):
+    """Opção real do dropdown `nome` (erro se nenhuma for parecida o bastante)"""
+    valor = _texto(valor)
+    if valor is None:
+        return None
+    resolucao = resolver(nome, valor)
+    if resolucao is None:
+        raise ValueError(f"valor desconhecido no dropdown {nome}: {valor!r}")
+    if not resolucao.baixa_confianca:
+        return resolucao.opcao
+    descricao = f"{valor!r} -> {resolucao.opcao} (confiança {resolucao.confianca:.0%})"
+    if not resolvedor_opcoes.ACEITAR_BAIXA_CONFIANCA:
+        raise ValueError(f"valor incerto no dropdown {nome}: {descricao}")
+    avisos = _avisos.get()
+    if avisos is not None:
+        avisos.append(f"{nome}: {descricao}")
+    return resolucao.opcao
+
+
+def _moeda(valor):
+    valor = _texto(valor)
+    if valor is None:
+        return None
+    moeda = _MOEDAS.get(valor.upper())
+    if moeda is None:
+        raise ValueError(f"moeda desconhecida: {valor!r} (use PES ou DOL)")
+    return moeda
+
+
+def _numero(valor):
+    """13415, 13415.5, "13415", "13.415,50" -> número (int quando inteiro)"""
+    if isinstance(valor, bool):
+        raise ValueError(f"número inválido: {valor!r}")
+    if valor is None:
+        return None
+    if isinstance(valor, (int, float)):
+        numero = valor
+    else:
+        texto = _texto(valor)
+        if texto is None:
+            return None
+        texto = texto.replace(' ', '')
+        if ',' in texto:
+            # Formato local: ponto de milhar e vírgula decimal
+            texto = texto.replace('.', '').replace(',', '.')
+        try:
+            numero = float(texto)
+        except ValueError:
+            raise ValueError(f"número inválido: {valor!r}")
+    if numero < 0:
+        raise ValueError(f"número negativo: {valor!r}")
+    return int(numero) if float(numero).is_integer() else numero
+
+
+def nome_formulario(assegurado):
+    """"LUQUE DELBONO, MARIA" -> "MARIA LUQUE DELBONO" (ordem do formulário de póliza)"""
+    if assegurado and ',' in assegurado:
+        sobrenome, nome = [p.strip() for p in assegurado.split(',', 1)]
+        return f"{nome} {sobrenome}".strip()
+    return assegurado
+
+
+class _Modelo(BaseModel):
+    # Campos extras do JSON (vigencia, email...) passam adiante sem validação
+    model_config = ConfigDict(extra='allow')
+
+
+# ============================================
+# AUTOMÓVEIS (item['output'])
+# ============================================
+
+class DatosPoliza(_Modelo):
+    numero_poliza: str
+
+    _limpar = field_validator('numero_poliza', mode='before')(_texto)
+
+
+class DatosVehiculo(_Modelo):
+    marca_modelo: str
+    ano: Optional[str] = None
+    combustible: Optional[str] = None
+    categoria: str
+    motor: Optional[str] = None
+    chasis: Optional[str] = None
+    destino: str
+    calidad: str
+
+    _limpar = field_validator('marca_modelo', 'combustible', 'motor', 'chasis',
+                              mode='before')(_texto)
+
+    @field_validator('ano', mode='before')
+    @classmethod
+    def _ano(cls, valor):
+        valor = _texto(valor)
+        if valor is None:
+            return None
+        if not re.fullmatch(r'\d{4}', valor) or not 1900 <= int(valor) <= date.today().year + 1:
+            raise ValueError(f"ano inválido: {valor!r}")
+        return valor
+
+    @field_validator('categoria', 'destino', 'calidad', mode='before')
+    @classmethod
+    def _dropdown(cls, valor, info):
+        return _opcao(info.field_name, valor)
+
+
+class DatosCobertura(_Modelo):
+    cobertura: str
+    zona_circulacao_corrigida: str
+    deducible: Optional[Union[int, float]] = None
+    moneda: str
+
+    @field_validator('cobertura', mode='before')
+    @classmethod
+    def _cobertura(cls, valor):
+        return _opcao('cobertura', valor)
+
+    @field_validator('zona_circulacao_corrigida', mode='before')
+    @classmethod
+    def _zona(cls, valor):
+        return _opcao('zona_circulacao', valor)
+
+    _deducible = field_validator('deducible', mode='before')(_numero)
+    _moneda = field_validator('moneda', mode='before')(_moeda)
+
+
+class CondicionesPago(_Modelo):
+    moneda: str
+    cuotas: Optional[int] = None
+    total: Optional[Union[int, float]] = None
+    premio_total: Optional[Union[int, float]] = None
+
+    _moneda = field_validator('moneda', mode='before')(_moeda)
+    _valores = field_validator('cuotas', 'total', 'premio_total', mode='before')(_numero)
+
+
+class ClientePoliza(_Modelo):
+    """datos_cliente dentro de uma póliza: só o nome vai para o formulário"""
+    assegurado: str
+
+    @field_validator('assegurado', mode='before')
+    @classmethod
+    def _assegurado(cls, valor):
+        return nome_formulario(_texto(valor))
+
+
+class RegistroAutomovel(_Modelo):
+    datos_poliza: DatosPoliza
+    datos_vehiculo: DatosVehiculo
+    datos_cobertura: DatosCobertura
+    condiciones_pago: CondicionesPago
+    datos_cliente: ClientePoliza
+
+
+# ============================================
+# CLIENTES (item['output']['datos_cliente'])
+# ============================================
+
+class DatosCliente(_Modelo):
+    numero_cliente: Optional[str] = None
+    assegurado: Optional[str] = None
+    tipo: str
+    rut: Optional[str] = None
+    razao_social: Optional[str] = None
+    documento: Optional[str] = None
+    padron: Optional[str] = None
+    categoria: Optional[str] = None
+    telefono: Optional[str] = None
+    celular: Optional[str] = None
+    fecha_nacimiento: Optional[str] = None
+    domicilio: Optional[str] = None
+    email: Optional[str] = None
+
+    @field_validator('*', mode='before')
+    @classmethod
+    def _limpar(cls, valor, info):
+        if info.field_name == 'tipo':
+            return _opcao('tipo_cliente', valor)
+        return _texto(valor)
+
+    @field_validator('fecha_nacimiento')
+    @classmethod
+    def _data(cls, valor):
+        if valor is not None and not re.fullmatch(r'\d{2}[/-]\d{2}[/-]\d{4}', valor):
+            raise ValueError(f"data inválida (use dd/mm/aaaa): {valor!r}")
+        return valor
+
+    @model_validator(mode='after')
+    def _campos_do_tipo(self):
+        faltando = [c for c in CAMPOS_POR_TIPO.get(self.tipo, ()) if getattr(self, c) is None]
+        if faltando:
+            raise ValueError(f"tipo {self.tipo} exige: {', '.join(faltando)}")
+        return self
+
+
+# ============================================
+# LOTE
+# ============================================
+
+MODELOS = {
+    "carros": RegistroAutomovel,
+    "clientes": DatosCliente,
+}
+
+
+def _formatar_erros(erro: ValidationError) -> List[str]:
+    mensagens = []
+    for e in erro.errors():
+        campo = '.'.join(str(p) for p in e['loc']) or 'registro'
+        mensagem = e['msg'].removeprefix('Value error, ')
+        mensagens.append(f"{campo}: {mensagem}")
+    return mensagens
+
+
+def validar_registro(tipo: str, registro: Dict, avisos: Optional[List[str]] = None):
+    """
+    Valida e normaliza um registro
+
+    Args:
+        tipo: 'carros' ou 'clientes'
+        registro: item['output'] (carros) ou datos_cliente (clientes)
+        avisos: Lista que recebe os dropdowns aceitos com baixa confiança
+            (só com ACEITAR_BAIXA_CONFIANCA=1; sem isso eles viram erro)
+
+    Returns:
+        (registro normalizado, []) ou (None, lista de erros)
+    """
+    if not isinstance(registro, dict):
+        return None, [f"registro: esperado objeto, recebido {type(registro).__name__}"]
+    token = _avisos.set(avisos)
+    try:
+        modelo = MODELOS[tipo].model_validate(registro)
+    except ValidationError as e:
+        return None, _formatar_erros(e)
+    finally:
+        _avisos.reset(token)
+    # Campos ausentes ficam de fora para o plano usar os mesmos padrões de antes
+    return modelo.model_dump(exclude_none=True), []
+
+
+def validar_lote(tipo: str, registros, ao_validar=None):
+    """
+    Relatório de validação de um lote inteiro (índices começam em 1)
+
+    Args:
+        ao_validar: funcao(indice, registro normalizado) chamada para cada válido
+
+    Returns:
+        {"total", "validos", "rejeitados": [{"indice", "erros"}],
+         "baixa_confianca": [{"indice", "avisos"}]}
+    """
+    relatorio = {"total": 0, "validos": 0, "rejeitados": [], "baixa_confianca": []}
+    for i, registro in enumerate(registros, 1):
+        relatorio["total"] += 1
+        avisos = []
+        normalizado, erros = validar_registro(tipo, registro, avisos)
+        if erros:
+            relatorio["rejeitados"].append({"indice": i, "erros": erros})
+            continue
+        relatorio["validos"] += 1
+        if avisos:
+            relatorio["baixa_confianca"].append({"indice": i, "avisos": avisos})
+        if ao_validar is not None:
+            ao_validar(i, normalizado)
+    return relatorio
+
+
+def imprimir_relatorio(relatorio):
+    rejeitados = relatorio["rejeitados"]
+    print(f"🔎 Validação: {relatorio['validos']}/{relatorio['total']} registro(s) válido(s)")
+    for r in rejeitados:
+        print(f"   ❌ Registro {r['indice']}: {'; '.join(r['erros'])}")
+    for r in relatorio.get("baixa_confianca", []):
+        print(f"   ⚠️  Registro {r['indice']} (conferir): {'; '.join(r['avisos'])}")
@@ -0,0 +1,158 @@
+"""
+WEBHOOKS - Aviso de conclusão das tarefas no callback_url do cliente (n8n)
+Os avisos entram numa fila de saída em memória, por destino:
+- avisos para o mesmo destino que chegam juntos (ou durante um backoff)
+  saem num único POST: {"notificacoes": [aviso, ...]}
+- falhas de rede, 408, 429 e 5xx são repetidas com backoff exponencial
+  (com jitter) até TENTATIVAS; outros 4xx descartam o envio na hora
+- uma requests.Session com pool de conexões é reaproveitada em tudo
+"""
+import random
+import threading
+import time
+import traceback
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metricas
+
+
+TENTATIVAS = 6
+BACKOFF_INICIAL = 1.0
+BACKOFF_MAXIMO = 300
+# Segundos que um aviso novo espera por outros para o mesmo destino
+JANELA_AGRUPAMENTO = 1.0
+MAXIMO_POR_ENVIO = 50
+TIMEOUT = 10
+
+# Respostas que valem nova tentativa (além de 5xx e erros de rede)
+STATUS_REPETIR = (408, 429)
+
+
+def _sessao_http(conexoes=10):
+    sessao = requests.Session()
+    adaptador = HTTPAdapter(pool_connections=conexoes, pool_maxsize=conexoes)
+    sessao.mount("http://", adaptador)
+    sessao.mount("https://", adaptador)
+    sessao.headers["User-Agent"] = "automacao-seguros-webhooks"
+    return sessao
+
+
+class FilaWebhooks:
+    """
+    Fila de saída dos avisos, entregue por uma thread de fundo
+
+    Args:
+        sessao: requests.Session (padrão: uma com pool de conexões)
+        tentativas: Envios por lote antes de descartar
+        backoff_inicial: Espera antes da 2ª tentativa (dobra a cada falha)
+        janela: Segundos que um aviso novo espera para agrupar com outros
+    """
+
+    def __init__(self, sessao=None, tentativas=TENTATIVAS, backoff_inicial=BACKOFF_INICIAL,
+                 backoff_maximo=BACKOFF_MAXIMO, janela=JANELA_AGRUPAMENTO,
+                 maximo_por_envio=MAXIMO_POR_ENVIO, timeout=TIMEOUT):
+        self.http = sessao or _sessao_http()
+        self.tentativas = tentativas
+        self.backoff_inicial = backoff_inicial
+        self.backoff_maximo = backoff_maximo
+        self.janela = janela
+        self.maximo_por_envio = maximo_por_envio
+        self.timeout = timeout
+        self._destinos = {}  # url -> {"avisos", "tentativa", "proxima"}
+        self._cond = threading.Condition()
+        self._parar = threading.Event()
+        self._thread = None
+
+    def notificar(self, url, aviso):
+        """Agenda `aviso` (dict) para `url`; nunca bloqueia"""
+        with self._cond:
+            destino = self._destinos.get(url)
+            if destino is None:
+                destino = self._destinos[url] = {
+                    "avisos": [], "tentativa": 0, "proxima": time.monotonic() + self.janela}
+            destino["avisos"].append(aviso)
+            self._cond.notify()
+
+    def pendentes(self):
+        with self._cond:
+            return sum(len(d["avisos"]) for d in self._destinos.values())
+
+    # ============================================
+    # ENTREGA
+    # ============================================
+
+    def _proximo_envio(self):
+        """(url, lote) do destino vencido mais antigo, ou None; espera até haver um"""
+        with self._cond:
+            while not self._parar.is_set():
+                agora = time.monotonic()
+                vencidos = [(d["proxima"], url) for url, d in self._destinos.items()
+                            if d["proxima"] <= agora]
+                if vencidos:
+                    url = min(vencidos)[1]
+                    return url, list(self._destinos[url]["avisos"][:self.maximo_por_envio])
+                proxima = min((d["proxima"] for d in self._destinos.values()), default=agora + 1)
+                self._cond.wait(max(0.01, min(proxima - agora, 1)))
+        return None
+
+    def _enviar(self, url, lote, tentativa):
+        """Returns: 'ok' | 'repetir' | 'descartar'"""
+        try:
+            resposta = self.http.post(url, json={"notificacoes": lote}, timeout=self.timeout,
+                                      headers={"X-Tentativa": str(tentativa)})
+        except requests.RequestException as e:
+            print(f"⚠️  Webhook {url}: {e}")
+            return "repetir"
+        if resposta.ok:
+            return "ok"
+        print(f"⚠️  Webhook {url}: HTTP {resposta.status_code}")
+        if resposta.status_code >= 500 or resposta.status_code in STATUS_REPETIR:
+            return "repetir"
+        return "descartar"
+
+    def _concluir_envio(self, url, lote, resultado):
+        with self._cond:
+            destino = self._destinos[url]
+            if resultado == "repetir" and destino["tentativa"] + 1 < self.tentativas:
+                destino["tentativa"] += 1
+                espera = min(self.backoff_maximo,
+                             self.backoff_inicial * 2 ** (destino["tentativa"] - 1))
+                destino["proxima"] = time.monotonic() + espera * random.uniform(0.8, 1.2)
+                return
+            # Entregue ou sem mais tentativas: o lote sai da fila
+            del destino["avisos"][:len(lote)]
+            destino["tentativa"] = 0
+            destino["proxima"] = time.monotonic()
+            if not destino["avisos"]:
+                del self._destinos[url]
+        entregue = resultado == "ok"
+        metricas.WEBHOOKS.inc(len(lote), resultado="entregue" if entregue else "descartado")
+        if not entregue:
+            print(f"❌ Webhook {url}: {len(lote)} aviso(s) descartado(s)")
+
+    def _loop(self):
+        while True:
+            proximo = self._proximo_envio()
+            if proximo is None:
+                return
+            url, lote = proximo
+            try:
+                resultado = self._enviar(url, lote, self._destinos[url]["tentativa"] + 1)
+            except Exception:
+                traceback.print_exc()
+                resultado = "repetir"
+            self._concluir_envio(url, lote, resultado)
+
+    def iniciar(self):
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._loop, name="webhooks", daemon=True)
+        self._thread.start()
+
+    def parar(self, timeout=5):
+        self._parar.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout)